@@ -0,0 +1,30 @@
+"""Adiciona a coluna versao (ETag) em empresas e obrigacoes_acessorias
+
+Revision ID: 7b2f0c4d9e13
+Revises: 30463abe4936
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2f0c4d9e13'
+down_revision: Union[str, None] = '30463abe4936'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default preenche as linhas existentes sem reescrever a tabela (PostgreSQL 11+)
+    op.add_column('empresas', sa.Column('versao', sa.Integer(), server_default='1', nullable=False,
+                                        comment='Incrementada a cada alteração da empresa ou de suas obrigações (ETag)'))
+    op.add_column('obrigacoes_acessorias', sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('obrigacoes_acessorias', 'versao')
+    op.drop_column('empresas', 'versao')
@@ -0,0 +1,30 @@
+"""Índice trigram do nome das empresas (busca enquanto o índice em memória não está pronto)
+
+Revision ID: a91d3c7e5f02
+Revises: e4a7d2b91c58
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d3c7e5f02'
+down_revision: Union[str, None] = 'e4a7d2b91c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        # gin_trgm_ops: ILIKE '%termo%' (busca.buscar_no_banco) usa o índice em vez de ler a tabela toda
+        op.create_index('ix_empresas_nome_trgm', 'empresas', ['nome'], postgresql_using='gin',
+                        postgresql_ops={'nome': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_empresas_nome_trgm', table_name='empresas', postgresql_concurrently=True)
@@ -0,0 +1,37 @@
+"""Tabela resumo_obrigacoes (quantidade de obrigações por empresa e periodicidade)
+
+Revision ID: b6f4e8a2c713
+Revises: a91d3c7e5f02
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f4e8a2c713'
+down_revision: Union[str, None] = 'a91d3c7e5f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('resumo_obrigacoes',
+    sa.Column('empresa_id', sa.Integer(), nullable=False),
+    sa.Column('periodicidade', sa.String(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('empresa_id', 'periodicidade')
+    )
+    # Carga inicial, igual a reconstruir_resumo.py
+    op.execute(
+        'INSERT INTO resumo_obrigacoes (empresa_id, periodicidade, quantidade) '
+        'SELECT empresa_id, periodicidade, count(*) FROM obrigacoes_acessorias GROUP BY empresa_id, periodicidade'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resumo_obrigacoes')
@@ -0,0 +1,49 @@
+"""Índice único (empresa_id, nome) em obrigacoes_acessorias e remoção dos índices redundantes nas chaves primárias
+
+Revision ID: c5e81a3f6d20
+Revises: 7b2f0c4d9e13
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81a3f6d20'
+down_revision: Union[str, None] = '7b2f0c4d9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicadas = op.get_bind().execute(sa.text(
+        "SELECT empresa_id, nome FROM obrigacoes_acessorias GROUP BY empresa_id, nome HAVING count(*) > 1 LIMIT 10"
+    )).all()
+    if duplicadas:
+        raise RuntimeError(
+            f"Existem obrigações duplicadas por (empresa_id, nome), ex.: {duplicadas}. "
+            "Remova os duplicados antes de aplicar esta migração."
+        )
+
+    # CONCURRENTLY não bloqueia escritas durante a construção, mas não roda dentro de transação
+    with op.get_context().autocommit_block():
+        # 🔹 Uma tentativa anterior interrompida deixa o índice INVALID: recria do zero
+        op.drop_index('ix_obrigacoes_acessorias_empresa_id_nome', table_name='obrigacoes_acessorias',
+                      postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_obrigacoes_acessorias_empresa_id_nome', 'obrigacoes_acessorias', ['empresa_id', 'nome'],
+                        unique=True, postgresql_concurrently=True)
+        op.drop_index(op.f('ix_obrigacoes_acessorias_id'), table_name='obrigacoes_acessorias',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_empresas_id'), table_name='empresas', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_empresas_id'), 'empresas', ['id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_obrigacoes_acessorias_id'), 'obrigacoes_acessorias', ['id'], unique=False,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_obrigacoes_acessorias_empresa_id_nome', table_name='obrigacoes_acessorias',
+                      postgresql_concurrently=True)
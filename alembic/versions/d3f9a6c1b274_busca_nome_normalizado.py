@@ -0,0 +1,36 @@
+"""Índice trigram do nome normalizado das empresas (busca pelo banco com as regras do índice em memória)
+
+Revision ID: d3f9a6c1b274
+Revises: b6f4e8a2c713
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f9a6c1b274'
+down_revision: Union[str, None] = 'b6f4e8a2c713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mesma expressão de busca.nome_para_busca(): minúsculas, sem acentos, espaços simples, com um espaço
+# no início. Precisa ser idêntica para o planejador usar o índice em "LIKE '% termo%'".
+NOME_PARA_BUSCA = r"""regexp_replace(' ' || translate(lower(nome), 'ÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝáàâãäåéèêëíìîïóòôõöúùûüçñýÿ', 'aaaaaaeeeeiiiiooooouuuucnyaaaaaaeeeeiiiiooooouuuucnyy'), '\s+', ' ', 'g')"""
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_empresas_nome_busca_trgm ON empresas '
+                   f'USING gin (({NOME_PARA_BUSCA}) gin_trgm_ops)')
+        # 🔹 O índice trigram do nome cru só atendia o ILIKE antigo da busca pelo banco
+        op.drop_index('ix_empresas_nome_trgm', table_name='empresas', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_empresas_nome_trgm', 'empresas', ['nome'], postgresql_using='gin',
+                        postgresql_ops={'nome': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_empresas_nome_busca_trgm', table_name='empresas', postgresql_concurrently=True, if_exists=True)
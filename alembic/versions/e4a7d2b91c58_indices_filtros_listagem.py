@@ -0,0 +1,36 @@
+"""Índices dos filtros das listagens (prefixo do nome da empresa, periodicidade e nome da obrigação)
+
+Revision ID: e4a7d2b91c58
+Revises: c5e81a3f6d20
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7d2b91c58'
+down_revision: Union[str, None] = 'c5e81a3f6d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # varchar_pattern_ops: LIKE 'prefixo%' usa o índice mesmo com collation diferente de C
+        op.create_index('ix_empresas_nome_prefixo', 'empresas', ['nome'],
+                        postgresql_ops={'nome': 'varchar_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_obrigacoes_acessorias_periodicidade_id', 'obrigacoes_acessorias', ['periodicidade', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_obrigacoes_acessorias_nome', 'obrigacoes_acessorias', ['nome'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_obrigacoes_acessorias_nome', table_name='obrigacoes_acessorias', postgresql_concurrently=True)
+        op.drop_index('ix_obrigacoes_acessorias_periodicidade_id', table_name='obrigacoes_acessorias',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_empresas_nome_prefixo', table_name='empresas', postgresql_concurrently=True)
@@ -0,0 +1,48 @@
+"""Contador das alterações de empresas que mudam a busca (verificação periódica do índice em memória)
+
+Revision ID: f2b7c9d4e6a1
+Revises: d3f9a6c1b274
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c9d4e6a1'
+down_revision: Union[str, None] = 'd3f9a6c1b274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'empresas_alteracoes_busca',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute('INSERT INTO empresas_alteracoes_busca (id, total) VALUES (1, 0)')
+    # Mesmo trigger de models.py: só inserções, exclusões e UPDATEs de nome ou CNPJ (não o da versao),
+    # somados no commit de cada transação
+    op.execute("""
+        CREATE OR REPLACE FUNCTION contar_alteracao_busca() RETURNS trigger AS $$
+        BEGIN
+            UPDATE empresas_alteracoes_busca SET total = total + 1 WHERE id = 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        'CREATE CONSTRAINT TRIGGER empresas_alteracoes_busca AFTER INSERT OR DELETE OR UPDATE OF nome, cnpj ON empresas '
+        'DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION contar_alteracao_busca()'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS empresas_alteracoes_busca ON empresas')
+    op.execute('DROP FUNCTION IF EXISTS contar_alteracao_busca()')
+    op.drop_table('empresas_alteracoes_busca')
@@ -0,0 +1,87 @@
+"""Compara vazão e latência p99 das rotas síncronas e assíncronas sob 500 clientes simultâneos.
+
+Sobe um uvicorn para cada modo (DB_ASYNC=false/true) e dispara GET /empresas/{id}/ e
+GET /empresas/?limit=10 por um tempo fixo.
+
+Uso: ENV=test python -m benchmarks.bench_async [clientes] [segundos]
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.utils import popular_empresas, preparar_banco
+
+PORTA = 8765
+URL = f"http://127.0.0.1:{PORTA}"
+EMPRESAS = 10_000
+
+
+def subir_servidor(modo_async: bool) -> subprocess.Popen:
+    ambiente = {**os.environ, "DB_ASYNC": "true" if modo_async else "false"}
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORTA), "--log-level", "warning"],
+        env=ambiente, stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"{URL}/empresas/1/", timeout=1)
+            return processo
+        except httpx.TransportError:
+            time.sleep(0.1)
+    processo.kill()
+    raise RuntimeError("Servidor não respondeu")
+
+
+async def carga(clientes: int, segundos: float) -> dict:
+    latencias, erros = [], 0
+    limite = time.perf_counter() + segundos
+
+    async def cliente(http: httpx.AsyncClient):
+        nonlocal erros
+        while time.perf_counter() < limite:
+            url = f"/empresas/{random.randint(1, EMPRESAS)}/" if random.random() < 0.5 else "/empresas/?limit=10"
+            inicio = time.perf_counter()
+            try:
+                response = await http.get(url)
+                response.raise_for_status()
+                latencias.append(time.perf_counter() - inicio)
+            except httpx.HTTPError:
+                erros += 1
+
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=URL, limits=limites, timeout=60) as http:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(http) for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "req/s": round(len(latencias) / duracao, 1),
+        "p50_ms": round(latencias[len(latencias) // 2] * 1000, 1),
+        "p99_ms": round(latencias[int(len(latencias) * 0.99)] * 1000, 1),
+        "erros": erros,
+    }
+
+
+def main():
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    preparar_banco()
+    popular_empresas(EMPRESAS, obrigacoes_por_empresa=2)
+
+    print(f"{clientes} clientes simultâneos, {segundos:.0f}s por modo")
+    for modo_async in (False, True):
+        processo = subir_servidor(modo_async)
+        try:
+            resultado = asyncio.run(carga(clientes, segundos))
+        finally:
+            processo.terminate()
+            processo.wait()
+        print(f"{'async' if modo_async else 'sync':<6} {resultado}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Calendário de vencimentos de 1M de obrigações em uma janela de 12 meses.
+
+Mede o tempo até o primeiro bloco, o tempo total, as linhas por segundo e o pico de memória
+do gerador de GET /obrigacoes_acessorias/calendario.
+
+Uso: ENV=test python -m benchmarks.bench_calendario [empresas] [obrigacoes_por_empresa]
+"""
+import resource
+import sys
+import time
+from datetime import date
+from calendario import gerar_calendario
+from benchmarks.utils import popular_empresas, preparar_banco
+
+INICIO, FIM = date(2026, 1, 1), date(2026, 12, 31)
+
+
+def pico_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def medir(formato: str):
+    rss_inicial = pico_rss_mb()
+    inicio = time.perf_counter()
+    primeiro_bloco, linhas = None, 0
+    for bloco in gerar_calendario(INICIO, FIM, None, formato):
+        if primeiro_bloco is None:
+            primeiro_bloco = time.perf_counter() - inicio
+        linhas += bloco.count(b"\n")
+    duracao = time.perf_counter() - inicio
+    print(
+        f"{formato:<7} linhas={linhas:,}  primeiro_bloco_ms={primeiro_bloco * 1000:.1f}  total_s={duracao:.2f}  "
+        f"linhas/s={linhas / duracao:,.0f}  memoria_extra_mb={pico_rss_mb() - rss_inicial:.1f}"
+    )
+
+
+def main():
+    empresas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    por_empresa = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    preparar_banco()
+    popular_empresas(empresas, obrigacoes_por_empresa=por_empresa)
+    print(f"{empresas * por_empresa:,} obrigações, vencimentos de {INICIO} a {FIM}")
+    for formato in ("ndjson", "csv"):
+        medir(formato)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compara a criação de empresas uma a uma (POST /empresas/) com POST /empresas/bulk.
+
+Uso: ENV=test python -m benchmarks.bench_empresas_lote [quantidade]
+"""
+import sys
+import time
+from fastapi.testclient import TestClient
+from main import app
+from benchmarks.utils import dados_empresa, preparar_banco
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    client = TestClient(app)
+    preparar_banco()
+
+    inicio = time.perf_counter()
+    for numero in range(quantidade):
+        assert client.post("/empresas/", json=dados_empresa(numero)).status_code == 200
+    individual = time.perf_counter() - inicio
+
+    lote = [dados_empresa(numero) for numero in range(quantidade, 2 * quantidade)]
+    inicio = time.perf_counter()
+    response = client.post("/empresas/bulk", json=lote)
+    em_lote = time.perf_counter() - inicio
+    assert response.json()["criadas"] == quantidade
+
+    print(f"{quantidade} empresas")
+    print(f"individual  {individual:8.3f}s  {quantidade / individual:10.0f} empresas/s")
+    print(f"bulk        {em_lote:8.3f}s  {quantidade / em_lote:10.0f} empresas/s")
+    print(f"ganho       {individual / em_lote:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Latência e comandos SQL por requisição das rotas de escrita (PUT/DELETE de empresas e obrigações).
+
+Uso: ENV=test python -m benchmarks.bench_escritas [repeticoes]
+"""
+import random
+import sys
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from database import engine
+from main import app
+from benchmarks.utils import cronometrar, popular_empresas, preparar_banco
+
+EMPRESAS = 10_000
+
+
+def medir(nome: str, funcao, repeticoes: int):
+    comandos = 0
+
+    def contar(*args):
+        nonlocal comandos
+        comandos += 1
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        resultado = cronometrar(funcao, repeticoes)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    print(f"{nome:<46} {resultado}  comandos/req={comandos / repeticoes:.1f}")
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    client = TestClient(app)
+    preparar_banco()
+    popular_empresas(EMPRESAS, obrigacoes_por_empresa=2)
+    with engine.connect() as conn:
+        # 🔹 Obrigações das primeiras empresas: excluídas antes das próprias empresas
+        obrigacoes = conn.scalars(
+            text("SELECT id FROM obrigacoes_acessorias WHERE empresa_id <= :n ORDER BY id"), {"n": repeticoes}
+        ).all()
+
+    def esperar(response, status=200):
+        assert response.status_code == status, response.text
+
+    medir("PUT /empresas/{id}/", lambda: esperar(client.put(
+        f"/empresas/{random.randint(1, EMPRESAS)}/", json={"nome": f"Empresa {random.random()}"}
+    )), repeticoes)
+    medir("PUT /obrigacoes_acessorias/{id}/", lambda: esperar(client.put(
+        f"/obrigacoes_acessorias/{random.choice(obrigacoes)}/", json={"periodicidade": "ANUAL"}
+    )), repeticoes)
+    medir("DELETE /empresas/{id}/ (com obrigações, 400)", lambda: esperar(client.delete(
+        f"/empresas/{random.randint(repeticoes + 1, EMPRESAS)}/"
+    ), 400), repeticoes)
+
+    ids_obrigacoes = iter(obrigacoes)
+    medir("DELETE /obrigacoes_acessorias/{id}/", lambda: esperar(client.delete(
+        f"/obrigacoes_acessorias/{next(ids_obrigacoes)}/"
+    )), len(obrigacoes))
+    ids_empresas = iter(range(1, repeticoes + 1))
+    medir("DELETE /empresas/{id}/", lambda: esperar(client.delete(
+        f"/empresas/{next(ids_empresas)}/"
+    )), repeticoes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Partida a frio de um worker: do processo novo até a primeira resposta com banco.
+
+Cada rodada é um processo Python novo (como um worker recém-criado) que importa main, executa o
+lifespan da aplicação e faz a primeira requisição que usa o banco, direto pela interface ASGI.
+Mostra a mediana de cada etapa:
+  processo   - do spawn até o início do script (interpretador)
+  import     - import main (FastAPI, modelos, engines...)
+  lifespan   - inicialização do lifespan (engine e aquecimento do pool)
+  primeira   - primeira GET /empresas/?limit=10 (abre a conexão se o pool não foi aquecido)
+  total      - do spawn até a primeira resposta
+
+Uso: ENV=test python -m benchmarks.bench_inicializacao [rodadas]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.utils import preparar_banco
+
+WORKER = r"""
+import asyncio, json, time
+inicio = time.perf_counter()
+import main
+importado = time.perf_counter()
+
+async def chamar(caminho):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": caminho, "raw_path": caminho.encode(), "root_path": "", "query_string": b"limit=10",
+        "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80), "app": main.app,
+    }
+    status = []
+
+    async def receber():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensagem):
+        if mensagem["type"] == "http.response.start":
+            status.append(mensagem["status"])
+
+    await main.app(scope, receber, enviar)
+    assert status == [200], status
+
+async def rodar():
+    async with main.app.router.lifespan_context(main.app):
+        pronto = time.perf_counter()
+        await chamar("/empresas/")
+        respondido = time.perf_counter()
+    return pronto, respondido
+
+pronto, respondido = asyncio.run(rodar())
+print(json.dumps({"inicio": time.time() - (time.perf_counter() - inicio), "import": importado - inicio,
+                  "lifespan": pronto - importado, "primeira": respondido - pronto}))
+"""
+
+
+def rodada() -> dict:
+    spawn = time.time()
+    saida = subprocess.run([sys.executable, "-c", WORKER], capture_output=True, text=True, check=True, env=os.environ)
+    medidas = json.loads(saida.stdout.strip().splitlines()[-1])
+    return {
+        "processo": medidas["inicio"] - spawn,
+        "import": medidas["import"],
+        "lifespan": medidas["lifespan"],
+        "primeira": medidas["primeira"],
+        "total": medidas["inicio"] - spawn + medidas["import"] + medidas["lifespan"] + medidas["primeira"],
+    }
+
+
+def main():
+    rodadas = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    preparar_banco()
+    rodada()  # Aquecimento (cache de disco dos módulos e do .pyc)
+    medidas = [rodada() for _ in range(rodadas)]
+    print(f"{rodadas} rodadas (mediana, ms):")
+    for etapa in ("processo", "import", "lifespan", "primeira", "total"):
+        print(f"  {etapa:<9} {statistics.median(m[etapa] for m in medidas) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
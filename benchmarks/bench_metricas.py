@@ -0,0 +1,65 @@
+"""Custo por requisição do middleware de métricas (MiddlewareMetricas + RotaMedida).
+
+Chama uma rota assíncrona sem banco direto pela interface ASGI (sem HTTP nem TestClient), sem
+métricas, com as métricas padrão (total e banco) e com as fases (METRICAS_FASES=true, RotaMedida),
+e mostra o custo de cada modo em microssegundos por requisição.
+
+Uso: python -m benchmarks.bench_metricas [requisicoes]
+"""
+import asyncio
+import sys
+import time
+from fastapi import FastAPI
+from metricas import MiddlewareMetricas, RotaMedida
+
+
+def criar_app(modo: str) -> FastAPI:
+    app = FastAPI()
+    if modo == "fases":
+        app.router.route_class = RotaMedida
+    if modo != "sem":
+        app.add_middleware(MiddlewareMetricas, fases=modo == "fases")
+
+    @app.get("/itens/{item_id}")
+    async def obter_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+async def medir(app: FastAPI, requisicoes: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/itens/1", "raw_path": b"/itens/1", "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    async def receber():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensagem):
+        pass
+
+    for _ in range(1000):  # Aquecimento
+        await app(dict(scope), receber, enviar)
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await app(dict(scope), receber, enviar)
+    return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+
+def main():
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    # 🔹 Rodadas alternadas, menor tempo de cada: reduz o ruído da máquina
+    apps = {modo: criar_app(modo) for modo in ("sem", "padrao", "fases")}
+    tempos = {modo: [] for modo in apps}
+    for _ in range(5):
+        for modo, app in apps.items():
+            tempos[modo].append(asyncio.run(medir(app, requisicoes)))
+    sem, padrao, fases = (min(tempos[modo]) for modo in apps)
+    print(f"sem métricas: {sem:.1f} µs/req")
+    print(f"padrão (total e banco): {padrao:.1f} µs/req  custo: {padrao - sem:.1f} µs/req")
+    print(f"com fases (METRICAS_FASES=true): {fases:.1f} µs/req  custo: {fases - sem:.1f} µs/req")
+
+if __name__ == "__main__":
+    main()
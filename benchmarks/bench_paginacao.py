@@ -0,0 +1,47 @@
+"""Compara a paginação por deslocamento (skip/limit) com a paginação por cursor.
+
+Uso: ENV=test python -m benchmarks.bench_paginacao [quantidade_de_empresas]
+"""
+import sys
+from sqlalchemy import text
+from crud import get_empresas
+from database import SessionLocal
+from paginacao import codificar_cursor
+from benchmarks.utils import cronometrar, popular_empresas, preparar_banco
+
+LIMIT = 10
+PAGINA_PROFUNDA = 10_000
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else LIMIT * PAGINA_PROFUNDA
+    preparar_banco()
+    popular_empresas(quantidade)
+
+    skip_profundo = LIMIT * (PAGINA_PROFUNDA - 1)
+    db = SessionLocal()
+    try:
+        # Cursor equivalente ao que o cliente teria recebido ao fim da página 9.999
+        ultimo_id = db.execute(
+            text("SELECT id FROM empresas ORDER BY id OFFSET :skip LIMIT 1"), {"skip": skip_profundo - 1}
+        ).scalar_one()
+        cursor_profundo = codificar_cursor(ultimo_id)
+
+        cenarios = {
+            "offset_pagina_1": lambda: get_empresas(db, skip=0, limit=LIMIT),
+            f"offset_pagina_{PAGINA_PROFUNDA}": lambda: get_empresas(db, skip=skip_profundo, limit=LIMIT),
+            "cursor_pagina_1": lambda: get_empresas(db, limit=LIMIT),
+            f"cursor_pagina_{PAGINA_PROFUNDA}": lambda: get_empresas(db, limit=LIMIT, cursor=cursor_profundo),
+        }
+        print(f"{quantidade} empresas, limit={LIMIT}")
+        for nome, funcao in cenarios.items():
+            def executar():
+                funcao()
+                db.expunge_all()
+            print(f"{nome:<24} {cronometrar(executar)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Suíte de benchmarks por rota: vazão, p50 e p99 de cada rota de main.py sobre bases semeadas.
+
+Para cada volume de empresas (com N obrigações cada), recria as tabelas, popula direto no banco
+e chama as rotas em processo (TestClient): primeiro as leituras, depois as escritas. O resultado
+vai para um JSON com o commit, os volumes e as medidas por rota, para comparar entre commits.
+
+Uso:
+  ENV=test python -m benchmarks.bench_rotas --empresas 10000 100000 1000000 --obrigacoes 2 --saida atual.json
+  ENV=test python -m benchmarks.bench_rotas --saida atual.json --comparar anterior.json --tolerancia 0.2
+
+Com --comparar, sai com código 1 se o p50 de alguma rota piorou mais que a tolerância.
+As rotas usam recursos do PostgreSQL (ON CONFLICT, RETURNING em CTEs, pg_class), então a suíte
+roda só contra o Postgres configurado no .env.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from busca import indice_empresas
+from crud import reconstruir_resumo_obrigacoes
+from database import SessionLocal
+from main import app
+from benchmarks.utils import cronometrar, dados_empresa, popular_empresas, preparar_banco
+
+REPETICOES = 200
+# Rotas que devolvem a tabela inteira: poucas repetições bastam
+REPETICOES_EXPORTACAO = 3
+LINHAS_IMPORTACAO = 1_000
+EMPRESAS_POR_LOTE = 100
+
+
+def esperar(response, status: int = 200):
+    assert response.status_code == status, f"{response.request.method} {response.request.url}: {response.status_code} {response.text[:200]}"
+
+
+# Cenários na ordem de execução: (rota como em main.py, variante, requisição, repetições)
+def cenarios(client: TestClient, empresas: int, obrigacoes_por_empresa: int) -> list:
+    total_obrigacoes = empresas * obrigacoes_por_empresa
+    empresa = lambda: random.randint(1, empresas)
+    obrigacao = lambda: random.randint(1, total_obrigacoes)
+    # 🔹 Números acima dos semeados: CNPJ e e-mail novos a cada criação
+    numeros = iter(range(empresas + 1, sys.maxsize))
+    criadas, obrigacoes_criadas = [], []
+
+    def criar_empresa():
+        response = client.post("/empresas/", json=dados_empresa(next(numeros)))
+        esperar(response)
+        criadas.append(response.json()["id"])
+
+    def criar_obrigacao():
+        response = client.post("/obrigacoes_acessorias/", json={
+            "nome": f"Bench {next(numeros)}", "periodicidade": random.choice(["MENSAL", "TRIMESTRAL", "ANUAL"]),
+            "empresa_id": empresa(),
+        })
+        esperar(response)
+        obrigacoes_criadas.append(response.json()["id"])
+
+    def importar():
+        linhas = "".join(f"Importada {next(numeros)},ANUAL,{empresa()}\n" for _ in range(LINHAS_IMPORTACAO))
+        arquivo = ("obrigacoes.csv", f"nome,periodicidade,empresa_id\n{linhas}".encode(), "text/csv")
+        esperar(client.post("/obrigacoes_acessorias/importar", files={"arquivo": arquivo}))
+
+    get = lambda url, status=200: lambda: esperar(client.get(url() if callable(url) else url), status)
+    leituras = [
+        ("GET /", "", get("/"), REPETICOES),
+        ("GET /healthz", "", get("/healthz"), REPETICOES),
+        ("GET /readyz", "", get("/readyz"), REPETICOES),
+        ("GET /pool/", "", get("/pool/"), REPETICOES),
+        ("GET /cache/", "", get("/cache/"), REPETICOES),
+        ("GET /metrics", "", get("/metrics"), REPETICOES),
+        ("GET /empresas/", "limit=10", get("/empresas/?limit=10"), REPETICOES),
+        ("GET /empresas/", "skip profundo", get(lambda: f"/empresas/?skip={empresas - 10}&limit=10"), REPETICOES),
+        ("GET /empresas/", "fields=id,nome", get("/empresas/?limit=100&fields=id,nome"), REPETICOES),
+        ("GET /empresas/", "filtro nome", get(lambda: f"/empresas/?nome=Empresa%20{empresa()}"), REPETICOES),
+        ("GET /empresas/exportar", "ndjson", get("/empresas/exportar"), REPETICOES_EXPORTACAO),
+        ("GET /empresas/count", "estimada", get("/empresas/count"), REPETICOES),
+        ("GET /empresas/search", "", get(lambda: f"/empresas/search?q=empresa%20{empresa()}"), REPETICOES),
+        ("GET /empresas/{empresa_id}/", "", get(lambda: f"/empresas/{empresa()}/"), REPETICOES),
+        ("GET /obrigacoes_acessorias/", "limit=10", get("/obrigacoes_acessorias/?limit=10"), REPETICOES),
+        ("GET /obrigacoes_acessorias/", "filtro empresa_id",
+         get(lambda: f"/obrigacoes_acessorias/?empresa_id={empresa()}"), REPETICOES),
+        ("GET /obrigacoes_acessorias/exportar", "ndjson", get("/obrigacoes_acessorias/exportar"), REPETICOES_EXPORTACAO),
+        ("GET /obrigacoes_acessorias/count", "filtro periodicidade",
+         get("/obrigacoes_acessorias/count?periodicidade=ANUAL"), REPETICOES),
+        ("GET /obrigacoes_acessorias/resumo", "limit=100", get("/obrigacoes_acessorias/resumo?limit=100"), REPETICOES),
+        ("GET /obrigacoes_acessorias/calendario", "empresa, 12 meses",
+         get(lambda: f"/obrigacoes_acessorias/calendario?inicio=2026-01-01&fim=2026-12-31&empresa_id={empresa()}"),
+         REPETICOES),
+    ]
+    escritas = [
+        ("POST /empresas/", "", criar_empresa, REPETICOES),
+        ("POST /empresas/bulk", f"{EMPRESAS_POR_LOTE} empresas", lambda: esperar(client.post(
+            "/empresas/bulk", json=[dados_empresa(next(numeros)) for _ in range(EMPRESAS_POR_LOTE)]
+        )), REPETICOES // 10),
+        ("PUT /empresas/{empresa_id}/", "", lambda: esperar(client.put(
+            f"/empresas/{empresa()}/", json={"endereco": f"Rua {random.random()}"}
+        )), REPETICOES),
+        ("POST /obrigacoes_acessorias/", "", criar_obrigacao, REPETICOES),
+        ("POST /obrigacoes_acessorias/importar", f"{LINHAS_IMPORTACAO} linhas", importar, REPETICOES // 10),
+        ("PUT /obrigacoes_acessorias/{obrigacao_id}/", "", lambda: esperar(client.put(
+            f"/obrigacoes_acessorias/{obrigacao()}/", json={"periodicidade": random.choice(["MENSAL", "ANUAL"])}
+        )), REPETICOES),
+        # 🔹 Exclusões sobre o que foi criado acima: empresas sem obrigações e obrigações novas
+        ("DELETE /obrigacoes_acessorias/{obrigacao_id}/", "", lambda: esperar(client.delete(
+            f"/obrigacoes_acessorias/{obrigacoes_criadas.pop()}/"
+        )), REPETICOES),
+        ("DELETE /empresas/{empresa_id}/", "", lambda: esperar(client.delete(f"/empresas/{criadas.pop()}/")), REPETICOES),
+    ]
+    return leituras + escritas
+
+
+# Rotas de main.py sem cenário: a suíte precisa acompanhar as rotas novas
+def rotas_sem_cenario(lista: list) -> list:
+    cobertas = {rota for rota, *_ in lista}
+    return sorted(
+        f"{metodo} {rota.path}"
+        for rota in app.routes if isinstance(rota, APIRoute)
+        for metodo in rota.methods
+        if f"{metodo} {rota.path}" not in cobertas
+    )
+
+
+def medir_volume(empresas: int, obrigacoes_por_empresa: int) -> list:
+    preparar_banco()
+    popular_empresas(empresas, obrigacoes_por_empresa=obrigacoes_por_empresa)
+    with SessionLocal() as db:
+        reconstruir_resumo_obrigacoes(db)  # 🔹 As obrigações semeadas não passaram pela API
+
+    resultados = []
+    with TestClient(app) as client:  # Executa o lifespan (índice de busca)
+        while not indice_empresas.pronto:
+            time.sleep(0.1)
+        lista = cenarios(client, empresas, obrigacoes_por_empresa)
+        for faltando in rotas_sem_cenario(lista):
+            print(f"⚠️  Sem cenário: {faltando}")
+        for rota, variante, requisicao, repeticoes in lista:
+            requisicao()  # Aquecimento (planos, caches de conexão)
+            medidas = cronometrar(requisicao, repeticoes)
+            resultado = {
+                "rota": rota, "variante": variante, "repeticoes": repeticoes,
+                **medidas, "req_s": round(1000 / medidas["media_ms"], 1),
+            }
+            resultados.append(resultado)
+            print(f"  {rota:<46} {variante:<22} p50={medidas['p50_ms']:>9.2f}ms  p99={medidas['p99_ms']:>9.2f}ms  "
+                  f"req/s={resultado['req_s']:>8.1f}")
+    return resultados
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+# Rotas cujo p50 piorou mais que a tolerância em relação ao resultado anterior
+def comparar(atual: dict, anterior: dict, tolerancia: float) -> list:
+    chave = lambda volume, r: (volume, r["rota"], r["variante"])
+    base = {chave(v["empresas"], r): r for v in anterior["volumes"] for r in v["resultados"]}
+    regressoes = []
+    for volume in atual["volumes"]:
+        for resultado in volume["resultados"]:
+            antes = base.get(chave(volume["empresas"], resultado))
+            if antes and resultado["p50_ms"] > antes["p50_ms"] * (1 + tolerancia):
+                regressoes.append((volume["empresas"], resultado["rota"], resultado["variante"], antes["p50_ms"], resultado["p50_ms"]))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--empresas", type=int, nargs="+", default=[10_000], help="volumes de empresas (ex.: 10000 100000 1000000)")
+    parser.add_argument("--obrigacoes", type=int, default=2, help="obrigações por empresa")
+    parser.add_argument("--saida", default="bench_rotas.json", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora aceita no p50 (0.2 = 20%%)")
+    argumentos = parser.parse_args()
+
+    relatorio = {
+        "commit": commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "obrigacoes_por_empresa": argumentos.obrigacoes,
+        "volumes": [],
+    }
+    for empresas in argumentos.empresas:
+        print(f"{empresas:,} empresas x {argumentos.obrigacoes} obrigações")
+        relatorio["volumes"].append({"empresas": empresas, "resultados": medir_volume(empresas, argumentos.obrigacoes)})
+
+    with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados em {argumentos.saida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), argumentos.tolerancia)
+        for empresas, rota, variante, antes, depois in regressoes:
+            print(f"❌ {empresas:,} empresas  {rota} {variante}: p50 {antes:.2f}ms -> {depois:.2f}ms")
+        if regressoes:
+            raise SystemExit(1)
+        print("✅ Nenhuma regressão acima da tolerância")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Página de 1.000 empresas: caminho do response_model contra o caminho rápido (linhas + orjson).
+
+O caminho do response_model é o que o FastAPI faz quando a rota devolve entidades do ORM:
+carrega as entidades, valida em schemas.Empresa (from_attributes), converte para dict e
+codifica com o json da biblioteca padrão (JSONResponse). O caminho rápido monta os dicts
+direto das linhas (crud.get_empresas_resposta) e codifica com o orjson (ORJSONResponse).
+
+Uso: ENV=test python -m benchmarks.bench_serializacao [obrigacoes_por_empresa] [repeticoes]
+"""
+import sys
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from crud import get_empresas, get_empresas_resposta
+from database import SessionLocal
+from schemas import Empresa
+from benchmarks.utils import cronometrar, popular_empresas, preparar_banco
+
+LIMIT = 1_000
+
+
+def main():
+    por_empresa = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    preparar_banco()
+    popular_empresas(LIMIT, obrigacoes_por_empresa=por_empresa)
+    adaptador = TypeAdapter(List[Empresa])
+
+    with SessionLocal() as db:
+        def response_model():
+            empresas = get_empresas(db, limit=LIMIT)
+            conteudo = adaptador.dump_python(adaptador.validate_python(empresas, from_attributes=True), mode="json")
+            corpo = JSONResponse(conteudo).body
+            db.expunge_all()  # 🔹 Cada requisição carrega as entidades de novo
+            return corpo
+
+        def rapido():
+            return ORJSONResponse(get_empresas_resposta(db, limit=LIMIT)[1]).body
+
+        assert response_model() == rapido(), "As duas respostas deveriam ser idênticas"
+        print(f"{LIMIT} empresas x {por_empresa} obrigações por página ({len(rapido()) / 1024:.0f} KiB)")
+        resultados = {}
+        for nome, funcao in (("response_model", response_model), ("rapido", rapido)):
+            funcao()  # Aquecimento
+            resultados[nome] = cronometrar(funcao, repeticoes)
+            print(f"  {nome:<15} p50={resultados[nome]['p50_ms']:>8.2f}ms  p99={resultados[nome]['p99_ms']:>8.2f}ms")
+        print(f"  ganho no p50: {resultados['response_model']['p50_ms'] / resultados['rapido']['p50_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
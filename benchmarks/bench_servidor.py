@@ -0,0 +1,116 @@
+"""Escala do servidor de produção (servidor.py) com o número de workers.
+
+Para cada quantidade de workers, sobe `python servidor.py --workers N`, espera GET /readyz e
+dispara GET /empresas/{id}/ e GET /empresas/?limit=10 por um tempo fixo. A carga vem de vários
+processos clientes (um cliente httpx em um só processo satura antes do servidor). Mostra req/s,
+p50, p99 e a eficiência em relação a N vezes o resultado de 1 worker.
+
+Uso: ENV=test python -m benchmarks.bench_servidor [--workers 1 2 4] [--clientes 200] [--segundos 15]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.utils import popular_empresas, preparar_banco
+
+PORTA = 8766
+URL = f"http://127.0.0.1:{PORTA}"
+EMPRESAS = 10_000
+
+
+def subir_servidor(workers: int) -> subprocess.Popen:
+    processo = subprocess.Popen(
+        [sys.executable, "servidor.py", "--workers", str(workers), "--porta", str(PORTA), "--host", "127.0.0.1",
+         "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+    # 🔹 Um /readyz 200 só diz que um worker está pronto: exige várias respostas seguidas para
+    # dar tempo de os outros terminarem o lifespan (pool aquecido) antes da carga
+    prontos, limite = 0, time.monotonic() + 60
+    while time.monotonic() < limite:
+        try:
+            prontos = prontos + 1 if httpx.get(f"{URL}/readyz", timeout=1).status_code == 200 else 0
+        except httpx.TransportError:
+            prontos = 0
+        if prontos >= 10 * workers:
+            return processo
+        time.sleep(0.05)
+    processo.kill()
+    raise RuntimeError("Servidor não ficou pronto")
+
+
+async def carga(clientes: int, segundos: float) -> tuple:
+    latencias, erros = [], 0
+    limite = time.perf_counter() + segundos
+
+    async def cliente(http: httpx.AsyncClient):
+        nonlocal erros
+        while time.perf_counter() < limite:
+            url = f"/empresas/{random.randint(1, EMPRESAS)}/" if random.random() < 0.5 else "/empresas/?limit=10"
+            inicio = time.perf_counter()
+            try:
+                response = await http.get(url)
+                response.raise_for_status()
+                latencias.append(time.perf_counter() - inicio)
+            except httpx.HTTPError:
+                erros += 1
+
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=URL, limits=limites, timeout=60) as http:
+        await asyncio.gather(*(cliente(http) for _ in range(clientes)))
+    return latencias, erros
+
+
+def processo_cliente(argumentos: tuple) -> tuple:
+    return asyncio.run(carga(*argumentos))
+
+
+def medir(workers: int, clientes: int, segundos: float, processos: int) -> dict:
+    servidor = subir_servidor(workers)
+    try:
+        with multiprocessing.Pool(processos) as pool:
+            inicio = time.perf_counter()
+            resultados = pool.map(processo_cliente, [(clientes // processos, segundos)] * processos)
+            duracao = time.perf_counter() - inicio
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    latencias = sorted(latencia for parcial, _ in resultados for latencia in parcial)
+    return {
+        "req_s": round(len(latencias) / duracao, 1),
+        "p50_ms": round(latencias[len(latencias) // 2] * 1000, 1),
+        "p99_ms": round(latencias[int(len(latencias) * 0.99)] * 1000, 1),
+        "erros": sum(erros for _, erros in resultados),
+    }
+
+
+def main():
+    nucleos = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, *(n for n in (2, 4, 8, 16) if n <= nucleos), nucleos}))
+    parser.add_argument("--clientes", type=int, default=200, help="conexões simultâneas no total")
+    parser.add_argument("--segundos", type=float, default=15)
+    parser.add_argument("--processos", type=int, default=max(2, nucleos // 2), help="processos clientes")
+    argumentos = parser.parse_args()
+
+    preparar_banco()
+    popular_empresas(EMPRESAS, obrigacoes_por_empresa=2)
+    print(f"{nucleos} núcleos, {argumentos.clientes} clientes em {argumentos.processos} processos, "
+          f"{argumentos.segundos:.0f}s por rodada")
+    base = None
+    for workers in argumentos.workers:
+        resultado = medir(workers, argumentos.clientes, argumentos.segundos, argumentos.processos)
+        base = base or resultado["req_s"] / workers
+        eficiencia = resultado["req_s"] / (base * workers)
+        print(f"  workers={workers:<3} req/s={resultado['req_s']:>9.1f}  p50={resultado['p50_ms']:>7.1f}ms  "
+              f"p99={resultado['p99_ms']:>7.1f}ms  erros={resultado['erros']}  eficiência={eficiencia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Validação de 1M de CNPJs: validador escalar (linha a linha) contra a API em lote.
+
+Metade dos valores vem sem formatação, um terço formatado (00.000.000/0000-00) e o resto com
+dígitos verificadores errados. Como referência, mede também a validação antiga, que só contava
+os dígitos (sem dígitos verificadores).
+
+Uso: python -m benchmarks.bench_validacao [quantidade]
+"""
+import random
+import sys
+import time
+from validacao import completar_cnpj, validar_cnpj, validar_cnpjs
+
+
+def gerar_valores(quantidade: int) -> list:
+    valores = []
+    for numero in range(quantidade):
+        cnpj = completar_cnpj(f"{numero:08d}{numero % 9 + 1:04d}")
+        sorteio = random.random()
+        if sorteio < 0.5:
+            valores.append(cnpj)
+        elif sorteio < 0.83:
+            valores.append(f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}")
+        else:
+            valores.append(cnpj[:13] + str((int(cnpj[13]) + 1) % 10))
+    return valores
+
+
+def antiga(valores: list) -> list:
+    resultado = []
+    for valor in valores:
+        cnpj = "".join(filter(str.isdigit, valor))
+        resultado.append(cnpj if len(cnpj) == 14 else None)
+    return resultado
+
+
+def escalar(valores: list) -> list:
+    resultado = []
+    for valor in valores:
+        try:
+            resultado.append(validar_cnpj(valor))
+        except ValueError:
+            resultado.append(None)
+    return resultado
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(42)
+    valores = gerar_valores(quantidade)
+    print(f"{quantidade:,} CNPJs")
+    resultados = {}
+    for nome, funcao in (("antiga (sem DV)", antiga), ("escalar", escalar), ("lote", validar_cnpjs)):
+        inicio = time.perf_counter()
+        resultados[nome] = funcao(valores)
+        duracao = time.perf_counter() - inicio
+        print(f"  {nome:<16} {duracao:6.2f}s  {quantidade / duracao:>12,.0f} CNPJs/s  "
+              f"válidos={sum(r is not None for r in resultados[nome]):,}")
+    assert resultados["escalar"] == resultados["lote"]
+
+
+if __name__ == "__main__":
+    main()
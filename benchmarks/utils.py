@@ -0,0 +1,59 @@
+import os
+import statistics
+import time
+from sqlalchemy import text
+from database import engine
+from models import Base  # Importa os modelos para registrar as tabelas na metadata
+from validacao import completar_cnpj
+
+# Os benchmarks apagam e populam tabelas: só rodam contra o banco de teste
+def preparar_banco():
+    if os.getenv("ENV") != "test":
+        raise SystemExit("Defina ENV=test: os benchmarks recriam as tabelas do banco configurado.")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+# Popula empresas (e, opcionalmente, obrigações por empresa) direto no banco, sem passar pela API
+def popular_empresas(quantidade: int, obrigacoes_por_empresa: int = 0):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO empresas (nome, cnpj, endereco, email, telefone)
+            SELECT 'Empresa ' || g, lpad(g::text, 14, '0'), 'Rua ' || g,
+                   'empresa' || g || '@bench.com', '81999999999'
+            FROM generate_series(1, :quantidade) AS g
+        """), {"quantidade": quantidade})
+        if obrigacoes_por_empresa:
+            conn.execute(text("""
+                INSERT INTO obrigacoes_acessorias (nome, periodicidade, empresa_id)
+                SELECT 'Obrigação ' || n, (ARRAY['MENSAL', 'TRIMESTRAL', 'ANUAL'])[1 + n % 3], e.id
+                FROM empresas AS e CROSS JOIN generate_series(1, :por_empresa) AS n
+            """), {"por_empresa": obrigacoes_por_empresa})
+        conn.execute(text("ANALYZE"))
+
+# CNPJ com dígitos verificadores válidos a partir de um número sequencial
+def gerar_cnpj(numero: int) -> str:
+    return completar_cnpj(f"{numero:08d}0001")
+
+# Payload de criação de empresa usado pelos benchmarks da API
+def dados_empresa(numero: int) -> dict:
+    return {
+        "nome": f"Empresa {numero}",
+        "cnpj": gerar_cnpj(numero),
+        "endereco": f"Rua {numero}",
+        "email": f"empresa{numero}@bench.com",
+        "telefone": "81999999999",
+    }
+
+# Executa a função várias vezes e devolve as latências em milissegundos
+def cronometrar(funcao, repeticoes: int = 50) -> dict:
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    amostras.sort()
+    return {
+        "p50_ms": round(statistics.median(amostras), 3),
+        "p99_ms": round(amostras[min(len(amostras) - 1, int(len(amostras) * 0.99))], 3),
+        "media_ms": round(statistics.fmean(amostras), 3),
+    }
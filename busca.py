@@ -0,0 +1,241 @@
+import logging
+import os
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import Optional
+from sqlalchemy import String, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+import database
+from models import AlteracoesBusca, Empresa
+
+# Resultados devolvidos por padrão e no máximo pela busca
+LIMITE_BUSCA = 10
+LIMITE_BUSCA_MAXIMO = 50
+# Espera (segundos) antes da segunda tentativa de construir o índice; dobra a cada falha até a máxima
+BUSCA_ESPERA_INICIAL = 1.0
+BUSCA_ESPERA_MAXIMA = 60.0
+# Segundos entre as verificações de alterações na tabela de empresas feitas por outros processos
+# (outros workers, SQL direto, cargas em massa); 0 desativa
+BUSCA_INTERVALO_VERIFICACAO = float(os.getenv("BUSCA_INTERVALO_VERIFICACAO", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+# Minúsculas e sem acentos: "São José" -> "sao jose"
+def normalizar(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return " ".join("".join(c for c in decomposto if not unicodedata.combining(c)).split())
+
+
+# Chaves de uma empresa: o nome a partir de cada palavra ("recife" acha "Sport Club do Recife") e o CNPJ
+def _chaves(nome: str, cnpj: str) -> list:
+    palavras = normalizar(nome).split()
+    return [" ".join(palavras[i:]) for i in range(len(palavras))] + [cnpj]
+
+
+class AlteracaoEmpresas:
+    """Linhas de empresas previstas e gravadas por uma escrita do crud (IndicePrefixos.alterando)."""
+
+    __slots__ = ("previstas", "feitas")
+
+    def __init__(self, previstas: int):
+        self.previstas = previstas
+        self.feitas = 0
+
+
+class IndicePrefixos:
+    """Índice em memória de nome e CNPJ das empresas para autocomplete.
+
+    Um array ordenado de (chave, id): a busca é um bisect até o primeiro prefixo e uma
+    varredura curta a partir dele. Enquanto não foi construído, "pronto" é False e a
+    busca cai no banco (buscar_no_banco).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas = []  # [(chave, id)] ordenado
+        self._empresas = {}  # id -> (nome, cnpj, chaves)
+        self._pendentes = None  # Alterações recebidas durante a construção
+        self.pronto = False
+        self.escritas = 0  # Alterações de empresas feitas por este processo (ver alterando)
+
+    def construir(self, db: Session):
+        with self._lock:
+            self._pendentes = []
+        try:
+            empresas = {}
+            resultado = db.execute(select(Empresa.id, Empresa.nome, Empresa.cnpj).execution_options(yield_per=10_000))
+            for empresa_id, nome, cnpj in resultado:
+                empresas[empresa_id] = (nome, cnpj, _chaves(nome, cnpj))
+            entradas = sorted((chave, empresa_id) for empresa_id, (_, _, chaves) in empresas.items() for chave in chaves)
+        except BaseException:
+            # 🔹 Sem isso, as escritas seguintes se acumulariam em _pendentes para sempre
+            with self._lock:
+                self._reaplicar_pendentes()
+            raise
+
+        with self._lock:
+            self._empresas, self._entradas = empresas, entradas
+            self.pronto = True
+            # 🔹 Reaplica o que foi gravado enquanto a tabela era lida
+            self._reaplicar_pendentes()
+
+    # Com o lock: aplica as alterações recebidas durante a construção (se há índice) e volta a aplicá-las direto
+    def _reaplicar_pendentes(self):
+        pendentes, self._pendentes = self._pendentes or [], None
+        if self.pronto:
+            for operacao, argumentos in pendentes:
+                operacao(*argumentos)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas, self._empresas, self._pendentes = [], {}, None
+            self.pronto = False
+
+    def _remover(self, empresa_id: int):
+        anterior = self._empresas.pop(empresa_id, None)
+        if anterior is None:
+            return
+        for chave in anterior[2]:
+            posicao = bisect_left(self._entradas, (chave, empresa_id))
+            if posicao < len(self._entradas) and self._entradas[posicao] == (chave, empresa_id):
+                del self._entradas[posicao]
+
+    def _guardar(self, empresa_id: int, nome: str, cnpj: str):
+        self._remover(empresa_id)
+        chaves = _chaves(nome, cnpj)
+        self._empresas[empresa_id] = (nome, cnpj, chaves)
+        for chave in chaves:
+            insort(self._entradas, (chave, empresa_id))
+
+    def _aplicar(self, operacao, *argumentos):
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append((operacao, argumentos))
+            elif self.pronto:
+                operacao(*argumentos)
+
+    # Envolve cada escrita do crud que move o contador do banco (contador_empresas), do comando ao
+    # commit: o crud informa as linhas previstas e, depois do commit, as de fato gravadas em `feitas`.
+    # A soma vem antes do comando e a correção depois do commit (ou do rollback), então `escritas`
+    # nunca fica atrás do contador: a verificação periódica pode adiar uma reconstrução, mas não
+    # confunde uma escrita deste processo com a de outro.
+    @contextmanager
+    def alterando(self, previstas: int = 1):
+        alteracao = AlteracaoEmpresas(previstas)
+        self._somar_escritas(previstas)
+        try:
+            yield alteracao
+        finally:
+            self._somar_escritas(alteracao.feitas - previstas)
+
+    def _somar_escritas(self, quantidade: int):
+        with self._lock:
+            self.escritas += quantidade
+
+    # Chamados pelo crud depois do commit de cada escrita
+    def guardar(self, empresa_id: int, nome: str, cnpj: str):
+        self._aplicar(self._guardar, empresa_id, nome, cnpj)
+
+    def remover(self, empresa_id: int):
+        self._aplicar(self._remover, empresa_id)
+
+    def buscar(self, termo: str, limite: int = LIMITE_BUSCA) -> list:
+        prefixo = normalizar(termo)
+        encontrados = {}
+        with self._lock:
+            posicao = bisect_left(self._entradas, (prefixo,))
+            while posicao < len(self._entradas) and len(encontrados) < limite:
+                chave, empresa_id = self._entradas[posicao]
+                if not chave.startswith(prefixo):
+                    break
+                encontrados.setdefault(empresa_id, None)
+                posicao += 1
+            return [
+                {"id": empresa_id, "nome": self._empresas[empresa_id][0], "cnpj": self._empresas[empresa_id][1]}
+                for empresa_id in encontrados
+            ]
+
+
+# Letras acentuadas (maiúsculas e minúsculas) e as mesmas sem acento, para o translate() do banco.
+# Derivadas de normalizar(): o banco e o índice em memória tiram os mesmos acentos.
+ACENTUADAS = "ÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝáàâãäåéèêëíìîïóòôõöúùûüçñýÿ"
+SEM_ACENTOS = "".join(normalizar(letra) for letra in ACENTUADAS)
+
+# O nome como o índice em memória o vê (minúsculas, sem acentos, espaços simples), precedido de um
+# espaço: "% sao jo%" acha o prefixo no início de qualquer palavra. A mesma expressão é indexada
+# (GIN pg_trgm, ix_empresas_nome_busca_trgm, migração d3f9a6c1b274); as constantes vão no SQL, não
+# como parâmetros, para o planejador reconhecer a expressão do índice.
+def nome_para_busca():
+    return func.regexp_replace(
+        literal_column("' '", String) + func.translate(func.lower(Empresa.nome), literal_column(f"'{ACENTUADAS}'"),
+                                               literal_column(f"'{SEM_ACENTOS}'")),
+        literal_column(r"'\s+'"), literal_column("' '"), literal_column("'g'"),
+    )
+
+
+# Busca direta no banco, usada enquanto o índice em memória não está pronto. Mesmas regras do
+# índice: prefixo de palavra do nome, sem diferenciar maiúsculas nem acentos, ou prefixo do CNPJ.
+def buscar_no_banco(db: Session, termo: str, limite: int = LIMITE_BUSCA) -> list:
+    prefixo = normalizar(termo)
+    condicao = nome_para_busca().contains(" " + prefixo, autoescape=True)
+    if prefixo.isdigit():
+        condicao = or_(condicao, Empresa.cnpj.startswith(prefixo))
+    consulta = select(Empresa.id, Empresa.nome, Empresa.cnpj).where(condicao).order_by(Empresa.nome).limit(limite)
+    return [dict(linha._mapping) for linha in db.execute(consulta)]
+
+
+def buscar_empresas(db: Session, termo: str, limite: Optional[int] = None) -> list:
+    limite = min(limite or LIMITE_BUSCA, LIMITE_BUSCA_MAXIMO)
+    if indice_empresas.pronto:
+        return indice_empresas.buscar(termo, limite)
+    return buscar_no_banco(db, termo, limite)
+
+
+indice_empresas = IndicePrefixos()
+
+
+# Alterações que mudam a busca (empresas inseridas ou excluídas, nome ou CNPJ alterados) confirmadas
+# por qualquer processo: uma linha somada por trigger no commit (models.AlteracoesBusca). O incremento
+# da versao nas escritas de obrigações não a move. Custo constante, sem ler a tabela de empresas.
+def contador_empresas(db: Session) -> int:
+    return db.scalar(select(AlteracoesBusca.total).where(AlteracoesBusca.id == 1)) or 0
+
+
+# Constrói o índice fora da thread da aplicação: a API sobe na hora e usa o banco até ficar pronto.
+# Se falhar (ex.: banco fora do ar na inicialização), tenta de novo com espera crescente, até
+# BUSCA_ESPERA_MAXIMA segundos entre tentativas. Depois de pronto, a cada BUSCA_INTERVALO_VERIFICACAO
+# segundos compara o contador do banco com as escritas deste processo (já aplicadas no índice pelo
+# crud) e só reconstrói o índice se outro processo alterou empresas: a busca fica no máximo esse
+# intervalo sem ver essas escritas. O evento devolvido encerra a thread.
+def construir_indice_em_segundo_plano() -> threading.Event:
+    parar = threading.Event()
+
+    def manter():
+        espera = BUSCA_ESPERA_INICIAL
+        externas = None  # Alterações de outros processos já refletidas no índice
+        while not parar.is_set():
+            try:
+                with database.SessionLocal() as db:
+                    # 🔹 O contador antes das escritas próprias: toda escrita contada no banco já está
+                    # em `escritas`, então a diferença nunca passa das alterações de outros processos
+                    atual = contador_empresas(db) - indice_empresas.escritas
+                if externas is None or atual > externas or not indice_empresas.pronto:
+                    with database.SessionLocal() as db:
+                        # 🔹 Um snapshot só: o contador lido depois de construir conta exatamente as
+                        # escritas confirmadas que o índice leu, nem uma a mais
+                        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                        indice_empresas.construir(db)
+                        externas = contador_empresas(db) - indice_empresas.escritas
+                if not BUSCA_INTERVALO_VERIFICACAO:
+                    return
+                intervalo, espera = BUSCA_INTERVALO_VERIFICACAO, BUSCA_ESPERA_INICIAL
+            except Exception:
+                logger.exception("Falha ao construir o índice de busca; nova tentativa em %.0f s (a busca segue pelo banco)", espera)
+                intervalo, espera = espera, min(espera * 2, BUSCA_ESPERA_MAXIMA)
+            parar.wait(intervalo)
+
+    threading.Thread(target=manter, name="indice-busca", daemon=True).start()
+    return parar
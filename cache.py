@@ -0,0 +1,140 @@
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Configuração do cache (via .env)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+CACHE_TAMANHO_MAXIMO = int(os.getenv("CACHE_TAMANHO_MAXIMO", "10000"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))  # Segundos
+CACHE_CONTAGEM_TTL = float(os.getenv("CACHE_CONTAGEM_TTL", "5"))  # Segundos
+
+
+class BackendCache(ABC):
+    """Armazenamento usado pelo Cache. Para um cache compartilhado entre processos
+    (ex.: Redis), implemente estes quatro métodos e registre a classe em BACKENDS."""
+
+    @abstractmethod
+    def get(self, chave) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, chave, valor):
+        ...
+
+    @abstractmethod
+    def delete(self, chave):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class BackendMemoria(BackendCache):
+    """LRU em memória do processo, com expiração por TTL."""
+
+    def __init__(self, tamanho_maximo: int = CACHE_TAMANHO_MAXIMO, ttl: float = CACHE_TTL):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)  # 🔹 Remove o usado há mais tempo
+
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+
+class BackendNulo(BackendCache):
+    """Desativa o cache (CACHE_BACKEND=nenhum)."""
+
+    def __init__(self, **opcoes):
+        pass  # 🔹 Aceita (e ignora) as opções dos outros backends
+
+    def get(self, chave):
+        return None
+
+    def set(self, chave, valor):
+        pass
+
+    def delete(self, chave):
+        pass
+
+    def clear(self):
+        pass
+
+
+BACKENDS = {"memoria": BackendMemoria, "nenhum": BackendNulo}
+
+
+class Cache:
+    """Cache de leitura com contadores de acertos e falhas, independente do backend."""
+
+    def __init__(self, backend: BackendCache):
+        self.backend = backend
+        self.acertos = 0
+        self.falhas = 0
+
+    def buscar(self, chave):
+        valor = self.backend.get(chave)
+        if valor is None:
+            self.falhas += 1
+        else:
+            self.acertos += 1
+        return valor
+
+    def guardar(self, chave, valor):
+        self.backend.set(chave, valor)
+
+    def invalidar(self, *chaves):
+        for chave in chaves:
+            self.backend.delete(chave)
+
+    def limpar(self):
+        self.backend.clear()
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.falhas
+        return {
+            "backend": type(self.backend).__name__,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+        }
+
+
+def criar_cache(backend: str = CACHE_BACKEND, **opcoes) -> Cache:
+    if backend not in BACKENDS:
+        raise ValueError(f"CACHE_BACKEND inválido: {backend}. Opções: {', '.join(BACKENDS)}")
+    return Cache(BACKENDS[backend](**opcoes))
+
+
+# Detalhe das empresas já serializado (schemas.Empresa), por id
+cache_empresas = criar_cache()
+# Totais das listagens (GET /empresas/count, /obrigacoes_acessorias/count), limpos a cada escrita
+cache_contagens = criar_cache(tamanho_maximo=1000, ttl=CACHE_CONTAGEM_TTL)
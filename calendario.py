@@ -0,0 +1,81 @@
+from datetime import date
+from typing import Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Date, DateTime, Integer, String, cast, column, func, literal, literal_column, select, true, values
+import database
+from exportacao import FORMATOS_EXPORTACAO, LINHAS_POR_LOTE, formatar_csv, formatar_ndjson
+from models import ObrigacaoAcessoria
+from schemas import PeriodicidadeEnum
+
+# Meses de cada período de apuração. O vencimento é o último dia do período:
+# MENSAL todo fim de mês, TRIMESTRAL em 31/03, 30/06, 30/09 e 31/12, ANUAL em 31/12
+MESES_POR_PERIODO = {PeriodicidadeEnum.MENSAL: 1, PeriodicidadeEnum.TRIMESTRAL: 3, PeriodicidadeEnum.ANUAL: 12}
+# Maior intervalo aceito em uma requisição (5 anos)
+DIAS_MAXIMOS_CALENDARIO = 5 * 366
+
+COLUNAS_CALENDARIO = ["vencimento", "obrigacao_id", "nome", "periodicidade", "empresa_id"]
+
+
+# Uma consulta para o intervalo inteiro: os meses do intervalo (generate_series) cruzados com as
+# periodicidades dão as datas de vencimento (o último dia de cada mês em que o período fecha), e
+# cada data é juntada (LATERAL) às obrigações da periodicidade. O plano é um nested loop sobre os
+# vencimentos já ordenados: o ORDER BY final só ordena as obrigações dentro de cada vencimento
+# (incremental sort), e as primeiras linhas saem sem esperar o resultado inteiro.
+def consulta_calendario(inicio: date, fim: date, empresa_id: Optional[int] = None):
+    periodos = values(column("periodicidade", String), column("meses", Integer), name="periodos").data(
+        [(periodicidade.value, meses) for periodicidade, meses in MESES_POR_PERIODO.items()]
+    )
+    mes = func.generate_series(
+        cast(literal(inicio.replace(day=1)), DateTime), cast(literal(fim), DateTime), literal_column("interval '1 month'")
+    ).table_valued("inicio_mes").render_derived(name="meses")
+    vencimento = cast(mes.c.inicio_mes + literal_column("interval '1 month'") - literal_column("interval '1 day'"), Date)
+    vencimentos = (
+        select(vencimento.label("vencimento"), periodos.c.periodicidade, periodos.c.meses)
+        .select_from(mes.join(periodos, cast(func.extract("month", mes.c.inicio_mes), Integer) % periodos.c.meses == 0))
+        .where(vencimento.between(inicio, fim))
+        .order_by(vencimento, periodos.c.meses)
+        .subquery("vencimentos")
+    )
+    obrigacoes = select(
+        ObrigacaoAcessoria.id, ObrigacaoAcessoria.nome, ObrigacaoAcessoria.periodicidade, ObrigacaoAcessoria.empresa_id
+    ).where(ObrigacaoAcessoria.periodicidade == vencimentos.c.periodicidade)
+    if empresa_id is not None:
+        obrigacoes = obrigacoes.where(ObrigacaoAcessoria.empresa_id == empresa_id)
+    obrigacoes = obrigacoes.lateral("obrigacoes")
+    return (
+        select(
+            vencimentos.c.vencimento,
+            obrigacoes.c.id.label("obrigacao_id"),
+            obrigacoes.c.nome,
+            obrigacoes.c.periodicidade,
+            obrigacoes.c.empresa_id,
+        )
+        .select_from(vencimentos.join(obrigacoes, true()))
+        # 🔹 Em cada data, a ordem das periodicidades em MESES_POR_PERIODO (MENSAL, TRIMESTRAL, ANUAL)
+        .order_by(vencimentos.c.vencimento, vencimentos.c.meses, obrigacoes.c.id)
+    )
+
+
+# Gera o calendário em blocos, ordenado por vencimento, periodicidade e obrigação.
+# Como na exportação, a sessão é própria do gerador e as linhas vêm de um cursor no servidor.
+def gerar_calendario(inicio: date, fim: date, empresa_id: Optional[int], formato: str) -> Iterator[bytes]:
+    with database.SessionLocal() as sessao:
+        if formato == "csv":
+            yield formatar_csv([COLUNAS_CALENDARIO])
+        resultado = sessao.execute(consulta_calendario(inicio, fim, empresa_id).execution_options(yield_per=LINHAS_POR_LOTE))
+        for lote in resultado.partitions():
+            yield formatar_ndjson(COLUNAS_CALENDARIO, lote) if formato == "ndjson" else formatar_csv(lote)
+
+
+# Resposta em streaming com os vencimentos de todas as obrigações (ou de uma empresa) no intervalo
+def calendario(inicio: date, fim: date, empresa_id: Optional[int], formato: str) -> StreamingResponse:
+    if formato not in FORMATOS_EXPORTACAO:
+        raise HTTPException(status_code=400, detail="Formato não suportado. Use 'ndjson' ou 'csv'")
+    if fim < inicio or (fim - inicio).days > DIAS_MAXIMOS_CALENDARIO:
+        raise HTTPException(status_code=400, detail="Intervalo inválido: 'fim' deve ser posterior a 'inicio', em até 5 anos")
+    return StreamingResponse(
+        gerar_calendario(inicio, fim, empresa_id, formato),
+        media_type=FORMATOS_EXPORTACAO[formato],
+        headers={"Content-Disposition": f'attachment; filename="calendario.{formato}"'},
+    )
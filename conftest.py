@@ -1,41 +1,22 @@
+import os
+
+# 🔹 Nos testes, o mesmo comando repetido em uma requisição (N+1) derruba a requisição
+os.environ.setdefault("DB_N_MAIS_UM", "falhar")
+# 🔹 Liga a medição por fase (RotaMedida) para os testes do Server-Timing completo
+os.environ.setdefault("METRICAS_FASES", "true")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from database import Base, get_db
+from busca import indice_empresas
+from cache import cache_contagens, cache_empresas
+from database import DATABASE_URL, Base, get_db
 from main import app
-from dotenv import load_dotenv
-from pathlib import Path
-import os
 
 from models import Empresa, ObrigacaoAcessoria
 
-# Carregar o arquivo .env explicitamente, direto.
-load_dotenv(dotenv_path=Path('.env'))
-
-# Recuperar variáveis de ambiente com valores padrão para evitar erros
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-ENV = os.getenv("ENV", "dbdcifre_test")  # Assume "dbdcifre_test" por padrão
-
-# Definir o nome do banco de dados corretamente
-DB_NAME = os.getenv("DB_NAME_TESTE", "banco_teste") if ENV == "test" else os.getenv("DB_NAME_PRODUCAO", "dbdcifre")
-
-# Criar a URL de conexão com o banco de dados de teste
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-# Imprimir os dados
-print(f"DB_USER: {DB_USER}")
-print(f"DB_PASSWORD: {DB_PASSWORD}")
-print(f"DB_HOST: {DB_HOST}")
-print(f"DB_PORT: {DB_PORT}")
-print(f"DB_NAME: {DB_NAME}")
-print(f"ENV: {ENV}")
-print(f"DATABASE_URL: {DATABASE_URL}")
-
-# Criar o engine e a sessão do banco de dados
+# Engine e sessão próprios dos testes (a URL vem de database.py, que já carregou o .env)
 engine = create_engine(DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -57,6 +38,9 @@ def db(setup_db):
     session = TestingSessionLocal()
     Base.metadata.drop_all(bind=engine)  # Limpa as tabelas
     Base.metadata.create_all(bind=engine)  # Recria as tabelas
+    cache_empresas.limpar()  # Os ids recomeçam a cada teste
+    indice_empresas.limpar()
+    cache_contagens.limpar()
     try:
         yield session
     finally:
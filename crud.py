@@ -1,107 +1,670 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, literal, or_, select, text, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
-from models import Empresa, ObrigacaoAcessoria
-from schemas import EmpresaCreate, EmpresaUpdate, ObrigacaoAcessoriaCreate, ObrigacaoAcessoriaUpdate
+from models import Empresa, ObrigacaoAcessoria, ResumoObrigacoes
+from schemas import (
+    CNPJ_VALIDADO,
+    TELEFONE_VALIDADO,
+    EmpresaCreate,
+    EmpresaUpdate,
+    EmpresaLoteResposta,
+    EmpresaLoteResultado,
+    ObrigacaoAcessoriaCreate,
+    ObrigacaoAcessoriaUpdate,
+    ObrigacaoImportacaoErro,
+    ObrigacaoImportacaoResposta,
+    PeriodicidadeEnum,
+)
+from busca import indice_empresas
+from cache import cache_contagens, cache_empresas
+from importacao import em_lotes
+from paginacao import decodificar_cursor, validar_paginacao
+from validacao import normalizar_email, normalizar_telefones, somente_digitos, validar_cnpjs
+
+# Carrega as obrigações de todas as empresas da página em uma única consulta (IN) e
+# resolve o relacionamento de volta pelo identity map, sem juntar a empresa de novo
+CARREGAR_OBRIGACOES = selectinload(Empresa.obrigacoes_acessorias).lazyload(ObrigacaoAcessoria.empresa)
+
+# INSERT único: um conflito em cnpj ou email não grava nada e não devolve linha.
+# A verificação e a gravação acontecem no mesmo comando, sem corrida entre requisições.
+def insert_empresa(empresa: EmpresaCreate):
+    return (
+        pg_insert(Empresa.__table__)
+        .values(**empresa.model_dump())
+        .on_conflict_do_nothing()
+        .returning(*Empresa.__table__.c)
+    )
+
+# Qual restrição causou o conflito (consultado só no caminho de erro)
+def consulta_conflito_empresa(empresa: EmpresaCreate):
+    return select(Empresa.cnpj == empresa.cnpj).where(or_(Empresa.cnpj == empresa.cnpj, Empresa.email == empresa.email)).limit(1)
+
+def erro_conflito_empresa(cnpj_duplicado: Optional[bool]):
+    if cnpj_duplicado is None:  # 🔹 A linha em conflito foi removida nesse meio tempo
+        return HTTPException(status_code=400, detail="CNPJ ou e-mail já cadastrado")
+    return HTTPException(status_code=400, detail="CNPJ já cadastrado" if cnpj_duplicado else "E-mail já cadastrado")
+
+# Nomes no banco das restrições de unicidade de empresas (índice do cnpj e UNIQUE do email)
+RESTRICOES_EMPRESA = {"ix_empresas_cnpj": True, "empresas_email_key": False}
+
+# Violação de unicidade (23505) ao alterar uma empresa vira 400; outros erros seguem como estão
+def erro_integridade_empresa(erro: IntegrityError):
+    if getattr(erro.orig, "pgcode", None) != "23505":
+        return erro
+    # 🔹 psycopg2 expõe a restrição em diag; no asyncpg ela está na exceção original (__cause__)
+    diagnostico = getattr(erro.orig, "diag", None) or erro.orig.__cause__
+    return erro_conflito_empresa(RESTRICOES_EMPRESA.get(getattr(diagnostico, "constraint_name", None)))
+
+# Resposta montada a partir da linha devolvida pelo INSERT: empresa nova não tem obrigações
+def empresa_sem_obrigacoes(linha) -> dict:
+    return {**linha._mapping, "obrigacoes_acessorias": []}
 
 # Criar Empresa
 def criar_empresa(db: Session, empresa: EmpresaCreate):
-    try:
-        db_empresa = db.query(Empresa).filter(Empresa.cnpj == empresa.cnpj).first()
-        if db_empresa:
-            raise HTTPException(status_code=400, detail="CNPJ já cadastrado")
-
-        db_empresa = Empresa(**empresa.model_dump())
-        db.add(db_empresa)
+    with indice_empresas.alterando() as alteracao:
+        linha = db.execute(insert_empresa(empresa)).first()
+        if linha is None:
+            cnpj_duplicado = db.scalar(consulta_conflito_empresa(empresa))
+            db.rollback()
+            raise erro_conflito_empresa(cnpj_duplicado)
         db.commit()
-        db.refresh(db_empresa)
-        return db_empresa
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Erro ao criar empresa: {str(e)}")
+        alteracao.feitas = 1
+    indice_empresas.guardar(linha.id, linha.nome, linha.cnpj)
+    cache_contagens.limpar()
+    return empresa_sem_obrigacoes(linha)
+
+# Tamanho máximo aceito em uma única criação em lote
+LIMITE_LOTE_EMPRESAS = 10_000
+
+# Mensagem legível a partir dos erros de validação do Pydantic
+def mensagem_validacao(erro: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in erro.errors())
+
+# Criar Empresas em lote: valida cada linha, verifica duplicados em uma consulta e insere em um único INSERT multi-linha
+def criar_empresas_em_lote(db: Session, linhas: list):
+    if not 0 < len(linhas) <= LIMITE_LOTE_EMPRESAS:
+        raise HTTPException(status_code=400, detail=f"O lote deve ter entre 1 e {LIMITE_LOTE_EMPRESAS} empresas")
+
+    resultados = [EmpresaLoteResultado(indice=indice) for indice in range(len(linhas))]
+    # 🔹 CNPJs e telefones validados por coluna; o Pydantic só refaz a validação dos que falharam,
+    # para montar a mensagem de erro da linha
+    cnpjs = validar_cnpjs(linha.get("cnpj") for linha in linhas)
+    telefones = normalizar_telefones(linha.get("telefone") for linha in linhas)
+    validas = {}
+    for indice, linha in enumerate(linhas):
+        cnpj, telefone = cnpjs[indice], telefones[indice]
+        if cnpj is not None:
+            linha = {**linha, "cnpj": cnpj}
+        if telefone is not None:
+            linha = {**linha, "telefone": telefone}
+        contexto = {CNPJ_VALIDADO: cnpj is not None, TELEFONE_VALIDADO: telefone is not None}
+        try:
+            validas[indice] = EmpresaCreate.model_validate(linha, context=contexto).model_dump()
+        except ValidationError as e:
+            resultados[indice].erro = mensagem_validacao(e)
+
+    # 🔹 Uma única consulta para CNPJs e e-mails já cadastrados
+    cnpjs = {dados["cnpj"] for dados in validas.values()}
+    emails = {dados["email"] for dados in validas.values()}
+    cnpjs_existentes, emails_existentes = set(), set()
+    if validas:
+        for cnpj, email in db.execute(
+            select(Empresa.cnpj, Empresa.email).where(or_(Empresa.cnpj.in_(cnpjs), Empresa.email.in_(emails)))
+        ):
+            cnpjs_existentes.add(cnpj)
+            emails_existentes.add(email)
+
+    # Duplicados no banco ou repetidos dentro do próprio lote
+    a_inserir = {}
+    for indice, dados in validas.items():
+        if dados["cnpj"] in cnpjs_existentes:
+            resultados[indice].erro = "CNPJ já cadastrado"
+        elif dados["email"] in emails_existentes:
+            resultados[indice].erro = "E-mail já cadastrado"
+        else:
+            cnpjs_existentes.add(dados["cnpj"])
+            emails_existentes.add(dados["email"])
+            a_inserir[dados["cnpj"]] = indice
+
+    if a_inserir:
+        # ON CONFLICT cobre empresas criadas por outra transação depois da verificação acima
+        stmt = pg_insert(Empresa.__table__).on_conflict_do_nothing().returning(Empresa.id, Empresa.cnpj, Empresa.nome)
+        with indice_empresas.alterando(len(a_inserir)) as alteracao:
+            inseridas = db.execute(stmt, [validas[indice] for indice in a_inserir.values()]).all()
+            db.commit()
+            alteracao.feitas = len(inseridas)
+        for empresa_id, cnpj, nome in inseridas:
+            resultados[a_inserir.pop(cnpj)].id = empresa_id
+            indice_empresas.guardar(empresa_id, nome, cnpj)
+        cache_contagens.limpar()
+        for indice in a_inserir.values():
+            resultados[indice].erro = "CNPJ ou e-mail já cadastrado"
+
+    criadas = sum(1 for resultado in resultados if resultado.id is not None)
+    return EmpresaLoteResposta(criadas=criadas, erros=len(resultados) - criadas, resultados=resultados)
+
+# Consulta paginada por deslocamento ou por cursor (compartilhada com crud_async).
+# Com "colunas", devolve só essas colunas em vez das entidades.
+def consulta_paginada(modelo, skip: int, limit: int, cursor: Optional[str], opcoes: tuple, colunas: tuple = (), filtros: tuple = ()):
+    validar_paginacao(skip, limit, cursor)
+    consulta = select(*colunas) if colunas else select(modelo).options(*opcoes)
+    consulta = consulta.where(*filtros).order_by(modelo.id)
+    if cursor is not None:
+        # 🔹 Keyset: o índice da chave primária posiciona direto na página, sem descartar linhas
+        consulta = consulta.where(modelo.id > decodificar_cursor(cursor))
+    else:
+        consulta = consulta.offset(skip)
+    return consulta.limit(limit)
+
+# Valor de um filtro da query string: vazio ou só espaços (?email=) é o mesmo que não filtrar
+def valor_filtro(valor: Optional[str]) -> Optional[str]:
+    return valor if valor and not valor.isspace() else None
+
+# Filtros das listagens, combináveis entre si e com skip/cursor. Cada um é atendido por um índice:
+# cnpj e email pelos índices únicos, o prefixo do nome por ix_empresas_nome_prefixo (varchar_pattern_ops).
+# Os valores são normalizados como na gravação (CNPJ só com dígitos, e-mail como o EmailStr).
+def filtros_empresas(cnpj: Optional[str] = None, nome: Optional[str] = None, email: Optional[str] = None) -> tuple:
+    filtros = []
+    if cnpj := valor_filtro(cnpj):
+        filtros.append(Empresa.cnpj == somente_digitos(cnpj))  # 🔹 Aceita CNPJ formatado
+    if nome := valor_filtro(nome):
+        filtros.append(Empresa.nome.startswith(nome, autoescape=True))  # 🔹 % e _ no nome são literais
+    if email := valor_filtro(email):
+        filtros.append(Empresa.email == normalizar_email(email))
+    return tuple(filtros)
 
-# Listar Empresas
-def get_empresas(db: Session, skip: int = 0, limit: int = 10):
-    if skip < 0 or limit <= 0:
-        raise HTTPException(status_code=400, detail="Parâmetros 'skip' e 'limit' devem ser positivos")
-    return db.query(Empresa).offset(skip).limit(limit).all()
+# empresa_id pelo índice único (empresa_id, nome), periodicidade por (periodicidade, id), nome por ix_obrigacoes_acessorias_nome
+def filtros_obrigacoes(empresa_id: Optional[int] = None, periodicidade: Optional[str] = None, nome: Optional[str] = None) -> tuple:
+    filtros = []
+    if empresa_id is not None:
+        filtros.append(ObrigacaoAcessoria.empresa_id == empresa_id)
+    if periodicidade := valor_filtro(periodicidade):
+        filtros.append(ObrigacaoAcessoria.periodicidade == PeriodicidadeEnum(periodicidade).value)
+    if nome := valor_filtro(nome):
+        filtros.append(ObrigacaoAcessoria.nome == nome)
+    return tuple(filtros)
+
+# Versões (id, versao) das linhas de uma página, sem carregá-las: base do ETag das listas
+def consulta_versoes_empresas(skip: int, limit: int, cursor: Optional[str], filtros: tuple = ()):
+    return consulta_paginada(Empresa, skip, limit, cursor, (), colunas=(Empresa.id, Empresa.versao), filtros=filtros)
+
+# 🔹 A obrigação embute a empresa: a versão dela também entra no ETag
+def consulta_versoes_obrigacoes(skip: int, limit: int, cursor: Optional[str], filtros: tuple = ()):
+    colunas = (ObrigacaoAcessoria.id, ObrigacaoAcessoria.versao, Empresa.versao)
+    return consulta_paginada(ObrigacaoAcessoria, skip, limit, cursor, (), colunas=colunas, filtros=filtros).join(ObrigacaoAcessoria.empresa)
+
+def versoes_empresas(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()):
+    return db.execute(consulta_versoes_empresas(skip, limit, cursor, filtros)).all()
+
+def versoes_obrigacoes(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()):
+    return db.execute(consulta_versoes_obrigacoes(skip, limit, cursor, filtros)).all()
+
+# Estimativa do total de linhas pelas estatísticas do planner (pg_class), sem ler a tabela.
+# Como o planner, ajusta reltuples ao tamanho atual da tabela; NULL se nunca foi analisada.
+ESTIMATIVA_LINHAS = text("""
+    SELECT CASE WHEN reltuples < 0 OR relpages = 0 THEN NULL
+                ELSE (reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int))::bigint
+           END
+    FROM pg_class WHERE oid = CAST(:tabela AS regclass)
+""")
+
+# Total de linhas de uma listagem. Com filtros (ou exata=True) é um count(*) exato, atendido pelos
+# mesmos índices da listagem; sem filtros é a estimativa do planner, que evita ler a tabela inteira.
+# O resultado fica em cache por CACHE_CONTAGEM_TTL segundos e toda escrita limpa o cache.
+def contar(db: Session, modelo, filtros: tuple = (), parametros: tuple = (), exata: bool = False) -> dict:
+    chave = (modelo.__tablename__, parametros, exata)
+    contagem = cache_contagens.buscar(chave)
+    if contagem is None:
+        total = None if filtros or exata else db.scalar(ESTIMATIVA_LINHAS, {"tabela": modelo.__tablename__})
+        if total is None:
+            contagem = {"total": db.scalar(select(func.count()).select_from(modelo).where(*filtros)), "exata": True}
+        else:
+            contagem = {"total": total, "exata": False}
+        cache_contagens.guardar(chave, contagem)
+    return contagem
+
+def contar_empresas(db: Session, filtros: tuple = (), parametros: tuple = (), exata: bool = False) -> dict:
+    return contar(db, Empresa, filtros, parametros, exata)
+
+def contar_obrigacoes(db: Session, filtros: tuple = (), parametros: tuple = (), exata: bool = False) -> dict:
+    return contar(db, ObrigacaoAcessoria, filtros, parametros, exata)
+
+# Nova versão das empresas cujo detalhe mudou (a lista de obrigações faz parte dele)
+def nova_versao_empresas(*empresa_ids):
+    return update(Empresa.__table__).where(Empresa.id.in_(empresa_ids)).values(versao=Empresa.versao + 1)
+
+# Colunas das respostas na ordem dos schemas (campos da base e depois o id), como o response_model serializa
+COLUNAS_RESPOSTA_EMPRESA = ("nome", "cnpj", "endereco", "email", "telefone", "id")
+COLUNAS_RESPOSTA_OBRIGACAO = ("nome", "periodicidade", "empresa_id", "id")
+COLUNAS_EMPRESA_EMBUTIDA = ("nome", "cnpj", "endereco", "email", "telefone")
+
+# Caminho rápido das leituras: as respostas (schemas.Empresa / ObrigacaoAcessoriaResponse) são montadas
+# direto das linhas, sem entidades do ORM nem a validação do response_model. As rotas devolvem os dicts
+# em ORJSONResponse; o response_model continua declarado e documenta a resposta no OpenAPI.
+def consulta_pagina_empresas(skip: int, limit: int, cursor: Optional[str], filtros: tuple = ()):
+    colunas = (*(getattr(Empresa, coluna) for coluna in COLUNAS_RESPOSTA_EMPRESA), Empresa.versao)
+    return consulta_paginada(Empresa, skip, limit, cursor, (), colunas=colunas, filtros=filtros)
+
+def consulta_obrigacoes_das_empresas(empresa_ids: list):
+    colunas = (getattr(ObrigacaoAcessoria, coluna) for coluna in COLUNAS_RESPOSTA_OBRIGACAO)
+    return select(*colunas).where(ObrigacaoAcessoria.empresa_id.in_(empresa_ids)).order_by(ObrigacaoAcessoria.id)
+
+# Empresas com as obrigações embutidas (cada uma com a empresa, como em schemas.Empresa)
+def empresas_resposta(linhas_empresas, linhas_obrigacoes) -> list:
+    empresas, por_id = [], {}
+    for linha in linhas_empresas:
+        empresa = dict(zip(COLUNAS_RESPOSTA_EMPRESA, linha))
+        embutida = {coluna: empresa[coluna] for coluna in COLUNAS_EMPRESA_EMBUTIDA}
+        empresa["obrigacoes_acessorias"] = []
+        empresas.append(empresa)
+        por_id[empresa["id"]] = (empresa["obrigacoes_acessorias"], embutida)
+    for linha in linhas_obrigacoes:
+        obrigacoes, embutida = por_id[linha.empresa_id]
+        obrigacao = dict(zip(COLUNAS_RESPOSTA_OBRIGACAO, linha))
+        obrigacao["empresa"] = embutida  # 🔹 O mesmo dict em todas: o orjson só o codifica de novo
+        obrigacoes.append(obrigacao)
+    return empresas
+
+# Página de empresas pronta para a resposta, com as linhas (id, versao) para o cursor e o ETag
+def get_empresas_resposta(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()) -> tuple:
+    linhas = db.execute(consulta_pagina_empresas(skip, limit, cursor, filtros)).all()
+    obrigacoes = db.execute(consulta_obrigacoes_das_empresas([linha.id for linha in linhas])).all() if linhas else []
+    return linhas, empresas_resposta(linhas, obrigacoes)
+
+def consulta_pagina_obrigacoes(skip: int, limit: int, cursor: Optional[str], filtros: tuple = ()):
+    colunas = (
+        *(getattr(ObrigacaoAcessoria, coluna) for coluna in COLUNAS_RESPOSTA_OBRIGACAO),
+        ObrigacaoAcessoria.versao,
+        *(getattr(Empresa, coluna).label(f"empresa_{coluna}") for coluna in COLUNAS_EMPRESA_EMBUTIDA),
+        Empresa.versao.label("empresa_versao"),
+    )
+    return consulta_paginada(ObrigacaoAcessoria, skip, limit, cursor, (), colunas=colunas, filtros=filtros).join(ObrigacaoAcessoria.empresa)
+
+def obrigacoes_resposta(linhas) -> list:
+    inicio_empresa = len(COLUNAS_RESPOSTA_OBRIGACAO) + 1  # Depois da versão da obrigação
+    fim_empresa = inicio_empresa + len(COLUNAS_EMPRESA_EMBUTIDA)
+    obrigacoes = []
+    for linha in linhas:
+        obrigacao = dict(zip(COLUNAS_RESPOSTA_OBRIGACAO, linha))
+        obrigacao["empresa"] = dict(zip(COLUNAS_EMPRESA_EMBUTIDA, linha[inicio_empresa:fim_empresa]))
+        obrigacoes.append(obrigacao)
+    return obrigacoes
+
+# Página de obrigações pronta para a resposta, com as linhas (id, versao, empresa_versao) para o cursor e o ETag
+def get_obrigacoes_resposta(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()) -> tuple:
+    linhas = db.execute(consulta_pagina_obrigacoes(skip, limit, cursor, filtros)).all()
+    return linhas, obrigacoes_resposta(linhas)
+
+# Listar Empresas (por deslocamento ou por cursor)
+def get_empresas(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, opcoes: tuple = (CARREGAR_OBRIGACOES,), filtros: tuple = ()):
+    return db.scalars(consulta_paginada(Empresa, skip, limit, cursor, opcoes, filtros=filtros)).all()
 
 # Buscar Empresa por ID
-def get_empresa_by_id(db: Session, empresa_id: int):
-    db_empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+def get_empresa_by_id(db: Session, empresa_id: int, opcoes: tuple = (CARREGAR_OBRIGACOES,)):
+    db_empresa = db.scalars(select(Empresa).options(*opcoes).where(Empresa.id == empresa_id)).first()
     if not db_empresa:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     return db_empresa
 
+# Detalhe da empresa já serializado, com a versão (ETag), lido do cache quando possível.
+# Toda escrita que altera a empresa ou a lista de obrigações embutida invalida a entrada.
+def get_empresa_detalhada(db: Session, empresa_id: int) -> tuple:
+    detalhe = cache_empresas.buscar(empresa_id)
+    if detalhe is None:
+        linhas = db.execute(consulta_pagina_empresas(0, 1, None, (Empresa.id == empresa_id,))).all()
+        if not linhas:
+            raise HTTPException(status_code=404, detail="Empresa não encontrada")
+        obrigacoes = db.execute(consulta_obrigacoes_das_empresas([empresa_id])).all()
+        detalhe = (linhas[0].versao, empresas_resposta(linhas, obrigacoes)[0])
+        cache_empresas.guardar(empresa_id, detalhe)
+    return detalhe
+
+# UPDATE ... RETURNING da empresa, já com as obrigações dela (LEFT JOIN), em um único comando
+def update_empresa_retornando(empresa_id: int, dados: dict):
+    empresas, obrigacoes = Empresa.__table__, ObrigacaoAcessoria.__table__
+    atualizada = (
+        update(empresas)
+        .where(empresas.c.id == empresa_id)
+        .values(**dados, versao=empresas.c.versao + 1)
+        .returning(*empresas.c)
+        .cte("atualizada")
+    )
+    return (
+        select(
+            atualizada,
+            obrigacoes.c.id.label("obrigacao_id"),
+            obrigacoes.c.nome.label("obrigacao_nome"),
+            obrigacoes.c.periodicidade.label("obrigacao_periodicidade"),
+        )
+        .select_from(atualizada.outerjoin(obrigacoes, obrigacoes.c.empresa_id == atualizada.c.id))
+        .order_by(obrigacoes.c.id)
+    )
+
+# Resposta (schemas.Empresa) a partir das linhas empresa + obrigação do comando acima
+def empresa_com_obrigacoes(linhas) -> dict:
+    empresa = {"id": linhas[0].id, **{coluna: getattr(linhas[0], coluna) for coluna in COLUNAS_EMPRESA_EMBUTIDA}}
+    embutida = {coluna: empresa[coluna] for coluna in COLUNAS_EMPRESA_EMBUTIDA}
+    empresa["obrigacoes_acessorias"] = [
+        {"id": linha.obrigacao_id, "nome": linha.obrigacao_nome, "periodicidade": linha.obrigacao_periodicidade,
+         "empresa_id": empresa["id"], "empresa": embutida}
+        for linha in linhas if linha.obrigacao_id is not None
+    ]
+    return empresa
+
+# Colunas indexadas pela busca (busca.IndicePrefixos)
+CAMPOS_BUSCA = {"nome", "cnpj"}
+
 # Atualizar Empresa
 def update_empresa(db: Session, empresa_id: int, empresa: EmpresaUpdate):
-    db_empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
-    if not db_empresa:
-        raise HTTPException(status_code=404, detail="Empresa não encontrada")
-
     update_data = empresa.model_dump(exclude_unset=True)  # 🔹 Ignora campos None
-    for key, value in update_data.items():
-        setattr(db_empresa, key, value)
+    # 🔹 Só o UPDATE com nome ou CNPJ move o contador da busca
+    with indice_empresas.alterando(int(bool(CAMPOS_BUSCA & update_data.keys()))) as alteracao:
+        try:
+            linhas = db.execute(update_empresa_retornando(empresa_id, update_data)).all()
+        except IntegrityError as e:
+            db.rollback()
+            raise erro_integridade_empresa(e)
+        if not linhas:
+            raise HTTPException(status_code=404, detail="Empresa não encontrada")
+        db.commit()
+        alteracao.feitas = alteracao.previstas
+    cache_empresas.invalidar(empresa_id)
+    indice_empresas.guardar(empresa_id, linhas[0].nome, linhas[0].cnpj)
+    cache_contagens.limpar()
+    return empresa_com_obrigacoes(linhas)
 
-    db.commit()
-    db.refresh(db_empresa)
-    return db_empresa
+# DELETE guardado: a empresa só é removida se não houver obrigações, no mesmo comando
+def delete_empresa_sem_obrigacoes(empresa_id: int):
+    empresas, obrigacoes = Empresa.__table__, ObrigacaoAcessoria.__table__
+    possui_obrigacoes = select(obrigacoes.c.id).where(obrigacoes.c.empresa_id == empresa_id).exists()
+    return delete(empresas).where(empresas.c.id == empresa_id, ~possui_obrigacoes).returning(*empresas.c)
+
+def erro_delete_empresa(empresa_existe: bool):
+    if not empresa_existe:
+        return HTTPException(status_code=404, detail="Empresa não encontrada")
+    return HTTPException(status_code=400, detail="Não é possível excluir a empresa, pois há obrigações acessórias associadas")
 
 # Deletar Empresa (verificando se há obrigações associadas)
 def delete_empresa(db: Session, empresa_id: int):
-    db_empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
-    if not db_empresa:
-        raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    with indice_empresas.alterando() as alteracao:
+        try:
+            linha = db.execute(delete_empresa_sem_obrigacoes(empresa_id)).first()
+        except IntegrityError:
+            # 🔹 Uma obrigação foi criada entre a verificação e a exclusão (chave estrangeira)
+            db.rollback()
+            raise erro_delete_empresa(True)
+        if linha is None:
+            empresa_existe = db.scalar(select(Empresa.id).where(Empresa.id == empresa_id)) is not None
+            db.rollback()
+            raise erro_delete_empresa(empresa_existe)
+        db.commit()
+        alteracao.feitas = 1
+    cache_empresas.invalidar(empresa_id)
+    indice_empresas.remover(empresa_id)
+    cache_contagens.limpar()
+    return empresa_sem_obrigacoes(linha)  # 🔹 Sem obrigações, por definição
 
-    # 🔹 Verifica se existem obrigações associadas antes de deletar
-    if db.query(ObrigacaoAcessoria).filter(ObrigacaoAcessoria.empresa_id == empresa_id).first():
-        raise HTTPException(status_code=400, detail="Não é possível excluir a empresa, pois há obrigações acessórias associadas")
+# Soma variações (empresa_id, periodicidade, quantidade) ao resumo_obrigacoes.
+# Cada (empresa_id, periodicidade) pode aparecer uma única vez nas variações (ON CONFLICT).
+def atualizar_resumo(variacoes):
+    resumo = ResumoObrigacoes.__table__
+    upsert = pg_insert(resumo).from_select(["empresa_id", "periodicidade", "quantidade"], variacoes)
+    return upsert.on_conflict_do_update(
+        index_elements=["empresa_id", "periodicidade"],
+        set_={"quantidade": resumo.c.quantidade + upsert.excluded.quantidade},
+    )
 
-    db.delete(db_empresa)
-    db.commit()
-    return db_empresa
+# Completa um INSERT/UPDATE/DELETE ... RETURNING de obrigação (em CTE) com o incremento da
+# versão da empresa, a atualização do resumo e os dados da empresa para a resposta, tudo no mesmo comando
+def com_empresa(obrigacao, variacoes):
+    empresas = Empresa.__table__
+    empresa = (
+        update(empresas)
+        .where(empresas.c.id == obrigacao.c.empresa_id)
+        .values(versao=empresas.c.versao + 1)
+        .returning(*(empresas.c[nome] for nome in COLUNAS_EMPRESA_EMBUTIDA))
+        .cte("empresa")
+    )
+    return (
+        select(obrigacao.c.id, obrigacao.c.nome, obrigacao.c.periodicidade, obrigacao.c.empresa_id, *empresa.c)
+        .select_from(obrigacao.join(empresa, literal(True)))
+        .add_cte(atualizar_resumo(variacoes).cte("resumo"))  # 🔹 Não é referenciada: add_cte garante a execução
+    )
+
+# Variação do resumo para cada obrigação devolvida pela CTE (+1 na criação, -1 na exclusão)
+def variacao_resumo(obrigacao, quantidade: int):
+    return select(obrigacao.c.empresa_id, obrigacao.c.periodicidade, literal(quantidade))
+
+# Índice único que identifica uma obrigação duplicada (ON CONFLICT)
+CHAVE_OBRIGACAO = ("empresa_id", "nome")
+
+# Grava a obrigação se a empresa existir; duplicada (empresa_id, nome) não grava nem devolve linha
+def insert_obrigacao(obrigacao: ObrigacaoAcessoriaCreate):
+    obrigacoes, empresas = ObrigacaoAcessoria.__table__, Empresa.__table__
+    dados = obrigacao.model_dump(mode="json")
+    empresa_existe = select(empresas.c.id).where(empresas.c.id == dados["empresa_id"])
+    obrigacao = (
+        pg_insert(obrigacoes)
+        .from_select(
+            list(dados),
+            select(*map(literal, dados.values())).where(empresa_existe.exists()),
+            include_defaults=False,  # 🔹 versao vem do server_default
+        )
+        .on_conflict_do_nothing(index_elements=CHAVE_OBRIGACAO)
+        .returning(*obrigacoes.c)
+        .cte("obrigacao")
+    )
+    return com_empresa(obrigacao, variacao_resumo(obrigacao, 1))
+
+def erro_insert_obrigacao(empresa_existe: bool):
+    if not empresa_existe:
+        return HTTPException(status_code=400, detail="Empresa associada não encontrada")
+    return HTTPException(status_code=400, detail="Essa obrigação acessória já existe para essa empresa.")
+
+def obrigacao_resposta(linha) -> dict:
+    id_, nome, periodicidade, empresa_id, *empresa = linha
+    return {
+        "id": id_, "nome": nome, "periodicidade": periodicidade, "empresa_id": empresa_id,
+        "empresa": dict(zip(COLUNAS_EMPRESA_EMBUTIDA, empresa)),
+    }
 
 # Criar Obrigação Acessória
 def criar_obrigacao(db: Session, obrigacao: ObrigacaoAcessoriaCreate):
-    try:
-        # 🔹 Verifica se a empresa existe antes de criar a obrigação
-        if not db.query(Empresa).filter(Empresa.id == obrigacao.empresa_id).first():
-            raise HTTPException(status_code=400, detail="Empresa associada não encontrada")
-
-        db_obrigacao = ObrigacaoAcessoria(**obrigacao.model_dump())
-        db.add(db_obrigacao)
-        db.commit()
-        db.refresh(db_obrigacao)
-        return db_obrigacao
-    except Exception as e:
+    linha = db.execute(insert_obrigacao(obrigacao)).first()
+    if linha is None:
+        empresa_existe = db.scalar(select(Empresa.id).where(Empresa.id == obrigacao.empresa_id)) is not None
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Erro ao criar obrigação acessória: {str(e)}")
+        raise erro_insert_obrigacao(empresa_existe)
+    db.commit()
+    cache_empresas.invalidar(obrigacao.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
+
+# Linhas gravadas por transação na importação de arquivos
+TAMANHO_LOTE_IMPORTACAO = 1_000
+# Quantos erros são devolvidos em detalhe (os demais só entram na contagem)
+LIMITE_ERROS_DETALHADOS = 100
+# Os comandos de cada lote se repetem uma vez por lote: não são N+1
+POR_LOTE = {"repeticao_esperada": True}
+
+# Grava um lote de linhas já lidas do arquivo; devolve [(linha, erro)] das rejeitadas
+def _importar_lote_obrigacoes(db: Session, lote: list):
+    erros, validas = [], []
+    for numero, dados, erro in lote:
+        if erro is None:
+            try:
+                validas.append((numero, ObrigacaoAcessoriaCreate.model_validate(dados).model_dump(mode="json")))
+                continue
+            except ValidationError as e:
+                erro = mensagem_validacao(e)
+        erros.append((numero, erro))
+    if not validas:
+        return 0, erros
+
+    # 🔹 Empresas e duplicados resolvidos com uma consulta cada, para o lote inteiro
+    empresas = set(db.scalars(select(Empresa.id).where(Empresa.id.in_({d["empresa_id"] for _, d in validas})), execution_options=POR_LOTE))
+    existentes = set(db.execute(
+        select(ObrigacaoAcessoria.nome, ObrigacaoAcessoria.empresa_id).where(
+            tuple_(ObrigacaoAcessoria.nome, ObrigacaoAcessoria.empresa_id).in_({(d["nome"], d["empresa_id"]) for _, d in validas})
+        ),
+        execution_options=POR_LOTE,
+    ).tuples())
+
+    a_inserir = {}
+    for numero, dados in validas:
+        chave = (dados["nome"], dados["empresa_id"])
+        if dados["empresa_id"] not in empresas:
+            erros.append((numero, "Empresa associada não encontrada"))
+        elif chave in existentes:
+            erros.append((numero, "Essa obrigação acessória já existe para essa empresa."))
+        else:
+            existentes.add(chave)
+            a_inserir[chave] = (numero, dados)
+
+    inseridas, empresas_alteradas = 0, set()
+    if a_inserir:
+        # ON CONFLICT cobre obrigações gravadas por outra transação depois da verificação acima
+        stmt = (
+            pg_insert(ObrigacaoAcessoria.__table__)
+            .on_conflict_do_nothing(index_elements=CHAVE_OBRIGACAO)
+            .returning(ObrigacaoAcessoria.nome, ObrigacaoAcessoria.empresa_id, ObrigacaoAcessoria.periodicidade)
+        )
+        variacoes = Counter()
+        for nome, empresa_id, periodicidade in db.execute(stmt, [dados for _, dados in a_inserir.values()], execution_options=POR_LOTE).tuples().all():
+            a_inserir.pop((nome, empresa_id))
+            empresas_alteradas.add(empresa_id)
+            variacoes[empresa_id, periodicidade] += 1
+            inseridas += 1
+        if variacoes:
+            db.execute(atualizar_resumo(
+                union_all(*(select(literal(e), literal(p), literal(n)) for (e, p), n in variacoes.items()))
+            ), execution_options=POR_LOTE)
+        for numero, _ in a_inserir.values():
+            erros.append((numero, "Essa obrigação acessória já existe para essa empresa."))
+    if empresas_alteradas:
+        db.execute(nova_versao_empresas(*empresas_alteradas), execution_options=POR_LOTE)
+    db.commit()
+    cache_empresas.invalidar(*empresas_alteradas)
+    cache_contagens.limpar()
+    return inseridas, erros
+
+# Recalcula o resumo do zero a partir das obrigações, com um único GROUP BY.
+# O EXCLUSIVE bloqueia as escritas de obrigações (que atualizam o resumo) até o commit, mas não as leituras.
+def reconstruir_resumo_obrigacoes(db: Session) -> int:
+    resumo, obrigacoes = ResumoObrigacoes.__table__, ObrigacaoAcessoria.__table__
+    db.execute(text("LOCK TABLE resumo_obrigacoes IN EXCLUSIVE MODE"))
+    db.execute(delete(resumo))
+    linhas = db.execute(insert(resumo).from_select(
+        ["empresa_id", "periodicidade", "quantidade"],
+        select(obrigacoes.c.empresa_id, obrigacoes.c.periodicidade, func.count())
+        .group_by(obrigacoes.c.empresa_id, obrigacoes.c.periodicidade),
+    )).rowcount
+    db.commit()
+    return linhas
+
+# Quantidade de obrigações por periodicidade de cada empresa, paginada por empresa_id
+def consulta_resumo_obrigacoes(skip: int, limit: int, cursor: Optional[str], empresa_id: Optional[int] = None):
+    validar_paginacao(skip, limit, cursor)
+    resumo = ResumoObrigacoes.__table__
+    por_periodicidade = [
+        func.coalesce(func.sum(resumo.c.quantidade).filter(resumo.c.periodicidade == periodicidade.value), 0)
+        .label(periodicidade.value.lower())
+        for periodicidade in PeriodicidadeEnum
+    ]
+    consulta = (
+        select(resumo.c.empresa_id, *por_periodicidade, func.sum(resumo.c.quantidade).label("total"))
+        .group_by(resumo.c.empresa_id)
+        .having(func.sum(resumo.c.quantidade) > 0)  # 🔹 Empresas que já tiveram obrigações e hoje não têm nenhuma
+        .order_by(resumo.c.empresa_id)
+    )
+    if empresa_id is not None:
+        consulta = consulta.where(resumo.c.empresa_id == empresa_id)
+    if cursor is not None:
+        consulta = consulta.where(resumo.c.empresa_id > decodificar_cursor(cursor))
+    else:
+        consulta = consulta.offset(skip)
+    return consulta.limit(limit)
+
+def get_resumo_obrigacoes(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, empresa_id: Optional[int] = None):
+    return [dict(linha._mapping) for linha in db.execute(consulta_resumo_obrigacoes(skip, limit, cursor, empresa_id))]
+
+# Importar Obrigações Acessórias a partir das linhas de um arquivo (CSV/NDJSON), em lotes transacionais
+def importar_obrigacoes(db: Session, linhas):
+    importadas, total_erros, detalhes = 0, 0, []
+    for lote in em_lotes(linhas, TAMANHO_LOTE_IMPORTACAO):
+        inseridas, erros = _importar_lote_obrigacoes(db, lote)
+        importadas += inseridas
+        total_erros += len(erros)
+        for numero, erro in sorted(erros)[:LIMITE_ERROS_DETALHADOS - len(detalhes)]:
+            detalhes.append(ObrigacaoImportacaoErro(linha=numero, erro=erro))
+    return ObrigacaoImportacaoResposta(importadas=importadas, erros=total_erros, detalhes_erros=detalhes)
+
+# Listar Obrigações Acessórias (por deslocamento ou por cursor)
+def get_obrigacoes(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, opcoes: tuple = (), filtros: tuple = ()):
+    return db.scalars(consulta_paginada(ObrigacaoAcessoria, skip, limit, cursor, opcoes, filtros=filtros)).all()
 
-# Listar Obrigações Acessórias
-def get_obrigacoes(db: Session, skip: int = 0, limit: int = 10):
-    if skip < 0 or limit <= 0:
-        raise HTTPException(status_code=400, detail="Parâmetros 'skip' e 'limit' devem ser positivos")
-    return db.query(ObrigacaoAcessoria).offset(skip).limit(limit).all()
+def update_obrigacao_retornando(obrigacao_id: int, dados: dict):
+    obrigacoes = ObrigacaoAcessoria.__table__
+    # 🔹 Periodicidade anterior para o resumo: a linha é travada (FOR UPDATE) e lida já na versão mais recente
+    anterior = (
+        select(obrigacoes.c.id, obrigacoes.c.periodicidade)
+        .where(obrigacoes.c.id == obrigacao_id)
+        .with_for_update()
+        .subquery("anterior")
+    )
+    obrigacao = (
+        update(obrigacoes)
+        .where(obrigacoes.c.id == anterior.c.id)
+        .values(**dados, versao=obrigacoes.c.versao + 1)
+        .returning(*obrigacoes.c, anterior.c.periodicidade.label("periodicidade_anterior"))
+        .cte("obrigacao")
+    )
+    mudou = obrigacao.c.periodicidade != obrigacao.c.periodicidade_anterior
+    variacoes = union_all(
+        variacao_resumo(obrigacao, 1).where(mudou),
+        select(obrigacao.c.empresa_id, obrigacao.c.periodicidade_anterior, literal(-1)).where(mudou),
+    )
+    return com_empresa(obrigacao, variacoes)
+
+def delete_obrigacao_retornando(obrigacao_id: int):
+    obrigacoes = ObrigacaoAcessoria.__table__
+    obrigacao = delete(obrigacoes).where(obrigacoes.c.id == obrigacao_id).returning(*obrigacoes.c).cte("obrigacao")
+    return com_empresa(obrigacao, variacao_resumo(obrigacao, -1))
+
+# Renomear para um nome já usado na mesma empresa viola o índice único
+def erro_integridade_obrigacao(erro: IntegrityError):
+    if getattr(erro.orig, "pgcode", None) != "23505":
+        return erro
+    return HTTPException(status_code=400, detail="Essa obrigação acessória já existe para essa empresa.")
 
 # Atualizar Obrigação Acessória
 def update_obrigacao(db: Session, obrigacao_id: int, obrigacao: ObrigacaoAcessoriaUpdate):
-    db_obrigacao = db.query(ObrigacaoAcessoria).filter(ObrigacaoAcessoria.id == obrigacao_id).first()
-    if not db_obrigacao:
+    update_data = obrigacao.model_dump(exclude_unset=True, mode="json")  # 🔹 Ignora valores None
+    try:
+        linha = db.execute(update_obrigacao_retornando(obrigacao_id, update_data)).first()
+    except IntegrityError as e:
+        db.rollback()
+        raise erro_integridade_obrigacao(e)
+    if linha is None:
         raise HTTPException(status_code=404, detail="Obrigação acessória não encontrada")
 
-    update_data = obrigacao.model_dump(exclude_unset=True)  # 🔹 Ignora valores None
-    for key, value in update_data.items():
-        setattr(db_obrigacao, key, value)
-
     db.commit()
-    db.refresh(db_obrigacao)
-    return db_obrigacao
+    cache_empresas.invalidar(linha.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
 
 # Deletar Obrigação Acessória
 def delete_obrigacao(db: Session, obrigacao_id: int):
-    db_obrigacao = db.query(ObrigacaoAcessoria).filter(ObrigacaoAcessoria.id == obrigacao_id).first()
-    if not db_obrigacao:
+    linha = db.execute(delete_obrigacao_retornando(obrigacao_id)).first()
+    if linha is None:
         raise HTTPException(status_code=404, detail="Obrigação acessória não encontrada")
 
-    db.delete(db_obrigacao)
     db.commit()
-    return db_obrigacao
+    cache_empresas.invalidar(linha.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
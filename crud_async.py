@@ -0,0 +1,175 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from busca import indice_empresas
+from cache import cache_contagens, cache_empresas
+from models import Empresa, ObrigacaoAcessoria
+from schemas import EmpresaCreate, EmpresaUpdate, ObrigacaoAcessoriaCreate, ObrigacaoAcessoriaUpdate
+from crud import (
+    CAMPOS_BUSCA,
+    CARREGAR_OBRIGACOES,
+    consulta_conflito_empresa,
+    consulta_obrigacoes_das_empresas,
+    consulta_pagina_empresas,
+    consulta_pagina_obrigacoes,
+    consulta_paginada,
+    consulta_versoes_empresas,
+    consulta_versoes_obrigacoes,
+    delete_empresa_sem_obrigacoes,
+    delete_obrigacao_retornando,
+    empresa_com_obrigacoes,
+    empresa_sem_obrigacoes,
+    empresas_resposta,
+    erro_conflito_empresa,
+    erro_delete_empresa,
+    erro_insert_obrigacao,
+    erro_integridade_empresa,
+    erro_integridade_obrigacao,
+    insert_empresa,
+    insert_obrigacao,
+    obrigacao_resposta,
+    obrigacoes_resposta,
+    update_empresa_retornando,
+    update_obrigacao_retornando,
+)
+
+# Versões assíncronas das funções de crud.py, usadas pelas rotas de rotas_async.py.
+# Tudo o que a resposta serializa precisa ser carregado aqui: não existe lazy load fora de um await.
+
+# Criar Empresa
+async def criar_empresa(db: AsyncSession, empresa: EmpresaCreate):
+    with indice_empresas.alterando() as alteracao:
+        linha = (await db.execute(insert_empresa(empresa))).first()
+        if linha is None:
+            cnpj_duplicado = await db.scalar(consulta_conflito_empresa(empresa))
+            await db.rollback()
+            raise erro_conflito_empresa(cnpj_duplicado)
+        await db.commit()
+        alteracao.feitas = 1
+    indice_empresas.guardar(linha.id, linha.nome, linha.cnpj)
+    cache_contagens.limpar()
+    return empresa_sem_obrigacoes(linha)
+
+# Listar Empresas (por deslocamento ou por cursor)
+async def get_empresas(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, opcoes: tuple = (CARREGAR_OBRIGACOES,), filtros: tuple = ()):
+    return (await db.scalars(consulta_paginada(Empresa, skip, limit, cursor, opcoes, filtros=filtros))).all()
+
+# Página de empresas pronta para a resposta (caminho rápido, ver crud.get_empresas_resposta)
+async def get_empresas_resposta(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()) -> tuple:
+    linhas = (await db.execute(consulta_pagina_empresas(skip, limit, cursor, filtros))).all()
+    obrigacoes = (await db.execute(consulta_obrigacoes_das_empresas([linha.id for linha in linhas]))).all() if linhas else []
+    return linhas, empresas_resposta(linhas, obrigacoes)
+
+# Buscar Empresa por ID
+async def get_empresa_by_id(db: AsyncSession, empresa_id: int, opcoes: tuple = (CARREGAR_OBRIGACOES,)):
+    db_empresa = await db.scalar(select(Empresa).options(*opcoes).where(Empresa.id == empresa_id))
+    if not db_empresa:
+        raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    return db_empresa
+
+# Detalhe da empresa já serializado, com a versão (ETag), pelo mesmo cache das rotas síncronas
+async def get_empresa_detalhada(db: AsyncSession, empresa_id: int) -> tuple:
+    detalhe = cache_empresas.buscar(empresa_id)
+    if detalhe is None:
+        linhas = (await db.execute(consulta_pagina_empresas(0, 1, None, (Empresa.id == empresa_id,)))).all()
+        if not linhas:
+            raise HTTPException(status_code=404, detail="Empresa não encontrada")
+        obrigacoes = (await db.execute(consulta_obrigacoes_das_empresas([empresa_id]))).all()
+        detalhe = (linhas[0].versao, empresas_resposta(linhas, obrigacoes)[0])
+        cache_empresas.guardar(empresa_id, detalhe)
+    return detalhe
+
+# Versões das linhas de uma página, para o ETag das listas
+async def versoes_empresas(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()):
+    return (await db.execute(consulta_versoes_empresas(skip, limit, cursor, filtros))).all()
+
+async def versoes_obrigacoes(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()):
+    return (await db.execute(consulta_versoes_obrigacoes(skip, limit, cursor, filtros))).all()
+
+# Atualizar Empresa
+async def update_empresa(db: AsyncSession, empresa_id: int, empresa: EmpresaUpdate):
+    update_data = empresa.model_dump(exclude_unset=True)  # 🔹 Ignora campos None
+    # 🔹 Só o UPDATE com nome ou CNPJ move o contador da busca
+    with indice_empresas.alterando(int(bool(CAMPOS_BUSCA & update_data.keys()))) as alteracao:
+        try:
+            linhas = (await db.execute(update_empresa_retornando(empresa_id, update_data))).all()
+        except IntegrityError as e:
+            await db.rollback()
+            raise erro_integridade_empresa(e)
+        if not linhas:
+            raise HTTPException(status_code=404, detail="Empresa não encontrada")
+        await db.commit()
+        alteracao.feitas = alteracao.previstas
+    cache_empresas.invalidar(empresa_id)
+    indice_empresas.guardar(empresa_id, linhas[0].nome, linhas[0].cnpj)
+    cache_contagens.limpar()
+    return empresa_com_obrigacoes(linhas)
+
+# Deletar Empresa (verificando se há obrigações associadas)
+async def delete_empresa(db: AsyncSession, empresa_id: int):
+    with indice_empresas.alterando() as alteracao:
+        try:
+            linha = (await db.execute(delete_empresa_sem_obrigacoes(empresa_id))).first()
+        except IntegrityError:
+            await db.rollback()
+            raise erro_delete_empresa(True)
+        if linha is None:
+            empresa_existe = await db.scalar(select(Empresa.id).where(Empresa.id == empresa_id)) is not None
+            await db.rollback()
+            raise erro_delete_empresa(empresa_existe)
+        await db.commit()
+        alteracao.feitas = 1
+    cache_empresas.invalidar(empresa_id)
+    indice_empresas.remover(empresa_id)
+    cache_contagens.limpar()
+    return empresa_sem_obrigacoes(linha)
+
+# Criar Obrigação Acessória
+async def criar_obrigacao(db: AsyncSession, obrigacao: ObrigacaoAcessoriaCreate):
+    linha = (await db.execute(insert_obrigacao(obrigacao))).first()
+    if linha is None:
+        empresa_existe = await db.scalar(select(Empresa.id).where(Empresa.id == obrigacao.empresa_id)) is not None
+        await db.rollback()
+        raise erro_insert_obrigacao(empresa_existe)
+    await db.commit()
+    cache_empresas.invalidar(obrigacao.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
+
+# Página de obrigações pronta para a resposta (caminho rápido, ver crud.get_obrigacoes_resposta)
+async def get_obrigacoes_resposta(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, filtros: tuple = ()) -> tuple:
+    linhas = (await db.execute(consulta_pagina_obrigacoes(skip, limit, cursor, filtros))).all()
+    return linhas, obrigacoes_resposta(linhas)
+
+# Listar Obrigações Acessórias (por deslocamento ou por cursor)
+async def get_obrigacoes(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, opcoes: tuple = (), filtros: tuple = ()):
+    return (await db.scalars(consulta_paginada(ObrigacaoAcessoria, skip, limit, cursor, opcoes, filtros=filtros))).all()
+
+# Atualizar Obrigação Acessória
+async def update_obrigacao(db: AsyncSession, obrigacao_id: int, obrigacao: ObrigacaoAcessoriaUpdate):
+    update_data = obrigacao.model_dump(exclude_unset=True, mode="json")  # 🔹 Ignora valores None
+    try:
+        linha = (await db.execute(update_obrigacao_retornando(obrigacao_id, update_data))).first()
+    except IntegrityError as e:
+        await db.rollback()
+        raise erro_integridade_obrigacao(e)
+    if linha is None:
+        raise HTTPException(status_code=404, detail="Obrigação acessória não encontrada")
+
+    await db.commit()
+    cache_empresas.invalidar(linha.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
+
+# Deletar Obrigação Acessória
+async def delete_obrigacao(db: AsyncSession, obrigacao_id: int):
+    linha = (await db.execute(delete_obrigacao_retornando(obrigacao_id))).first()
+    if linha is None:
+        raise HTTPException(status_code=404, detail="Obrigação acessória não encontrada")
+
+    await db.commit()
+    cache_empresas.invalidar(linha.empresa_id)
+    cache_contagens.limpar()
+    return obrigacao_resposta(linha)
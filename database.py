@@ -1,8 +1,18 @@
 # database.py
+import asyncio
+import logging
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from pathlib import Path
 
 # Carregar o arquivo .env explicitamente
@@ -20,29 +30,299 @@ DB_NAME = os.getenv("DB_NAME_TESTE", "banco_teste") if ENV == "test" else os.get
 
 # Criar a URL de conexão com o banco de dados de teste
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Imprimir os dados
-print(f"DB_USER: {DB_USER}")
-print(f"DB_PASSWORD: {DB_PASSWORD}")
-print(f"DB_HOST: {DB_HOST}")
-print(f"DB_PORT: {DB_PORT}")
-print(f"DB_NAME: {DB_NAME}")
-print(f"ENV: {ENV}")
-print(f"DATABASE_URL: {DATABASE_URL}")
+# DB_ASYNC=true troca as rotas principais pelas versões assíncronas (AsyncSession + asyncpg)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "sim")
 
-# Criar o engine de conexão com o banco de dados
-engine = create_engine(DATABASE_URL)
+# Configuração do pool de conexões (os padrões são os do SQLAlchemy)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # Segundos; -1 desativa
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "sim")
+# Conexões abertas pelo lifespan antes de a aplicação ficar pronta (GET /readyz); 0 desativa.
+# No máximo DB_POOL_SIZE: as de overflow seriam fechadas assim que voltassem ao pool
+DB_POOL_AQUECIMENTO = min(int(os.getenv("DB_POOL_AQUECIMENTO", str(DB_POOL_SIZE))), DB_POOL_SIZE)
 
-# Criar a sessão
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Instrumentação SQL: consultas mais lentas que isso (ms) vão para o log; 0 desativa
+DB_CONSULTA_LENTA_MS = float(os.getenv("DB_CONSULTA_LENTA_MS", "200"))
+# Detector de N+1: o mesmo comando mais de DB_N_MAIS_UM_LIMITE vezes em uma requisição.
+# "desligado" (produção), "avisar" (loga) ou "falhar" (levanta ConsultasRepetidas; usado nos testes)
+DB_N_MAIS_UM = os.getenv("DB_N_MAIS_UM", "desligado")
+DB_N_MAIS_UM_LIMITE = int(os.getenv("DB_N_MAIS_UM_LIMITE", "10"))
+MODOS_N_MAIS_UM = ("desligado", "avisar", "falhar")
+if DB_N_MAIS_UM not in MODOS_N_MAIS_UM:
+    raise ValueError(f"DB_N_MAIS_UM inválido: {DB_N_MAIS_UM}. Opções: {', '.join(MODOS_N_MAIS_UM)}")
+
+# Contadores de uso do pool: quantos checkouts, quanto tempo esperaram e quantos estouraram o timeout
+class EstatisticasPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar(self, espera: float, timeout: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timeout
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+
+# Mede o tempo de cada checkout (espera por conexão livre ou abertura de uma nova)
+class _PoolMonitorado:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estatisticas = EstatisticasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            self.estatisticas.registrar(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.estatisticas.registrar(time.perf_counter() - inicio)
+        return conexao
+
+class PoolMonitorado(_PoolMonitorado, QueuePool):
+    pass
+
+class PoolAsyncMonitorado(_PoolMonitorado, AsyncAdaptedQueuePool):
+    pass
+
+# Redimensiona os pools antes da criação dos engines (servidor.py divide o orçamento de conexões
+# entre os workers). Vale para este processo e, pelo ambiente, para os workers criados depois.
+def configurar_pool(pool_size: int, max_overflow: int):
+    global DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_AQUECIMENTO
+    if "SessionLocal" in globals() or "AsyncSessionLocal" in globals():
+        raise RuntimeError("configurar_pool precisa ser chamado antes da criação dos engines")
+    DB_POOL_SIZE, DB_MAX_OVERFLOW = pool_size, max_overflow
+    DB_POOL_AQUECIMENTO = min(DB_POOL_AQUECIMENTO, pool_size)
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+def _opcoes_pool() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# Os engines e as fábricas de sessão (engine, SessionLocal, async_engine, AsyncSessionLocal) não
+# existem no import: são criados pelo lifespan da aplicação (iniciar_banco) ou no primeiro acesso,
+# como em "from database import SessionLocal" nos scripts e benchmarks. Importar este módulo não
+# carrega os drivers nem depende de um banco no ar.
+_modulo = sys.modules[__name__]
+_lock_engines = threading.Lock()
+
+def _criar_engine():
+    global engine, SessionLocal
+    with _lock_engines:
+        if "SessionLocal" in globals():
+            return
+        engine = create_engine(DATABASE_URL, poolclass=PoolMonitorado, **_opcoes_pool())
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Engine e sessão assíncronas (só usadas com DB_ASYNC=true; o asyncpg é importado aqui).
+# expire_on_commit=False: em modo assíncrono não há lazy load depois do commit.
+def _criar_engine_async():
+    global async_engine, AsyncSessionLocal
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    with _lock_engines:
+        if "AsyncSessionLocal" in globals():
+            return
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=PoolAsyncMonitorado, **_opcoes_pool())
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def __getattr__(nome: str):
+    if nome in ("engine", "SessionLocal"):
+        _criar_engine()
+    elif nome in ("async_engine", "AsyncSessionLocal"):
+        _criar_engine_async()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    return globals()[nome]
+
+# Abre `conexoes` conexões e as devolve ao pool, que fica com elas abertas:
+# as primeiras requisições não pagam a conexão (TCP, autenticação, parâmetros da sessão)
+def aquecer_pool(conexoes: Optional[int] = None):
+    conexoes = DB_POOL_AQUECIMENTO if conexoes is None else conexoes
+    pool = _modulo.engine.pool
+    abertas = []
+    try:
+        for _ in range(conexoes):
+            abertas.append(pool.connect())
+    finally:
+        for conexao in abertas:
+            conexao.close()
+    # 🔹 As estatísticas de /pool/ contam só o uso real
+    pool.estatisticas = EstatisticasPool()
+
+# O mesmo para o pool assíncrono, com as conexões abertas em paralelo
+async def aquecer_pool_async(conexoes: Optional[int] = None):
+    conexoes = DB_POOL_AQUECIMENTO if conexoes is None else conexoes
+    async_engine = _modulo.async_engine
+    abertas = await asyncio.gather(*(async_engine.connect().start() for _ in range(conexoes)), return_exceptions=True)
+    await asyncio.gather(*(conexao.close() for conexao in abertas if not isinstance(conexao, BaseException)))
+    erros = [conexao for conexao in abertas if isinstance(conexao, BaseException)]
+    if erros:
+        raise erros[0]
+    async_engine.pool.estatisticas = EstatisticasPool()
+
+# Chamado pelo lifespan antes de a aplicação ficar pronta: cria os engines em uso e aquece os pools.
+# Com o banco fora do ar, a falha é registrada e a aplicação sobe assim mesmo (GET /readyz
+# responde 503 até o banco voltar; o pool abre as conexões sob demanda).
+async def iniciar_banco():
+    try:
+        await asyncio.to_thread(_criar_engine)
+        await asyncio.to_thread(aquecer_pool)
+        if DB_ASYNC:
+            await asyncio.to_thread(_criar_engine_async)
+            await aquecer_pool_async()
+    except Exception:
+        logger.exception("Falha ao aquecer o pool de conexões; as conexões serão abertas sob demanda")
+
+# Chamado no fim do lifespan: fecha as conexões ociosas dos pools
+async def encerrar_banco():
+    if "SessionLocal" in globals():
+        engine.dispose()
+    if "AsyncSessionLocal" in globals():
+        await async_engine.dispose()
+
+# Prontidão (GET /readyz): um SELECT 1 por uma conexão do pool
+def banco_disponivel() -> bool:
+    try:
+        with _modulo.engine.connect() as conexao:
+            conexao.exec_driver_sql("SELECT 1")
+        return True
+    except exc.SQLAlchemyError:
+        logger.warning("Banco indisponível para GET /readyz", exc_info=True)
+        return False
 
 # Definir Base
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+# Levantada no modo DB_N_MAIS_UM=falhar
+class ConsultasRepetidas(Exception):
+    pass
+
+# Comandos SQL executados em um escopo (uma requisição, ou um bloco de teste). O formato do
+# comando é o SQL com os parâmetros ainda como placeholders: N+1 é o mesmo formato repetido.
+class Consultas:
+    __slots__ = ("quantidade", "tempo", "formatos", "detectar_n_mais_um", "pai")
+
+    def __init__(self, detectar_n_mais_um: bool = False, pai: Optional["Consultas"] = None, formatos: bool = True):
+        self.quantidade = 0
+        self.tempo = 0.0
+        # formato -> execuções, na ordem da primeira execução; None se os formatos não são contados
+        self.formatos = {} if formatos or detectar_n_mais_um else None
+        self.detectar_n_mais_um = detectar_n_mais_um
+        self.pai = pai
+
+    def registrar(self, formato: str, duracao: float, repeticao_esperada: bool):
+        self.quantidade += 1
+        self.tempo += duracao
+        if self.formatos is None:
+            return
+        execucoes = self.formatos[formato] = self.formatos.get(formato, 0) + 1
+        # 🔹 Avisa uma vez só, quando o limite é ultrapassado
+        if self.detectar_n_mais_um and execucoes == DB_N_MAIS_UM_LIMITE + 1 and not repeticao_esperada and DB_N_MAIS_UM != "desligado":
+            mensagem = f"Possível N+1: comando executado mais de {DB_N_MAIS_UM_LIMITE} vezes na mesma requisição: {formato}"
+            if DB_N_MAIS_UM == "falhar":
+                raise ConsultasRepetidas(mensagem)
+            logger.warning(mensagem)
+
+# O middleware de métricas só conta os formatos (um dict por requisição) com o detector ligado
+def n_mais_um_ligado() -> bool:
+    return DB_N_MAIS_UM != "desligado"
+
+consultas_atuais: ContextVar[Optional[Consultas]] = ContextVar("consultas", default=None)
+
+# Abre um escopo de contagem. Os escopos se aninham: as consultas de uma requisição feita dentro
+# de um bloco de teste contam nos dois.
+#   with registrar_consultas() as consultas:
+#       client.get("/empresas/")
+#   assert consultas.quantidade == 2
+@contextmanager
+def registrar_consultas(detectar_n_mais_um: bool = False):
+    consultas = Consultas(detectar_n_mais_um, pai=consultas_atuais.get())
+    token = consultas_atuais.set(consultas)
+    try:
+        yield consultas
+    finally:
+        consultas_atuais.reset(token)
+
+# Tipos dos parâmetros, sem os valores (que podem ter CNPJ, e-mail...)
+def formato_parametros(parametros, executemany: bool = False) -> str:
+    if executemany:
+        return f"{len(parametros)} x {formato_parametros(parametros[0])}" if parametros else "[]"
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{nome}: {type(valor).__name__}" for nome, valor in parametros.items()) + "}"
+    return "(" + ", ".join(type(valor).__name__ for valor in parametros or ()) + ")"
+
+# Os eventos são registrados na classe Engine: valem para todos os engines, inclusive o
+# sync_engine por trás do engine assíncrono e os criados pelos testes
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    conn.info["inicio_comando"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info.pop("inicio_comando", None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    if 0 < DB_CONSULTA_LENTA_MS <= duracao * 1000:
+        logger.warning("Consulta lenta (%.1f ms): %s | parâmetros: %s", duracao * 1000, statement,
+                       formato_parametros(parameters, executemany))
+    consultas = consultas_atuais.get()
+    if consultas is None:
+        return
+    # Comandos repetidos de propósito (ex.: uma consulta por mês no calendário) usam
+    # .execution_options(repeticao_esperada=True) e ficam fora do detector
+    repeticao_esperada = context is not None and context.execution_options.get("repeticao_esperada", False)
+    while consultas is not None:
+        consultas.registrar(statement, duracao, repeticao_esperada)
+        consultas = consultas.pai
+
+# Situação atual do pool de um engine
+def _estatisticas(pool) -> dict:
+    estatisticas = pool.estatisticas
+    return {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "checkouts": estatisticas.checkouts,
+        "timeouts": estatisticas.timeouts,
+        "espera_media_ms": round(estatisticas.espera_total / estatisticas.checkouts * 1000, 3) if estatisticas.checkouts else 0.0,
+        "espera_maxima_ms": round(estatisticas.espera_maxima * 1000, 3),
+    }
+
+# Estatísticas dos pools em uso (o assíncrono só aparece com DB_ASYNC=true)
+def estatisticas_pool() -> dict:
+    pools = {"sync": _estatisticas(_modulo.engine.pool)}
+    if DB_ASYNC:
+        pools["async"] = _estatisticas(_modulo.async_engine.pool)
+    return pools
+
 # Função para obter a sessão do banco de dados
 def get_db():
-    db = SessionLocal()
+    db = _modulo.SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Função para obter a sessão assíncrona do banco de dados
+async def get_async_db():
+    async with _modulo.AsyncSessionLocal() as db:
+        yield db
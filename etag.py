@@ -0,0 +1,32 @@
+import hashlib
+from fastapi import Request, Response
+
+# ETags das respostas padrão (sem fields/include), derivadas da coluna "versao" das tabelas.
+# Uma resposta 304 não carrega nem serializa as linhas: só compara versões.
+
+
+# ETag do detalhe de uma empresa (a versão já cobre as obrigações embutidas)
+def etag_empresa(empresa_id: int, versao: int) -> str:
+    return f'"empresa-{empresa_id}-v{versao}"'
+
+
+# ETag de uma página: resumo das versões das linhas da página e dos parâmetros da consulta
+def etag_pagina(request: Request, versoes) -> str:
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(f"{request.url.path}?{request.url.query}".encode())
+    resumo.update(repr([tuple(versao) for versao in versoes]).encode())
+    return f'"{resumo.hexdigest()}"'
+
+
+# O cliente já tem essa versão? (If-None-Match usa comparação fraca: W/ é ignorado)
+def cliente_atualizado(request: Request, etag: str) -> bool:
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    return etag in (valor.strip().removeprefix("W/") for valor in cabecalho.split(","))
+
+
+def nao_modificado(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,52 @@
+import csv
+import io
+from typing import Iterator
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+import database
+from models import Empresa, ObrigacaoAcessoria
+
+# Formatos aceitos e o media type de cada um
+FORMATOS_EXPORTACAO = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Linhas buscadas do cursor do servidor por vez (e gravadas por bloco na resposta)
+LINHAS_POR_LOTE = 1_000
+
+COLUNAS_EMPRESA = (Empresa.id, Empresa.nome, Empresa.cnpj, Empresa.endereco, Empresa.email, Empresa.telefone)
+COLUNAS_OBRIGACAO = (ObrigacaoAcessoria.id, ObrigacaoAcessoria.nome, ObrigacaoAcessoria.periodicidade, ObrigacaoAcessoria.empresa_id)
+
+
+def formatar_ndjson(nomes: list, linhas) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(nomes, linha))) + b"\n" for linha in linhas)
+
+
+def formatar_csv(linhas) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(linhas)
+    return buffer.getvalue().encode()
+
+
+# Gera o conteúdo da exportação em blocos, lendo a tabela por um cursor do servidor (yield_per).
+# A sessão é própria do gerador: a da requisição já foi fechada quando o corpo começa a ser enviado.
+def gerar_exportacao(colunas: tuple, formato: str) -> Iterator[bytes]:
+    with database.SessionLocal() as sessao:
+        resultado = sessao.execute(
+            select(*colunas).order_by(colunas[0]).execution_options(yield_per=LINHAS_POR_LOTE)
+        )
+        nomes = list(resultado.keys())
+        if formato == "csv":
+            yield formatar_csv([nomes])
+        for lote in resultado.partitions():
+            yield formatar_ndjson(nomes, lote) if formato == "ndjson" else formatar_csv(lote)
+
+
+# Resposta em streaming com a tabela inteira, sem paginação
+def exportar(colunas: tuple, formato: str, nome_arquivo: str) -> StreamingResponse:
+    if formato not in FORMATOS_EXPORTACAO:
+        raise HTTPException(status_code=400, detail="Formato de exportação não suportado. Use 'ndjson' ou 'csv'")
+    return StreamingResponse(
+        gerar_exportacao(colunas, formato),
+        media_type=FORMATOS_EXPORTACAO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato}"'},
+    )
@@ -0,0 +1,53 @@
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+from fastapi import HTTPException
+
+FORMATOS_IMPORTACAO = ("csv", "ndjson")
+
+# Formato explícito (?formato=) ou deduzido pela extensão do arquivo
+def detectar_formato(nome_arquivo: Optional[str], formato: Optional[str]) -> str:
+    if formato is None and nome_arquivo:
+        extensao = nome_arquivo.rsplit(".", 1)[-1].lower()
+        formato = "ndjson" if extensao in ("ndjson", "jsonl") else extensao
+    if formato not in FORMATOS_IMPORTACAO:
+        raise HTTPException(status_code=400, detail="Formato de arquivo não suportado. Use 'csv' ou 'ndjson'")
+    return formato
+
+# Lê o arquivo linha a linha, sem carregá-lo inteiro na memória.
+# Gera (número da linha, dados, erro), onde erro é preenchido quando a linha não pôde ser interpretada.
+def ler_linhas(arquivo: BinaryIO, formato: str) -> Iterator[tuple]:
+    texto = codecs.iterdecode(arquivo, "utf-8-sig")
+    numero = 0
+    try:
+        if formato == "csv":
+            leitor = csv.DictReader(texto)
+            for dados in leitor:
+                numero = leitor.line_num
+                yield numero, dados, None
+            return
+
+        for numero, linha in enumerate(texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                dados = json.loads(linha)
+            except ValueError:
+                yield numero, None, "JSON inválido"
+                continue
+            if not isinstance(dados, dict):
+                yield numero, None, "Cada linha deve ser um objeto JSON"
+                continue
+            yield numero, dados, None
+    except UnicodeDecodeError:
+        # 🔹 Sem saber onde a próxima linha começa, o restante do arquivo não é lido;
+        # as linhas anteriores seguem para a importação normalmente
+        yield numero + 1, None, "Arquivo não está em UTF-8: a leitura parou nesta linha"
+
+# Agrupa um iterador em listas de até `tamanho` itens
+def em_lotes(iteravel, tamanho: int) -> Iterator[list]:
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
@@ -1,38 +1,91 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException
+from datetime import date
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import Any, Dict, List, Optional
+from busca import LIMITE_BUSCA, buscar_empresas, construir_indice_em_segundo_plano
+from cache import cache_contagens, cache_empresas
+from calendario import calendario
+from database import DB_ASYNC, banco_disponivel, encerrar_banco, estatisticas_pool, get_db, iniciar_banco
+from etag import cliente_atualizado, etag_empresa, etag_pagina, nao_modificado
+from exportacao import COLUNAS_EMPRESA, COLUNAS_OBRIGACAO, exportar
+from importacao import detectar_formato, ler_linhas
+from metricas import MiddlewareMetricas, classe_rota, metricas
+from paginacao import CABECALHO_PROXIMO_CURSOR, codificar_cursor, definir_proximo_cursor
+from projecao import projetar_empresa, projetar_obrigacao
 from crud import (
+    criar_empresa as criar_empresa_crud,
+    criar_empresas_em_lote,
+    criar_obrigacao,
+    contar_empresas,
+    contar_obrigacoes,
     get_empresas, 
+    get_empresas_resposta,
     get_empresa_by_id, 
+    get_empresa_detalhada,
     update_empresa, 
     delete_empresa, 
+    filtros_empresas,
+    filtros_obrigacoes,
     get_obrigacoes, 
+    get_obrigacoes_resposta,
+    get_resumo_obrigacoes,
+    importar_obrigacoes,
+    versoes_empresas,
+    versoes_obrigacoes,
     update_obrigacao, 
     delete_obrigacao
 )
-import models
 from schemas import (
     EmpresaCreate,
     EmpresaUpdate,
+    Contagem,
+    EmpresaBusca,
+    EmpresaLoteResposta,
     ObrigacaoAcessoriaCreate,
     ObrigacaoAcessoriaUpdate,
     ObrigacaoAcessoriaResponse,
+    ObrigacaoImportacaoResposta,
+    PeriodicidadeEnum,
+    ResumoObrigacoesEmpresa,
     Empresa
 )
 
 # Carregar as variáveis do .env
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔹 Engines criados e pool aquecido (DB_POOL_AQUECIMENTO conexões) antes de GET /readyz responder 200
+    app.state.pronto = False
+    await iniciar_banco()
+    # 🔹 Índice de busca de empresas em memória; até ficar pronto, /empresas/search consulta o banco
+    parar_indice = construir_indice_em_segundo_plano()
+    app.state.pronto = True
+    yield
+    app.state.pronto = False
+    parar_indice.set()
+    await encerrar_banco()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Prova de Seleção de Estágio - FastAPI, Pydantic e SQLAlchemy",
     description="""Criar uma API simples utilizando FastAPI, Pydantic, SQLAlchemy para cadastrar 
                 empresas e gerenciar obrigações acessórias que a empresa precisa declarar para o 
                 governo.""",
     version="1.0.0",
 )
+# 🔹 Server-Timing em cada resposta e histogramas por rota em GET /metrics (fases com METRICAS_FASES=true)
+app.router.route_class = classe_rota
+app.add_middleware(MiddlewareMetricas)
+
+# DB_ASYNC=true: as rotas assíncronas são registradas primeiro e atendem os mesmos caminhos
+if DB_ASYNC:
+    from rotas_async import router as rotas_async
+    app.include_router(rotas_async)
 
 
 # Determinar o ambiente atual
@@ -52,10 +105,18 @@ def read_root():
         "endpoints": {
             "Documentação Swagger": "http://127.0.0.1:8000/docs",
             "Documentação ReDoc": "http://127.0.0.1:8000/redoc",
+            "Verificação de vida (liveness)": "GET http://127.0.0.1:8000/healthz",
+            "Verificação de prontidão (readiness)": "GET http://127.0.0.1:8000/readyz",
+            "Estatísticas do pool de conexões": "GET http://127.0.0.1:8000/pool/",
+            "Estatísticas do cache": "GET http://127.0.0.1:8000/cache/",
             
             "Empresas": {
                 "Listar empresas": "GET http://127.0.0.1:8000/empresas/",
                 "Criar empresa": "POST http://127.0.0.1:8000/empresas/",
+                "Criar empresas em lote": "POST http://127.0.0.1:8000/empresas/bulk",
+                "Exportar empresas (NDJSON/CSV)": "GET http://127.0.0.1:8000/empresas/exportar?formato=ndjson",
+                "Buscar empresas (autocomplete)": "GET http://127.0.0.1:8000/empresas/search?q=sport",
+                "Contar empresas": "GET http://127.0.0.1:8000/empresas/count",
                 "Detalhar empresa": "GET http://127.0.0.1:8000/empresas/{empresa_id}/",
                 "Atualizar empresa": "PUT http://127.0.0.1:8000/empresas/{empresa_id}/",
                 "Excluir empresa": "DELETE http://127.0.0.1:8000/empresas/{empresa_id}/"
@@ -64,38 +125,135 @@ def read_root():
             "Obrigações Acessórias": {
                 "Listar obrigações": "GET http://127.0.0.1:8000/obrigacoes_acessorias/",
                 "Criar obrigação": "POST http://127.0.0.1:8000/obrigacoes_acessorias/",
+                "Importar obrigações (CSV/NDJSON)": "POST http://127.0.0.1:8000/obrigacoes_acessorias/importar",
+                "Contar obrigações": "GET http://127.0.0.1:8000/obrigacoes_acessorias/count?empresa_id=1",
+                "Resumo de obrigações por empresa": "GET http://127.0.0.1:8000/obrigacoes_acessorias/resumo",
+                "Calendário de vencimentos": "GET http://127.0.0.1:8000/obrigacoes_acessorias/calendario?inicio=2026-01-01&fim=2026-12-31",
+                "Exportar obrigações (NDJSON/CSV)": "GET http://127.0.0.1:8000/obrigacoes_acessorias/exportar?formato=ndjson",
                 "Atualizar obrigação": "PUT http://127.0.0.1:8000/obrigacoes_acessorias/{obrigacao_id}/",
                 "Excluir obrigação": "DELETE http://127.0.0.1:8000/obrigacoes_acessorias/{obrigacao_id}/"
             }
         }
 
     }
+@app.get("/healthz")
+async def verificar_vida():
+    # 🔹 O processo responde; não consulta o banco (um banco fora do ar não deve reiniciar o worker)
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def verificar_prontidao(request: Request):
+    # 🔹 Pronto depois do lifespan (pool aquecido) e com o banco respondendo; senão 503
+    if not getattr(request.app.state, "pronto", False):
+        return ORJSONResponse({"status": "iniciando"}, status_code=503)
+    if not banco_disponivel():
+        return ORJSONResponse({"status": "banco indisponível"}, status_code=503)
+    return {"status": "pronto"}
+
+@app.get("/pool/")
+def obter_estatisticas_pool():
+    # 🔹 Dados para dimensionar DB_POOL_SIZE/DB_MAX_OVERFLOW a partir do uso real
+    return estatisticas_pool()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def obter_metricas():
+    # 🔹 Formato texto do Prometheus (latência por rota e fase, requisições em andamento)
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/")
+def obter_estatisticas_cache():
+    return {"empresas": cache_empresas.estatisticas(), "contagens": cache_contagens.estatisticas()}
+
 # ============================
 # Rotas para Empresas
 # ============================
 
 @app.post("/empresas/", response_model=Empresa)
 def criar_empresa(empresa: EmpresaCreate, db: Session = Depends(get_db)):
-    empresa_existente = db.query(models.Empresa).filter(models.Empresa.cnpj == empresa.cnpj).first()
-    if empresa_existente:
-        raise HTTPException(status_code=400, detail="CNPJ já cadastrado")
-
-    db_empresa = models.Empresa(**empresa.model_dump())
-    db.add(db_empresa)
-    db.commit()
-    db.refresh(db_empresa)
-    return db_empresa
+    # 🔹 INSERT ... ON CONFLICT DO NOTHING RETURNING: CNPJ ou e-mail duplicado vira 400
+    return criar_empresa_crud(db, empresa)
+
+@app.post("/empresas/bulk", response_model=EmpresaLoteResposta)
+def criar_empresas_lote(empresas: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    # 🔹 Cada linha é validada individualmente: erros de uma não derrubam o lote inteiro
+    return criar_empresas_em_lote(db, empresas)
 
 @app.get("/empresas/", response_model=List[Empresa])
-def listar_empresas(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return get_empresas(db=db, skip=skip, limit=limit)
+def listar_empresas(
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    cnpj: Optional[str] = None,
+    nome: Optional[str] = None,
+    email: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    filtros = filtros_empresas(cnpj=cnpj, nome=nome, email=email)
+    projecao = projetar_empresa(fields, include)
+    if projecao is None:
+        # 🔹 Polling com If-None-Match: só as versões da página são lidas para responder 304
+        if request.headers.get("if-none-match"):
+            etag = etag_pagina(request, versoes_empresas(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros))
+            if cliente_atualizado(request, etag):
+                return nao_modificado(etag)
+        # 🔹 Caminho rápido: dicts montados das linhas e codificados pelo orjson, sem ORM nem response_model
+        linhas, empresas = get_empresas_resposta(db=db, skip=skip, limit=limit, cursor=cursor, filtros=filtros)
+        resposta = ORJSONResponse(empresas, headers={"ETag": etag_pagina(request, [(e.id, e.versao) for e in linhas])})
+        definir_proximo_cursor(resposta, linhas, limit)
+        return resposta
+
+    # 🔹 fields/include: só as colunas e relacionamentos pedidos são carregados e serializados
+    empresas = get_empresas(db=db, skip=skip, limit=limit, cursor=cursor, opcoes=projecao.opcoes, filtros=filtros)
+    resposta = projecao.responder(empresas)
+    definir_proximo_cursor(resposta, empresas, limit)
+    return resposta
+
+@app.get("/empresas/exportar")
+def exportar_empresas(formato: str = "ndjson"):
+    # 🔹 Tabela inteira em uma requisição, com memória limitada (cursor no servidor + streaming)
+    return exportar(COLUNAS_EMPRESA, formato, "empresas")
+
+@app.get("/empresas/count", response_model=Contagem)
+def contar_total_empresas(
+    response: Response,
+    cnpj: Optional[str] = None,
+    nome: Optional[str] = None,
+    email: Optional[str] = None,
+    exata: bool = False,
+    db: Session = Depends(get_db),
+):
+    # 🔹 Mesmos filtros da listagem; sem filtros, o total é estimado (exata=true força o count)
+    filtros = filtros_empresas(cnpj=cnpj, nome=nome, email=email)
+    contagem = contar_empresas(db, filtros, (cnpj, nome, email), exata)
+    response.headers["X-Total-Count"] = str(contagem["total"])
+    return contagem
+
+@app.get("/empresas/search", response_model=List[EmpresaBusca])
+def buscar_empresas_por_prefixo(q: str, limit: int = LIMITE_BUSCA, db: Session = Depends(get_db)):
+    # 🔹 Prefixo de qualquer palavra do nome ou do CNPJ, sem diferenciar maiúsculas e acentos
+    if not q.strip() or limit <= 0:
+        raise HTTPException(status_code=400, detail="Informe 'q' e um 'limit' positivo")
+    return buscar_empresas(db, q, limit)
 
 @app.get("/empresas/{empresa_id}/", response_model=Empresa)
-def obter_detalhes_empresa(empresa_id: int, db: Session = Depends(get_db)):
-    db_empresa = get_empresa_by_id(db, empresa_id)
-    if not db_empresa:
-        raise HTTPException(status_code=404, detail="Empresa não encontrada")
-    return db_empresa
+def obter_detalhes_empresa(
+    empresa_id: int,
+    request: Request,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    projecao = projetar_empresa(fields, include)
+    if projecao is None:
+        versao, detalhe = get_empresa_detalhada(db, empresa_id)  # 🔹 Resposta completa vem do cache
+        etag = etag_empresa(empresa_id, versao)
+        if cliente_atualizado(request, etag):
+            return nao_modificado(etag)
+        return ORJSONResponse(detalhe, headers={"ETag": etag})
+    return projecao.responder(get_empresa_by_id(db, empresa_id, opcoes=projecao.opcoes))
 
 @app.put("/empresas/{empresa_id}/", response_model=Empresa)
 def atualizar_empresa(empresa_id: int, empresa: EmpresaUpdate, db: Session = Depends(get_db)):
@@ -116,24 +274,92 @@ def excluir_empresa(empresa_id: int, db: Session = Depends(get_db)):
 # ============================
 
 @app.get("/obrigacoes_acessorias/", response_model=List[ObrigacaoAcessoriaResponse])
-def listar_obrigacoes(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return get_obrigacoes(db=db, skip=skip, limit=limit)
+def listar_obrigacoes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    empresa_id: Optional[int] = None,
+    periodicidade: Optional[PeriodicidadeEnum] = None,
+    nome: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    filtros = filtros_obrigacoes(empresa_id=empresa_id, periodicidade=periodicidade, nome=nome)
+    projecao = projetar_obrigacao(fields, include)
+    if projecao is None:
+        if request.headers.get("if-none-match"):
+            etag = etag_pagina(request, versoes_obrigacoes(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros))
+            if cliente_atualizado(request, etag):
+                return nao_modificado(etag)
+        linhas, obrigacoes = get_obrigacoes_resposta(db=db, skip=skip, limit=limit, cursor=cursor, filtros=filtros)
+        etag = etag_pagina(request, [(o.id, o.versao, o.empresa_versao) for o in linhas])
+        resposta = ORJSONResponse(obrigacoes, headers={"ETag": etag})
+        definir_proximo_cursor(resposta, linhas, limit)
+        return resposta
+
+    obrigacoes = get_obrigacoes(db=db, skip=skip, limit=limit, cursor=cursor, opcoes=projecao.opcoes, filtros=filtros)
+    resposta = projecao.responder(obrigacoes)
+    definir_proximo_cursor(resposta, obrigacoes, limit)
+    return resposta
+
+@app.get("/obrigacoes_acessorias/exportar")
+def exportar_obrigacoes(formato: str = "ndjson"):
+    return exportar(COLUNAS_OBRIGACAO, formato, "obrigacoes_acessorias")
+
+@app.get("/obrigacoes_acessorias/count", response_model=Contagem)
+def contar_obrigacoes_acessorias(
+    response: Response,
+    empresa_id: Optional[int] = None,
+    periodicidade: Optional[PeriodicidadeEnum] = None,
+    nome: Optional[str] = None,
+    exata: bool = False,
+    db: Session = Depends(get_db),
+):
+    filtros = filtros_obrigacoes(empresa_id=empresa_id, periodicidade=periodicidade, nome=nome)
+    contagem = contar_obrigacoes(db, filtros, (empresa_id, periodicidade, nome), exata)
+    response.headers["X-Total-Count"] = str(contagem["total"])
+    return contagem
+
+@app.get("/obrigacoes_acessorias/resumo", response_model=List[ResumoObrigacoesEmpresa])
+def resumo_obrigacoes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    empresa_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # 🔹 Lido da tabela resumo_obrigacoes (mantida pelas escritas), sem agregar as obrigações
+    resumo = get_resumo_obrigacoes(db, skip=skip, limit=limit, cursor=cursor, empresa_id=empresa_id)
+    if resumo and len(resumo) == limit:
+        response.headers[CABECALHO_PROXIMO_CURSOR] = codificar_cursor(resumo[-1]["empresa_id"])
+    return resumo
+
+@app.get("/obrigacoes_acessorias/calendario")
+def calendario_obrigacoes(
+    inicio: date,
+    fim: date,
+    empresa_id: Optional[int] = None,
+    formato: str = "ndjson",
+):
+    # 🔹 Uma linha por vencimento de cada obrigação no intervalo, em streaming
+    return calendario(inicio, fim, empresa_id, formato)
 
 @app.post("/obrigacoes_acessorias/", response_model=ObrigacaoAcessoriaResponse)
 def criar_nova_obrigacao(obrigacao: ObrigacaoAcessoriaCreate, db: Session = Depends(get_db)):
-    db_obrigacao = db.query(models.ObrigacaoAcessoria).filter(
-        models.ObrigacaoAcessoria.nome == obrigacao.nome, 
-        models.ObrigacaoAcessoria.empresa_id == obrigacao.empresa_id
-    ).first()
-    
-    if db_obrigacao:
-        raise HTTPException(status_code=400, detail="Essa obrigação acessória já existe para essa empresa.")
-    
-    db_obrigacao = models.ObrigacaoAcessoria(**obrigacao.model_dump())
-    db.add(db_obrigacao)
-    db.commit()
-    db.refresh(db_obrigacao)
-    return db_obrigacao
+    return criar_obrigacao(db, obrigacao)
+
+@app.post("/obrigacoes_acessorias/importar", response_model=ObrigacaoImportacaoResposta)
+def importar_obrigacoes_arquivo(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # 🔹 O arquivo é lido de forma incremental e gravado em lotes: a memória não cresce com o tamanho do arquivo
+    formato = detectar_formato(arquivo.filename, formato)
+    return importar_obrigacoes(db, ler_linhas(arquivo.file, formato))
 
 @app.put("/obrigacoes_acessorias/{obrigacao_id}/", response_model=ObrigacaoAcessoriaResponse)
 def atualizar_obrigacao(obrigacao_id: int, obrigacao: ObrigacaoAcessoriaUpdate, db: Session = Depends(get_db)):
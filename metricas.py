@@ -0,0 +1,243 @@
+import functools
+import inspect
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+from fastapi.routing import APIRoute
+from database import Consultas, consultas_atuais, n_mais_um_ligado
+
+# Tempos por requisição, enviados no cabeçalho Server-Timing e acumulados em histogramas expostos em
+# GET /metrics (formato texto do Prometheus). Por padrão só o tempo total e o de banco; com
+# METRICAS_FASES=true, também validação e serialização (RotaMedida envolve cada rota e endpoint).
+#
+# O tempo e a quantidade de consultas vêm da instrumentação SQL de database.py: cada requisição
+# abre um escopo de Consultas. Os comandos só são agrupados por formato com o detector de N+1
+# ligado (DB_N_MAIS_UM).
+#
+# Custo: alguns perf_counter() por requisição e por consulta, sem locks. Os histogramas só são
+# alterados pelo middleware, no loop de eventos; as threads das rotas síncronas escrevem apenas
+# na Medicao da própria requisição.
+
+METRICAS_FASES = os.getenv("METRICAS_FASES", "false").lower() in ("1", "true", "sim")
+
+# Limites (segundos) dos baldes dos histogramas
+LIMITES_HISTOGRAMA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Medicao:
+    """Marcações de tempo de uma requisição, compartilhadas via contextvar com a rota e o engine."""
+
+    __slots__ = ("inicio", "consultas", "inicio_rota", "inicio_endpoint", "fim_endpoint", "fim_rota")
+
+    def __init__(self, consultas: Optional[Consultas] = None):
+        self.inicio = time.perf_counter()
+        self.consultas = consultas or Consultas()
+        self.inicio_rota = self.inicio_endpoint = self.fim_endpoint = self.fim_rota = None
+
+    # (total, banco, validacao, serializacao); as duas últimas são None se a rota não chegou ao fim
+    def fases(self, fim: float) -> tuple:
+        banco = self.consultas.tempo
+        if self.fim_rota is None or self.fim_endpoint is None:
+            return fim - self.inicio, banco, None, None
+        # 🔹 Validação inclui as dependências (ex.: get_db) e a passagem para o threadpool
+        return fim - self.inicio, banco, self.inicio_endpoint - self.inicio_rota, self.fim_rota - self.fim_endpoint
+
+    def server_timing(self, fim: float) -> bytes:
+        total, banco, validacao, serializacao = self.fases(fim)
+        if validacao is None:
+            return b"total;dur=%.3f, banco;dur=%.3f" % (total * 1000, banco * 1000)
+        return b"total;dur=%.3f, banco;dur=%.3f, validacao;dur=%.3f, serializacao;dur=%.3f" % (
+            total * 1000, banco * 1000, validacao * 1000, serializacao * 1000
+        )
+
+
+_medicao: ContextVar[Optional[Medicao]] = ContextVar("medicao", default=None)
+
+
+FASES = ("total", "banco", "validacao", "serializacao")
+
+
+class MetricasRota:
+    """Histogramas (um por fase) e contagem por status de uma rota."""
+
+    __slots__ = ("baldes", "somas", "status", "consultas")
+
+    def __init__(self):
+        # Por fase, quantas observações caíram em cada balde; o último é acima do maior limite (+Inf)
+        self.baldes = [[0] * (len(LIMITES_HISTOGRAMA) + 1) for _ in FASES]
+        self.somas = [0.0] * len(FASES)
+        self.status = {}  # status -> quantidade
+        self.consultas = 0  # Comandos SQL somados de todas as requisições
+
+
+class Metricas:
+    def __init__(self):
+        self.em_andamento = 0
+        self.rotas = {}  # (metodo, rota) -> MetricasRota
+
+    # Caminho quente: sem chamadas de método por fase (cada microssegundo conta aqui)
+    def registrar(self, metodo: str, rota: str, status: int, fases: tuple, consultas: int = 0):
+        metricas_rota = self.rotas.get((metodo, rota))
+        if metricas_rota is None:
+            metricas_rota = self.rotas[metodo, rota] = MetricasRota()
+        baldes, somas = metricas_rota.baldes, metricas_rota.somas
+        total, banco, validacao, serializacao = fases
+        baldes[0][bisect_left(LIMITES_HISTOGRAMA, total)] += 1
+        somas[0] += total
+        baldes[1][bisect_left(LIMITES_HISTOGRAMA, banco)] += 1
+        somas[1] += banco
+        if validacao is not None:
+            baldes[2][bisect_left(LIMITES_HISTOGRAMA, validacao)] += 1
+            somas[2] += validacao
+            baldes[3][bisect_left(LIMITES_HISTOGRAMA, serializacao)] += 1
+            somas[3] += serializacao
+        status_rota = metricas_rota.status
+        status_rota[status] = status_rota.get(status, 0) + 1
+        metricas_rota.consultas += consultas
+
+    def limpar(self):
+        self.rotas.clear()
+
+    def exportar(self) -> str:
+        linhas = [
+            "# HELP api_requisicoes_em_andamento Requisições HTTP sendo atendidas agora.",
+            "# TYPE api_requisicoes_em_andamento gauge",
+            f"api_requisicoes_em_andamento {self.em_andamento}",
+            "# HELP api_requisicoes_total Requisições HTTP atendidas, por rota e status.",
+            "# TYPE api_requisicoes_total counter",
+        ]
+        rotas = sorted(self.rotas.items())
+        for (metodo, rota), metricas_rota in rotas:
+            for status, quantidade in sorted(metricas_rota.status.items()):
+                linhas.append(f'api_requisicoes_total{{{_rotulos(metodo, rota)},status="{status}"}} {quantidade}')
+
+        linhas += [
+            "# HELP api_consultas_banco_total Comandos SQL executados pelas requisições, por rota.",
+            "# TYPE api_consultas_banco_total counter",
+        ]
+        for (metodo, rota), metricas_rota in rotas:
+            linhas.append(f"api_consultas_banco_total{{{_rotulos(metodo, rota)}}} {metricas_rota.consultas}")
+
+        linhas += [
+            "# HELP api_requisicao_duracao_segundos Duração das requisições por rota e fase (total, banco, validacao, serializacao).",
+            "# TYPE api_requisicao_duracao_segundos histogram",
+        ]
+        for (metodo, rota), metricas_rota in rotas:
+            for fase, baldes, soma in zip(FASES, metricas_rota.baldes, metricas_rota.somas):
+                if not any(baldes):
+                    continue
+                rotulos = f'{_rotulos(metodo, rota)},fase="{fase}"'
+                acumulado = 0
+                for limite, quantidade in zip((*LIMITES_HISTOGRAMA, "+Inf"), baldes):
+                    acumulado += quantidade
+                    linhas.append(f'api_requisicao_duracao_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+                linhas.append(f"api_requisicao_duracao_segundos_sum{{{rotulos}}} {soma}")
+                linhas.append(f"api_requisicao_duracao_segundos_count{{{rotulos}}} {acumulado}")
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(metodo: str, rota: str) -> str:
+    return f'metodo="{metodo}",rota="{_escapar(rota)}"'
+
+
+metricas = Metricas()
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI (sem BaseHTTPMiddleware, que custa bem mais por requisição)."""
+
+    def __init__(self, app, fases: bool = METRICAS_FASES):
+        self.app = app
+        self.fases = fases  # True com RotaMedida nas rotas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        detectar = n_mais_um_ligado()
+        consultas = Consultas(detectar, consultas_atuais.get(), detectar)
+        medicao = Medicao(consultas)
+        # 🔹 Só a RotaMedida lê a medição pelo contextvar
+        token = _medicao.set(medicao) if self.fases else None
+        token_consultas = consultas_atuais.set(consultas)
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                # 🔹 Em respostas em streaming, "total" é o tempo até o primeiro byte
+                mensagem.setdefault("headers", []).append((b"server-timing", medicao.server_timing(time.perf_counter())))
+            await send(mensagem)
+
+        metricas.em_andamento += 1
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            metricas.em_andamento -= 1
+            if token is not None:
+                _medicao.reset(token)
+            consultas_atuais.reset(token_consultas)
+            rota = scope.get("route")
+            # 🔹 O caminho do template (/empresas/{empresa_id}/) mantém a cardinalidade baixa
+            metricas.registrar(scope["method"], rota.path if rota else "sem_rota", status,
+                               medicao.fases(time.perf_counter()), consultas.quantidade)
+
+
+def _medir_endpoint(endpoint):
+    # functools.wraps preserva a assinatura: o FastAPI continua vendo os parâmetros do endpoint
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def medido(*args, **kwargs):
+            medicao = _medicao.get()
+            if medicao is not None:
+                medicao.inicio_endpoint = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if medicao is not None:
+                    medicao.fim_endpoint = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def medido(*args, **kwargs):
+            medicao = _medicao.get()
+            if medicao is not None:
+                medicao.inicio_endpoint = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if medicao is not None:
+                    medicao.fim_endpoint = time.perf_counter()
+    return medido
+
+
+class RotaMedida(APIRoute):
+    """APIRoute que marca o início e o fim do endpoint: o que vem antes é validação
+    (parâmetros, corpo e dependências) e o que vem depois é serialização (response_model)."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _medir_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        tratar = super().get_route_handler()
+
+        async def tratar_medido(request):
+            medicao = _medicao.get()
+            if medicao is not None:
+                medicao.inicio_rota = time.perf_counter()
+            resposta = await tratar(request)
+            if medicao is not None:
+                medicao.fim_rota = time.perf_counter()
+            return resposta
+
+        return tratar_medido
+
+
+# Classe das rotas da aplicação: RotaMedida só quando as fases são medidas
+classe_rota = RotaMedida if METRICAS_FASES else APIRoute
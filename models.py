@@ -1,18 +1,39 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import DDL, BigInteger, Column, Index, Integer, String, ForeignKey, event, literal_column, text
 from sqlalchemy.orm import relationship
 from database import Base  # Importando corretamente o Base
 
 
+# Mesma expressão de busca.nome_para_busca() e da migração d3f9a6c1b274: minúsculas, sem acentos,
+# espaços simples, com um espaço no início
+NOME_PARA_BUSCA = r"""regexp_replace(' ' || translate(lower(nome), 'ÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝáàâãäåéèêëíìîïóòôõöúùûüçñýÿ', 'aaaaaaeeeeiiiiooooouuuucnyaaaaaaeeeeiiiiooooouuuucnyy'), '\s+', ' ', 'g')"""
+
+
+def _pg_trgm_instalado(ddl, target, bind, **kwargs) -> bool:
+    # 🔹 Sem conexão (SQL gerado offline), o índice entra no script
+    return bind is None or bind.scalar(text("SELECT EXISTS (SELECT FROM pg_extension WHERE extname = 'pg_trgm')"))
+
+
 # Modelo de Empresa
 class Empresa(Base):
     __tablename__ = "empresas"
+    __table_args__ = (
+        # Filtro por prefixo do nome (LIKE 'abc%'), independente da collation do banco
+        Index("ix_empresas_nome_prefixo", "nome", postgresql_ops={"nome": "varchar_pattern_ops"}),
+        # Busca pelo banco (busca.buscar_no_banco) sobre o nome normalizado; só é criado onde a
+        # extensão pg_trgm está instalada (migrações a91d3c7e5f02 e d3f9a6c1b274)
+        Index(
+            "ix_empresas_nome_busca_trgm", literal_column(NOME_PARA_BUSCA).label("nome_busca"),
+            postgresql_using="gin", postgresql_ops={"nome_busca": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=_pg_trgm_instalado),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, comment="Identificador único da empresa")
+    id = Column(Integer, primary_key=True, comment="Identificador único da empresa")
     nome = Column(String(100), index=True, nullable=False, comment="Nome da empresa")
     cnpj = Column(String(14), unique=True, index=True, nullable=False, comment="CNPJ da empresa (14 dígitos, único)")
     endereco = Column(String(200), nullable=True, comment="Endereço completo da empresa")
     email = Column(String(100), unique=True, nullable=False, comment="E-mail de contato da empresa (único)")
     telefone = Column(String(11), nullable=True, comment="Telefone de contato da empresa (10 ou 11 dígitos)")
+    versao = Column(Integer, nullable=False, default=1, server_default="1", comment="Incrementada a cada alteração da empresa ou de suas obrigações (ETag)")
 
     # Relacionamento com o modelo ObrigacaoAcessoria
     obrigacoes_acessorias = relationship(
@@ -20,13 +41,57 @@ class Empresa(Base):
     )
 
 
+# Contador de alterações que mudam a busca (empresa inserida ou excluída, nome ou CNPJ no UPDATE),
+# em uma linha só, somada por um trigger em empresas (migração f2b7c9d4e6a1). O incremento da versao
+# a cada escrita de obrigação não o move. Lido pela verificação periódica do índice de busca.
+class AlteracoesBusca(Base):
+    __tablename__ = "empresas_alteracoes_busca"
+
+    id = Column(Integer, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+event.listen(AlteracoesBusca.__table__, "after_create", DDL("INSERT INTO empresas_alteracoes_busca (id, total) VALUES (1, 0)"))
+# 🔹 Trigger adiado para o commit: o contador é transacional (só conta escritas confirmadas, visíveis no
+# mesmo snapshot que as empresas) e a linha fica travada só durante o commit, não enquanto a escrita
+# espera outra transação (ex.: um CNPJ em conflito numa inserção em lote)
+event.listen(Empresa.__table__, "after_create", DDL("""
+CREATE OR REPLACE FUNCTION contar_alteracao_busca() RETURNS trigger AS $$
+BEGIN
+    UPDATE empresas_alteracoes_busca SET total = total + 1 WHERE id = 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+CREATE CONSTRAINT TRIGGER empresas_alteracoes_busca AFTER INSERT OR DELETE OR UPDATE OF nome, cnpj ON empresas
+    DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION contar_alteracao_busca();
+""").execute_if(dialect="postgresql"))
+
+
 # Modelo de Obrigação Acessória
 class ObrigacaoAcessoria(Base):
     __tablename__ = "obrigacoes_acessorias"
+    __table_args__ = (
+        # Uma obrigação por nome em cada empresa; também atende as buscas só por empresa_id
+        Index("ix_obrigacoes_acessorias_empresa_id_nome", "empresa_id", "nome", unique=True),
+        # Filtros da listagem; (periodicidade, id) já entrega as linhas na ordem da paginação
+        Index("ix_obrigacoes_acessorias_periodicidade_id", "periodicidade", "id"),
+        Index("ix_obrigacoes_acessorias_nome", "nome"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     nome = Column(String, nullable=False)
     periodicidade = Column(String, nullable=False)
     empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
 
     empresa = relationship("Empresa", back_populates="obrigacoes_acessorias", lazy="joined")  # 🔥 Correção aqui
+
+
+# Quantidade de obrigações por empresa e periodicidade, mantida pelo crud na mesma transação
+# de cada escrita de obrigação (GET /obrigacoes_acessorias/resumo)
+class ResumoObrigacoes(Base):
+    __tablename__ = "resumo_obrigacoes"
+
+    empresa_id = Column(Integer, ForeignKey("empresas.id", ondelete="CASCADE"), primary_key=True)
+    periodicidade = Column(String, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0, server_default="0")
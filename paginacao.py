@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import HTTPException, Response
+
+# Cabeçalho com o cursor da próxima página
+CABECALHO_PROXIMO_CURSOR = "X-Next-Cursor"
+
+# Codifica o id da última linha da página em um cursor opaco
+def codificar_cursor(ultimo_id: int) -> str:
+    bruto = json.dumps({"id": ultimo_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+# Decodifica o cursor recebido do cliente e devolve o id a partir do qual continuar
+def decodificar_cursor(cursor: str) -> int:
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        ultimo_id = dados["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    if not isinstance(ultimo_id, int) or isinstance(ultimo_id, bool):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return ultimo_id
+
+# Valida a combinação de parâmetros de paginação
+def validar_paginacao(skip: int, limit: int, cursor: Optional[str]):
+    if skip < 0 or limit <= 0:
+        raise HTTPException(status_code=400, detail="Parâmetros 'skip' e 'limit' devem ser positivos")
+    if cursor is not None and skip:
+        raise HTTPException(status_code=400, detail="Use 'skip' ou 'cursor', não ambos")
+
+# Página cheia: informa ao cliente o cursor para buscar a próxima
+def definir_proximo_cursor(response: Response, itens: list, limit: int):
+    if itens and len(itens) == limit:
+        response.headers[CABECALHO_PROXIMO_CURSOR] = codificar_cursor(itens[-1].id)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+from fastapi import HTTPException, Response
+from pydantic import ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import joinedload, lazyload, load_only
+from crud import CARREGAR_OBRIGACOES
+from models import Empresa as EmpresaModel, ObrigacaoAcessoria as ObrigacaoModel
+from schemas import Empresa, EmpresaBase, ObrigacaoAcessoriaResponse
+
+# Campos (fields=) e relacionamentos (include=) aceitos por recurso, na ordem da resposta
+CAMPOS_EMPRESA = ("id", "nome", "cnpj", "endereco", "email", "telefone")
+CAMPOS_OBRIGACAO = ("id", "nome", "periodicidade", "empresa_id")
+INCLUSOES_EMPRESA = ("obrigacoes",)
+INCLUSOES_OBRIGACAO = ("empresa",)
+
+
+@dataclass(frozen=True)
+class Projecao:
+    """Colunas/relacionamentos a carregar no SQL e o modelo Pydantic que serializa só eles."""
+    opcoes: tuple
+    modelo: type
+
+    def responder(self, dados) -> Response:
+        # 🔹 Os adaptadores são compilados uma vez por combinação de fields/include (lru_cache)
+        adaptador = _adaptador(List[self.modelo] if isinstance(dados, list) else self.modelo)
+        corpo = adaptador.dump_json(adaptador.validate_python(dados, from_attributes=True))
+        return Response(content=corpo, media_type="application/json")
+
+
+# Lê uma lista separada por vírgulas e rejeita valores desconhecidos
+def _ler_lista(valor: Optional[str], permitidos: tuple, parametro: str):
+    if valor is None:
+        return None
+    itens = {item.strip() for item in valor.split(",") if item.strip()}
+    invalidos = sorted(itens - set(permitidos))
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Valores inválidos em '{parametro}': {', '.join(invalidos)}")
+    return tuple(item for item in permitidos if item in itens)
+
+
+def _campos_do_schema(schema: type, campos: tuple) -> dict:
+    return {campo: (schema.model_fields[campo].annotation, ...) for campo in campos}
+
+
+@lru_cache(maxsize=None)
+def _adaptador(tipo) -> TypeAdapter:
+    return TypeAdapter(tipo)
+
+
+@lru_cache(maxsize=None)
+def _modelo_obrigacao_embutida() -> type:
+    # Dentro da empresa a obrigação não repete a própria empresa
+    return create_model(
+        "ObrigacaoAcessoriaEmbutida",
+        __config__=ConfigDict(from_attributes=True),
+        **_campos_do_schema(ObrigacaoAcessoriaResponse, CAMPOS_OBRIGACAO),
+    )
+
+
+@lru_cache(maxsize=64)
+def _projecao_empresa(campos: tuple, incluir: frozenset) -> Projecao:
+    opcoes = [load_only(*(getattr(EmpresaModel, campo) for campo in campos))]
+    definicoes = _campos_do_schema(Empresa, campos)
+    if "obrigacoes" in incluir:
+        opcoes.append(CARREGAR_OBRIGACOES)
+        definicoes["obrigacoes_acessorias"] = (List[_modelo_obrigacao_embutida()], ...)
+    modelo = create_model("EmpresaParcial", __config__=ConfigDict(from_attributes=True), **definicoes)
+    return Projecao(tuple(opcoes), modelo)
+
+
+@lru_cache(maxsize=64)
+def _projecao_obrigacao(campos: tuple, incluir: frozenset) -> Projecao:
+    opcoes = [load_only(*(getattr(ObrigacaoModel, campo) for campo in campos))]
+    definicoes = _campos_do_schema(ObrigacaoAcessoriaResponse, campos)
+    if "empresa" in incluir:
+        opcoes.append(joinedload(ObrigacaoModel.empresa))
+        definicoes["empresa"] = (Optional[EmpresaBase], None)
+    else:
+        # 🔹 Sem include=empresa, não faz o JOIN padrão do relacionamento
+        opcoes.append(lazyload(ObrigacaoModel.empresa))
+    modelo = create_model("ObrigacaoAcessoriaParcial", __config__=ConfigDict(from_attributes=True), **definicoes)
+    return Projecao(tuple(opcoes), modelo)
+
+
+# Projeção pedida para empresas; None quando o cliente quer a resposta completa
+def projetar_empresa(fields: Optional[str], include: Optional[str]) -> Optional[Projecao]:
+    campos = _ler_lista(fields, CAMPOS_EMPRESA, "fields")
+    incluir = _ler_lista(include, INCLUSOES_EMPRESA, "include")
+    if campos is None and incluir is None:
+        return None
+    return _projecao_empresa(campos or CAMPOS_EMPRESA, frozenset(incluir or ()))
+
+
+# Projeção pedida para obrigações acessórias; None quando o cliente quer a resposta completa
+def projetar_obrigacao(fields: Optional[str], include: Optional[str]) -> Optional[Projecao]:
+    campos = _ler_lista(fields, CAMPOS_OBRIGACAO, "fields")
+    incluir = _ler_lista(include, INCLUSOES_OBRIGACAO, "include")
+    if campos is None and incluir is None:
+        return None
+    return _projecao_obrigacao(campos or CAMPOS_OBRIGACAO, frozenset(incluir or ()))
@@ -0,0 +1,18 @@
+"""Recalcula a tabela resumo_obrigacoes do zero, com um único GROUP BY sobre as obrigações.
+
+Necessário só quando as obrigações foram alteradas fora da API (SQL direto, restauração de backup).
+
+Uso: python reconstruir_resumo.py
+"""
+from crud import reconstruir_resumo_obrigacoes
+from database import SessionLocal
+
+
+def main():
+    with SessionLocal() as db:
+        linhas = reconstruir_resumo_obrigacoes(db)
+    print(f"✅ resumo_obrigacoes reconstruído: {linhas} linhas (empresa, periodicidade)")
+
+
+if __name__ == "__main__":
+    main()
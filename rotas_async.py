@@ -0,0 +1,135 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import crud_async
+from crud import filtros_empresas, filtros_obrigacoes
+from database import get_async_db
+from metricas import classe_rota
+from etag import cliente_atualizado, etag_empresa, etag_pagina, nao_modificado
+from paginacao import definir_proximo_cursor
+from projecao import projetar_empresa, projetar_obrigacao
+from schemas import (
+    Empresa,
+    EmpresaCreate,
+    EmpresaUpdate,
+    ObrigacaoAcessoriaCreate,
+    ObrigacaoAcessoriaResponse,
+    ObrigacaoAcessoriaUpdate,
+    PeriodicidadeEnum,
+)
+
+# Versões assíncronas das rotas principais de main.py, ativadas com DB_ASYNC=true.
+# Mesmos caminhos, parâmetros e respostas: o main.py inclui este router antes das rotas
+# síncronas, que deixam de ser alcançadas. Fora do schema para não duplicar o OpenAPI.
+router = APIRouter(include_in_schema=False, route_class=classe_rota)
+
+# ============================
+# Rotas para Empresas
+# ============================
+
+@router.post("/empresas/", response_model=Empresa)
+async def criar_empresa(empresa: EmpresaCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.criar_empresa(db, empresa)
+
+@router.get("/empresas/", response_model=List[Empresa])
+async def listar_empresas(
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    cnpj: Optional[str] = None,
+    nome: Optional[str] = None,
+    email: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    filtros = filtros_empresas(cnpj=cnpj, nome=nome, email=email)
+    projecao = projetar_empresa(fields, include)
+    if projecao is None:
+        if request.headers.get("if-none-match"):
+            etag = etag_pagina(request, await crud_async.versoes_empresas(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros))
+            if cliente_atualizado(request, etag):
+                return nao_modificado(etag)
+        linhas, empresas = await crud_async.get_empresas_resposta(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros)
+        resposta = ORJSONResponse(empresas, headers={"ETag": etag_pagina(request, [(e.id, e.versao) for e in linhas])})
+        definir_proximo_cursor(resposta, linhas, limit)
+        return resposta
+
+    empresas = await crud_async.get_empresas(db, skip=skip, limit=limit, cursor=cursor, opcoes=projecao.opcoes, filtros=filtros)
+    resposta = projecao.responder(empresas)
+    definir_proximo_cursor(resposta, empresas, limit)
+    return resposta
+
+@router.get("/empresas/{empresa_id}/", response_model=Empresa)
+async def obter_detalhes_empresa(
+    empresa_id: int,
+    request: Request,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    projecao = projetar_empresa(fields, include)
+    if projecao is None:
+        versao, detalhe = await crud_async.get_empresa_detalhada(db, empresa_id)
+        etag = etag_empresa(empresa_id, versao)
+        if cliente_atualizado(request, etag):
+            return nao_modificado(etag)
+        return ORJSONResponse(detalhe, headers={"ETag": etag})
+    return projecao.responder(await crud_async.get_empresa_by_id(db, empresa_id, opcoes=projecao.opcoes))
+
+@router.put("/empresas/{empresa_id}/", response_model=Empresa)
+async def atualizar_empresa(empresa_id: int, empresa: EmpresaUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.update_empresa(db, empresa_id, empresa)
+
+@router.delete("/empresas/{empresa_id}/", response_model=Empresa)
+async def excluir_empresa(empresa_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.delete_empresa(db, empresa_id)
+
+# ============================
+# Rotas para Obrigações Acessórias
+# ============================
+
+@router.get("/obrigacoes_acessorias/", response_model=List[ObrigacaoAcessoriaResponse])
+async def listar_obrigacoes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    empresa_id: Optional[int] = None,
+    periodicidade: Optional[PeriodicidadeEnum] = None,
+    nome: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    filtros = filtros_obrigacoes(empresa_id=empresa_id, periodicidade=periodicidade, nome=nome)
+    projecao = projetar_obrigacao(fields, include)
+    if projecao is None:
+        if request.headers.get("if-none-match"):
+            etag = etag_pagina(request, await crud_async.versoes_obrigacoes(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros))
+            if cliente_atualizado(request, etag):
+                return nao_modificado(etag)
+        linhas, obrigacoes = await crud_async.get_obrigacoes_resposta(db, skip=skip, limit=limit, cursor=cursor, filtros=filtros)
+        etag = etag_pagina(request, [(o.id, o.versao, o.empresa_versao) for o in linhas])
+        resposta = ORJSONResponse(obrigacoes, headers={"ETag": etag})
+        definir_proximo_cursor(resposta, linhas, limit)
+        return resposta
+
+    obrigacoes = await crud_async.get_obrigacoes(db, skip=skip, limit=limit, cursor=cursor, opcoes=projecao.opcoes, filtros=filtros)
+    resposta = projecao.responder(obrigacoes)
+    definir_proximo_cursor(resposta, obrigacoes, limit)
+    return resposta
+
+@router.post("/obrigacoes_acessorias/", response_model=ObrigacaoAcessoriaResponse)
+async def criar_nova_obrigacao(obrigacao: ObrigacaoAcessoriaCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.criar_obrigacao(db, obrigacao)
+
+@router.put("/obrigacoes_acessorias/{obrigacao_id}/", response_model=ObrigacaoAcessoriaResponse)
+async def atualizar_obrigacao(obrigacao_id: int, obrigacao: ObrigacaoAcessoriaUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.update_obrigacao(db, obrigacao_id, obrigacao)
+
+@router.delete("/obrigacoes_acessorias/{obrigacao_id}/", response_model=ObrigacaoAcessoriaResponse)
+async def excluir_obrigacao(obrigacao_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.delete_obrigacao(db, obrigacao_id)
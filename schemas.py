@@ -1,7 +1,11 @@
 from typing import List, Optional, ForwardRef
-from pydantic import BaseModel, field_validator, EmailStr, ConfigDict, model_validator
+from pydantic import BaseModel, field_validator, EmailStr, ConfigDict, model_validator, ValidationInfo
 from enum import Enum
-import re
+from validacao import normalizar_telefone, validar_cnpj
+
+# Chaves do contexto de validação: o valor já foi validado e normalizado em lote (validacao.py)
+CNPJ_VALIDADO = "cnpj_validado"
+TELEFONE_VALIDADO = "telefone_validado"
 
 # Enums
 class PeriodicidadeEnum(str, Enum):
@@ -9,7 +13,8 @@ class PeriodicidadeEnum(str, Enum):
     TRIMESTRAL = "TRIMESTRAL"
     ANUAL = "ANUAL"
 
-# BaseModel para a empresa
+# BaseModel para a empresa. Sem validadores: é a base das respostas, e linhas gravadas antes da
+# validação dos dígitos verificadores precisam continuar sendo serializadas
 class EmpresaBase(BaseModel):
     nome: str
     cnpj: str
@@ -17,22 +22,19 @@ class EmpresaBase(BaseModel):
     email: EmailStr
     telefone: str
 
+# 🔹 CNPJ (com dígitos verificadores) e telefone validados só na entrada
+class EmpresaCreate(EmpresaBase):
     @field_validator('cnpj')
-    def validar_cnpj(cls, v):
-        cnpj_numerico = ''.join(filter(str.isdigit, v))
-        if len(cnpj_numerico) != 14:
-            raise ValueError('CNPJ deve ter exatamente 14 dígitos numéricos')
-        return cnpj_numerico
+    def validar_cnpj(cls, v, info: ValidationInfo):
+        if info.context and info.context.get(CNPJ_VALIDADO):
+            return v
+        return validar_cnpj(v)
 
     @field_validator('telefone')
-    def validar_telefone(cls, v):
-        numeros = re.sub(r'[^0-9]', '', v)
-        if len(numeros) != 11:
-            raise ValueError('Telefone deve ter exatamente 11 dígitos numéricos')
-        return v
-
-class EmpresaCreate(EmpresaBase):
-    pass
+    def validar_telefone(cls, v, info: ValidationInfo):
+        if info.context and info.context.get(TELEFONE_VALIDADO):
+            return v
+        return normalizar_telefone(v)
 
 class EmpresaUpdate(BaseModel):
     nome: Optional[str] = None
@@ -41,6 +43,37 @@ class EmpresaUpdate(BaseModel):
     email: Optional[EmailStr] = None
     telefone: Optional[str] = None
 
+    # 🔹 Mesmas regras da criação, só para os campos enviados
+    @field_validator('cnpj')
+    def validar_cnpj(cls, v):
+        return v if v is None else validar_cnpj(v)
+
+    @field_validator('telefone')
+    def validar_telefone(cls, v):
+        return v if v is None else normalizar_telefone(v)
+
+# Resultado de cada linha na criação de empresas em lote
+class EmpresaLoteResultado(BaseModel):
+    indice: int
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
+class EmpresaLoteResposta(BaseModel):
+    criadas: int
+    erros: int
+    resultados: List[EmpresaLoteResultado]
+
+# Total de linhas de uma listagem (exata=False: estimativa das estatísticas do banco)
+class Contagem(BaseModel):
+    total: int
+    exata: bool
+
+# Resultado da busca (autocomplete) de empresas
+class EmpresaBusca(BaseModel):
+    id: int
+    nome: str
+    cnpj: str
+
 # ForwardRef para evitar importação circular
 ObrigacaoAcessoriaResponseRef = ForwardRef('ObrigacaoAcessoriaResponse')
 
@@ -75,6 +108,24 @@ class ObrigacaoAcessoriaUpdate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Resultado da importação de obrigações acessórias por arquivo
+class ObrigacaoImportacaoErro(BaseModel):
+    linha: int
+    erro: str
+
+class ObrigacaoImportacaoResposta(BaseModel):
+    importadas: int
+    erros: int
+    detalhes_erros: List[ObrigacaoImportacaoErro]
+
+# Quantidade de obrigações de uma empresa por periodicidade
+class ResumoObrigacoesEmpresa(BaseModel):
+    empresa_id: int
+    mensal: int
+    trimestral: int
+    anual: int
+    total: int
+
 # Atualiza os modelos
 Empresa.model_rebuild()
 ObrigacaoAcessoriaResponse.model_rebuild()
@@ -0,0 +1,116 @@
+"""Sobe a API em produção: N workers do uvicorn com uvloop e httptools.
+
+Divide o orçamento de conexões do PostgreSQL entre os workers: cada worker tem o próprio pool
+(dois com DB_ASYNC=true), e a soma de pool_size + max_overflow de todos fica abaixo de
+max_connections. O orçamento é DB_CONEXOES_MAXIMAS ou, se não definido, o max_connections do
+servidor menos as conexões reservadas ao superusuário e DB_CONEXOES_RESERVADAS (psql, migrações,
+outros serviços). Os pools só diminuem: DB_POOL_SIZE e DB_MAX_OVERFLOW continuam sendo o teto.
+
+Com --workers > 1, cada worker é um processo com o próprio estado: GET /metrics, GET /pool/ e
+GET /cache/ mostram só o worker que atendeu a requisição (não somam os outros), e o cache em
+memória (CACHE_BACKEND=memoria) de um worker não é invalidado pelas escritas dos outros.
+
+Uso: python servidor.py [--workers N] [--porta 8000]
+"""
+import argparse
+import logging
+import os
+from typing import Optional
+import uvicorn
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool
+from cache import CACHE_BACKEND
+from database import DATABASE_URL, DB_ASYNC, DB_MAX_OVERFLOW, DB_POOL_SIZE, configurar_pool
+
+# Configuração do servidor (via .env); os argumentos da linha de comando têm precedência
+SERVIDOR_HOST = os.getenv("SERVIDOR_HOST", "0.0.0.0")
+SERVIDOR_PORTA = int(os.getenv("SERVIDOR_PORTA", "8000"))
+SERVIDOR_WORKERS = int(os.getenv("SERVIDOR_WORKERS", str(os.cpu_count() or 1)))
+# Segundos que uma conexão HTTP ociosa fica aberta; acima do idle timeout do balanceador à frente
+# (60 s no nginx e no ALB), senão ele reaproveita uma conexão que o uvicorn acabou de fechar (502)
+SERVIDOR_KEEP_ALIVE = int(os.getenv("SERVIDOR_KEEP_ALIVE", "75"))
+# Fila de conexões TCP ainda não aceitas (limitada pelo net.core.somaxconn do kernel)
+SERVIDOR_BACKLOG = int(os.getenv("SERVIDOR_BACKLOG", "2048"))
+# Requisições simultâneas por worker; acima disso, 503 imediato em vez de fila esperando o pool
+SERVIDOR_LIMITE_CONCORRENCIA = int(os.getenv("SERVIDOR_LIMITE_CONCORRENCIA", "512"))
+SERVIDOR_LOG_NIVEL = os.getenv("SERVIDOR_LOG_NIVEL", "info")
+SERVIDOR_LOG_ACESSO = os.getenv("SERVIDOR_LOG_ACESSO", "false").lower() in ("1", "true", "sim")
+
+DB_CONEXOES_MAXIMAS = os.getenv("DB_CONEXOES_MAXIMAS")
+DB_CONEXOES_RESERVADAS = int(os.getenv("DB_CONEXOES_RESERVADAS", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+# Conexões que o PostgreSQL aceita de usuários comuns; None se o banco não responder
+def conexoes_do_servidor() -> Optional[int]:
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as conexao:
+            maximo = int(conexao.exec_driver_sql("SHOW max_connections").scalar())
+            reservadas = int(conexao.exec_driver_sql("SHOW superuser_reserved_connections").scalar())
+        return maximo - reservadas
+    except exc.SQLAlchemyError:
+        return None
+    finally:
+        engine.dispose()
+
+
+# (pool_size, max_overflow) de cada pool para que workers * pools_por_worker pools caibam no orçamento
+def dividir_pool(orcamento: int, workers: int, pools_por_worker: int = 1,
+                 pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW) -> tuple:
+    por_pool = orcamento // (workers * pools_por_worker)
+    if por_pool < 1:
+        raise ValueError(
+            f"Orçamento de {orcamento} conexões não comporta {workers} workers com {pools_por_worker} pool(s) cada"
+        )
+    pool_size = min(pool_size, por_pool)
+    return pool_size, min(max_overflow, por_pool - pool_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=SERVIDOR_HOST)
+    parser.add_argument("--porta", type=int, default=SERVIDOR_PORTA)
+    parser.add_argument("--workers", type=int, default=SERVIDOR_WORKERS, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--log-level", default=SERVIDOR_LOG_NIVEL, choices=["critical", "error", "warning", "info", "debug"])
+    argumentos = parser.parse_args()
+    logging.basicConfig(level=argumentos.log_level.upper(), format="%(levelname)s:     %(message)s")
+
+    if DB_CONEXOES_MAXIMAS:
+        orcamento = int(DB_CONEXOES_MAXIMAS)
+    else:
+        disponiveis = conexoes_do_servidor()
+        orcamento = None if disponiveis is None else disponiveis - DB_CONEXOES_RESERVADAS
+    if orcamento is None:
+        # 🔹 A API sobe sem o banco (GET /readyz fica em 503); os pools seguem o .env
+        logger.warning("max_connections indisponível e DB_CONEXOES_MAXIMAS não definido: pools sem divisão")
+    else:
+        pool_size, max_overflow = dividir_pool(orcamento, argumentos.workers, 2 if DB_ASYNC else 1)
+        configurar_pool(pool_size, max_overflow)
+        logger.info("%d workers, pool por worker: %d + %d overflow (orçamento de %d conexões)",
+                    argumentos.workers, pool_size, max_overflow, orcamento)
+    if argumentos.workers > 1:
+        logger.info("/metrics, /pool/ e /cache/ são de cada worker: cada resposta mostra só o worker que a atendeu")
+        if CACHE_BACKEND == "memoria":
+            # 🔹 Cada worker tem o próprio cache: escritas em um worker não invalidam os outros
+            logger.warning("Cache em memória com vários workers: leituras podem ficar até CACHE_TTL segundos desatualizadas")
+
+    uvicorn.run(
+        "main:app",
+        host=argumentos.host,
+        port=argumentos.porta,
+        workers=argumentos.workers,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        timeout_keep_alive=SERVIDOR_KEEP_ALIVE,
+        backlog=SERVIDOR_BACKLOG,
+        limit_concurrency=SERVIDOR_LIMITE_CONCORRENCIA or None,
+        log_level=argumentos.log_level,
+        access_log=SERVIDOR_LOG_ACESSO,
+    )
+
+
+if __name__ == "__main__":
+    main()
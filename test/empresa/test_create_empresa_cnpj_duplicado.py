@@ -29,7 +29,7 @@ def setup_db():
 def test_criar_empresa_cnpj_duplicado(client, setup_db):
     empresa_data_1 = {
         "nome": "Empresa A",
-        "cnpj": "12345678000190",
+        "cnpj": "12345678000276",
         "endereco": "Rua 1, 123",
         "email": "empresa_a@teste.com",
         "telefone": "81423456782"
@@ -40,7 +40,7 @@ def test_criar_empresa_cnpj_duplicado(client, setup_db):
     # Tenta criar uma segunda empresa com o mesmo CNPJ
     empresa_data_2 = {
         "nome": "Empresa B",
-        "cnpj": "12345678000190",  # Mesmo CNPJ
+        "cnpj": "12345678000276",  # Mesmo CNPJ
         "endereco": "Rua 2, 456",
         "email": "empresa_b@teste.com",
         "telefone": "81987654321"
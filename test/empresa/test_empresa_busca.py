@@ -0,0 +1,122 @@
+import time
+import busca
+import database
+from busca import construir_indice_em_segundo_plano, indice_empresas
+from models import Empresa
+
+def popular(db):
+    db.add_all([
+        Empresa(nome="Sport Club do Recife", cnpj="12345678000195", endereco="Rua A, 100",
+                email="teste@sport.com", telefone="81987654321"),
+        Empresa(nome="São Paulo", cnpj="11222333000181", endereco="Rua B, 200",
+                email="contato@saopaulo.com", telefone="11912345678"),
+    ])
+    db.commit()
+
+def nomes(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return [e["nome"] for e in response.json()]
+
+def test_busca_consulta_o_banco_enquanto_indice_nao_esta_pronto(client, db):
+    popular(db)
+    assert not indice_empresas.pronto
+    assert nomes(client, "/empresas/search?q=recife") == ["Sport Club do Recife"]
+    assert nomes(client, "/empresas/search?q=1122") == ["São Paulo"]
+    assert client.get("/empresas/search?q=%20").status_code == 400
+
+def test_busca_usa_indice_e_acompanha_escritas(client, db):
+    popular(db)
+    indice_empresas.construir(db)
+    assert nomes(client, "/empresas/search?q=sao") == ["São Paulo"]
+    assert client.get("/empresas/search?q=sport").json() == [
+        {"id": 1, "nome": "Sport Club do Recife", "cnpj": "12345678000195"}
+    ]
+
+    client.post("/empresas/", json={
+        "nome": "Santa Cruz", "cnpj": "98765432000198", "endereco": "Rua C, 300",
+        "email": "contato@santacruz.com", "telefone": "81912345679",
+    })
+    assert nomes(client, "/empresas/search?q=s&limit=10") == ["Santa Cruz", "São Paulo", "Sport Club do Recife"]
+
+    client.put("/empresas/1/", json={"nome": "Náutico"})
+    assert nomes(client, "/empresas/search?q=sport") == []
+    assert nomes(client, "/empresas/search?q=nautico") == ["Náutico"]
+
+    client.delete("/empresas/2/")
+    assert nomes(client, "/empresas/search?q=sao") == []
+
+def esperar(condicao, segundos=10):
+    limite = time.monotonic() + segundos
+    while not condicao():
+        assert time.monotonic() < limite, "condição não atendida a tempo"
+        time.sleep(0.02)
+
+def test_indice_acompanha_escritas_de_outros_processos(client, db, monkeypatch):
+    monkeypatch.setattr(busca, "BUSCA_INTERVALO_VERIFICACAO", 0.02)
+    construcoes = []
+    construir = indice_empresas.construir
+    monkeypatch.setattr(indice_empresas, "construir", lambda sessao: construcoes.append(1) or construir(sessao))
+    parar = construir_indice_em_segundo_plano()
+    try:
+        esperar(lambda: indice_empresas.pronto)
+        assert nomes(client, "/empresas/search?q=sao") == []
+        escritas, contador = indice_empresas.escritas, busca.contador_empresas(db)
+
+        # 🔹 Escritas deste processo já chegam ao índice pelo crud; obrigações só mudam a versao da empresa
+        empresa_id = client.post("/empresas/", json={
+            "nome": "Santa Cruz", "cnpj": "98765432000198", "endereco": "Rua C, 300",
+            "email": "contato@santacruz.com", "telefone": "81912345679",
+        }).json()["id"]
+        client.put(f"/empresas/{empresa_id}/", json={"nome": "Santa Cruz FC"})
+        client.put(f"/empresas/{empresa_id}/", json={"email": "fc@santacruz.com"})
+        client.put(f"/empresas/{empresa_id}/", json={"cnpj": "12345678000195"})
+        client.post("/empresas/", json={
+            "nome": "Outra", "cnpj": "12345678000195", "endereco": "Rua D, 400",
+            "email": "outra@teste.com", "telefone": "81912345670",
+        })  # CNPJ duplicado: 400, nada inserido
+        obrigacao = client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_id})
+        client.delete(f"/obrigacoes_acessorias/{obrigacao.json()['id']}/")
+        client.delete(f"/empresas/{empresa_id}/")
+        time.sleep(0.2)
+        assert construcoes == [1]
+        # Inserção, nome, CNPJ e exclusão: 4 alterações, todas deste processo
+        assert indice_empresas.escritas - escritas == busca.contador_empresas(db) - contador == 4
+
+        # 🔹 Gravadas direto no banco, como por outro worker ou uma carga em SQL: o crud deste processo não vê
+        popular(db)
+        esperar(lambda: indice_empresas.buscar("sao") != [])
+        assert nomes(client, "/empresas/search?q=sao") == ["São Paulo"]
+        assert len(construcoes) == 2
+    finally:
+        parar.set()
+
+def test_escrita_confirmada_depois_da_reconstrucao_e_vista(db, monkeypatch):
+    monkeypatch.setattr(busca, "BUSCA_INTERVALO_VERIFICACAO", 0.02)
+    with database.SessionLocal() as outro:
+        # 🔹 Outro processo grava durante a reconstrução e só confirma depois dela
+        outro.add(Empresa(nome="São Paulo", cnpj="11222333000181", endereco="Rua B, 200",
+                          email="contato@saopaulo.com", telefone="11912345678"))
+        outro.flush()
+        parar = construir_indice_em_segundo_plano()
+        try:
+            esperar(lambda: indice_empresas.pronto)
+            time.sleep(0.1)
+            assert indice_empresas.buscar("sao") == []
+            outro.commit()
+            esperar(lambda: indice_empresas.buscar("sao") != [])
+        finally:
+            parar.set()
+
+def test_banco_e_indice_devolvem_o_mesmo_resultado(client, db):
+    popular(db)
+    db.add(Empresa(nome="Padaria  São JOÃO", cnpj="98765432000198", endereco="Rua C, 300",
+                   email="padaria@teste.com", telefone="81912345679"))
+    db.commit()
+    termos = ["sao", "SÃO", "sao jo", "joao", "club do", "recife", "ecife", "paulo", "1122", "98765", "%", "_"]
+    pelo_banco = {termo: sorted(nomes(client, f"/empresas/search?q={termo}&limit=50")) for termo in termos}
+    indice_empresas.construir(db)
+    pelo_indice = {termo: sorted(nomes(client, f"/empresas/search?q={termo}&limit=50")) for termo in termos}
+    assert pelo_banco == pelo_indice
+    assert pelo_banco["sao"] == ["Padaria  São JOÃO", "São Paulo"]
+    assert pelo_banco["ecife"] == []  # 🔹 Prefixo de palavra, não qualquer trecho
@@ -0,0 +1,38 @@
+from cache import cache_empresas
+
+def test_detalhe_empresa_lido_do_cache(client, empresa_existente):
+    acertos = cache_empresas.acertos
+    primeira = client.get(f"/empresas/{empresa_existente.id}/")
+    segunda = client.get(f"/empresas/{empresa_existente.id}/")
+    assert primeira.status_code == segunda.status_code == 200
+    assert primeira.json() == segunda.json()
+    assert cache_empresas.acertos == acertos + 1
+
+    response = client.get("/cache/")
+    assert response.status_code == 200
+    assert response.json()["empresas"]["acertos"] == cache_empresas.acertos
+
+def test_atualizar_empresa_invalida_cache(client, empresa_existente):
+    client.get(f"/empresas/{empresa_existente.id}/")
+    client.put(f"/empresas/{empresa_existente.id}/", json={"nome": "Náutico"})
+    assert client.get(f"/empresas/{empresa_existente.id}/").json()["nome"] == "Náutico"
+
+def test_escritas_de_obrigacao_invalidam_cache(client, empresa_existente):
+    url = f"/empresas/{empresa_existente.id}/"
+    assert client.get(url).json()["obrigacoes_acessorias"] == []
+
+    obrigacao = client.post("/obrigacoes_acessorias/", json={
+        "nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_existente.id,
+    }).json()
+    assert [o["nome"] for o in client.get(url).json()["obrigacoes_acessorias"]] == ["DCTF"]
+
+    client.put(f"/obrigacoes_acessorias/{obrigacao['id']}/", json={"periodicidade": "ANUAL"})
+    assert client.get(url).json()["obrigacoes_acessorias"][0]["periodicidade"] == "ANUAL"
+
+    client.delete(f"/obrigacoes_acessorias/{obrigacao['id']}/")
+    assert client.get(url).json()["obrigacoes_acessorias"] == []
+
+def test_excluir_empresa_invalida_cache(client, empresa_existente):
+    client.get(f"/empresas/{empresa_existente.id}/")
+    client.delete(f"/empresas/{empresa_existente.id}/")
+    assert client.get(f"/empresas/{empresa_existente.id}/").status_code == 404
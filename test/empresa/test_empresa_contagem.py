@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+def test_contar_empresas_com_e_sem_filtros(client, empresa_existente, db):
+    response = client.get("/empresas/count?cnpj=12.345.678/0001-95")
+    assert response.json() == {"total": 1, "exata": True}
+    assert response.headers["X-Total-Count"] == "1"
+    assert client.get("/empresas/count?nome=Nada").json() == {"total": 0, "exata": True}
+
+    db.execute(text("ANALYZE empresas"))
+    db.commit()
+    assert client.get("/empresas/count").json() == {"total": 1, "exata": False}
+
+    client.post("/empresas/", json={
+        "nome": "Santa Cruz", "cnpj": "11222333000181", "endereco": "Rua B, 200",
+        "email": "contato@santacruz.com", "telefone": "81912345678",
+    })
+    assert client.get("/empresas/count?nome=Santa").json() == {"total": 1, "exata": True}
+    assert client.get("/empresas/count?exata=true").json() == {"total": 2, "exata": True}
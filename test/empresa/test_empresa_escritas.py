@@ -0,0 +1,82 @@
+from database import registrar_consultas
+
+EMPRESA = {
+    "nome": "Stark Industries",
+    "cnpj": "11222333000181",
+    "endereco": "Av. Tony Stark",
+    "email": "contato@starkindustries.com",
+    "telefone": "81997776655"
+}
+
+def contar_comandos(client, metodo, url, **kwargs):
+    with registrar_consultas() as comandos:
+        response = getattr(client, metodo)(url, **kwargs)
+    return response, comandos
+
+def test_criar_empresa_em_um_comando(client):
+    response, comandos = contar_comandos(client, "post", "/empresas/", json=EMPRESA)
+    assert response.status_code == 200
+    assert response.json()["cnpj"] == EMPRESA["cnpj"]
+    assert response.json()["obrigacoes_acessorias"] == []
+    assert comandos.quantidade == 1
+    assert "ON CONFLICT DO NOTHING RETURNING" in next(iter(comandos.formatos))
+
+def test_criar_empresa_email_duplicado(client, empresa_existente):
+    response = client.post("/empresas/", json={**EMPRESA, "email": "teste@sport.com"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "E-mail já cadastrado"
+
+    response = client.post("/empresas/", json={**EMPRESA, "cnpj": "12345678000195"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CNPJ já cadastrado"
+
+def test_criar_obrigacao_em_um_comando(client, empresa_existente):
+    obrigacao = {"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_existente.id}
+    response, comandos = contar_comandos(client, "post", "/obrigacoes_acessorias/", json=obrigacao)
+    assert response.status_code == 200
+    assert response.json()["empresa"]["cnpj"] == "12345678000195"
+    assert comandos.quantidade == 1
+
+    response = client.post("/obrigacoes_acessorias/", json=obrigacao)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Essa obrigação acessória já existe para essa empresa."
+
+    response = client.post("/obrigacoes_acessorias/", json={**obrigacao, "empresa_id": 999})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Empresa associada não encontrada"
+
+def test_atualizar_empresa_em_um_comando(client, obrigacao_existente):
+    response, comandos = contar_comandos(client, "put", "/empresas/1/", json={"nome": "Náutico"})
+    assert response.status_code == 200
+    assert response.json()["nome"] == "Náutico"
+    assert response.json()["obrigacoes_acessorias"][0]["nome"] == "DCTF"
+    assert response.json()["obrigacoes_acessorias"][0]["empresa"]["nome"] == "Náutico"
+    assert comandos.quantidade == 1
+
+def test_atualizar_empresa_email_duplicado(client):
+    client.post("/empresas/", json=EMPRESA)
+    outra = client.post("/empresas/", json={**EMPRESA, "cnpj": "12345678000195", "email": "outra@sport.com"}).json()
+    response = client.put(f"/empresas/{outra['id']}/", json={"email": EMPRESA["email"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "E-mail já cadastrado"
+
+    response = client.put(f"/empresas/{outra['id']}/", json={"cnpj": EMPRESA["cnpj"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CNPJ já cadastrado"
+
+def test_excluir_em_um_comando(client, obrigacao_existente):
+    response, comandos = contar_comandos(client, "delete", "/obrigacoes_acessorias/1/")
+    assert response.status_code == 200
+    assert response.json()["empresa"]["cnpj"] == "12345678000195"
+    assert comandos.quantidade == 1
+
+    response, comandos = contar_comandos(client, "delete", "/empresas/1/")
+    assert response.status_code == 200
+    assert comandos.quantidade == 1
+    assert client.delete("/empresas/1/").status_code == 404
+
+def test_renomear_obrigacao_para_nome_existente(client, obrigacao_existente):
+    client.post("/obrigacoes_acessorias/", json={"nome": "ECF", "periodicidade": "ANUAL", "empresa_id": 1})
+    response = client.put("/obrigacoes_acessorias/1/", json={"nome": "ECF"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Essa obrigação acessória já existe para essa empresa."
@@ -0,0 +1,37 @@
+from models import Empresa
+
+def test_detalhe_empresa_304_com_if_none_match(client, empresa_existente):
+    url = f"/empresas/{empresa_existente.id}/"
+    response = client.get(url)
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # Alterar a empresa ou suas obrigações gera uma nova versão
+    client.put(url, json={"nome": "Náutico"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["nome"] == "Náutico"
+
+    etag = response.headers["ETag"]
+    client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_existente.id})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["obrigacoes_acessorias"]) == 1
+
+def test_listar_empresas_304_com_if_none_match(client, db, empresa_existente):
+    response = client.get("/empresas/")
+    etag = response.headers["ETag"]
+    assert client.get("/empresas/", headers={"If-None-Match": f'W/{etag}'}).status_code == 304
+
+    # Outra página, ou uma nova empresa na mesma página, não casa com o ETag anterior
+    assert client.get("/empresas/?limit=5", headers={"If-None-Match": etag}).status_code == 200
+    db.add(Empresa(nome="Náutico", cnpj="11222333000181", endereco="Rua B, 200",
+                   email="contato@nautico.com", telefone="81912345678"))
+    db.commit()
+    response = client.get("/empresas/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
@@ -0,0 +1,21 @@
+from metricas import metricas
+
+def test_server_timing_com_fases(client, empresa_existente):
+    response = client.get("/empresas/")
+    assert response.status_code == 200
+    fases = dict(item.split(";dur=") for item in response.headers["Server-Timing"].split(", "))
+    assert list(fases) == ["total", "banco", "validacao", "serializacao"]
+    assert float(fases["banco"]) > 0
+    assert float(fases["total"]) >= float(fases["banco"])
+
+def test_metrics_por_rota(client, empresa_existente):
+    metricas.limpar()
+    client.get(f"/empresas/{empresa_existente.id}/")
+    client.get("/empresas/999999/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    # 🔹 A rota aparece pelo template, não pelo id
+    assert 'api_requisicoes_total{metodo="GET",rota="/empresas/{empresa_id}/",status="200"} 1' in response.text
+    assert 'api_requisicoes_total{metodo="GET",rota="/empresas/{empresa_id}/",status="404"} 1' in response.text
+    assert "api_requisicoes_em_andamento 1" in response.text  # A própria requisição de /metrics
@@ -65,7 +65,7 @@ def setup_db(db: Session):
 def test_criar_empresa(client: TestClient, setup_db: None):
     empresa_data = {
         "nome": "Stark Industries",
-        "cnpj": "11222333000144",
+        "cnpj": "11222333000181",
         "endereco": "Av. Tony Stark",
         "email": "contato@starkindustries.com",
         "telefone": "81997776655"
@@ -80,7 +80,7 @@ def test_criar_empresa(client: TestClient, setup_db: None):
 def test_listar_empresas(client: TestClient, setup_db: None):
     empresa_data = {
         "nome": "Wayne Enterprises",
-        "cnpj": "22334455000166",
+        "cnpj": "22334455000186",
         "endereco": "Gotham City",
         "email": "contato@wayne.com",
         "telefone": "81998887766"
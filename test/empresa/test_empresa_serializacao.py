@@ -0,0 +1,31 @@
+from typing import List
+from pydantic import TypeAdapter
+from crud import get_empresas
+from models import ObrigacaoAcessoria
+from schemas import Empresa
+
+def serializar_pelo_schema(db, **kwargs) -> bytes:
+    """Caminho anterior: entidades do ORM validadas por schemas.Empresa e serializadas em JSON."""
+    db.expunge_all()
+    adaptador = TypeAdapter(List[Empresa])
+    return adaptador.dump_json(adaptador.validate_python(get_empresas(db, **kwargs), from_attributes=True))
+
+def test_listagem_igual_a_do_response_model(client, db, empresa_existente):
+    empresa_id = empresa_existente.id
+    db.add_all([
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=empresa_id),
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=empresa_id),
+    ])
+    db.commit()
+    client.post("/empresas/", json={
+        "nome": "Santa Cruz", "cnpj": "11222333000181", "endereco": "Rua B, 200",
+        "email": "contato@santacruz.com", "telefone": "81912345678",
+    })
+
+    response = client.get("/empresas/")
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == serializar_pelo_schema(db)
+    assert client.get(f"/empresas/{empresa_id}/").content == serializar_pelo_schema(db, limit=1)[1:-1]
+
+def test_detalhe_inexistente(client, db):
+    assert client.get("/empresas/999/").status_code == 404
@@ -0,0 +1,51 @@
+from models import Empresa
+
+EMPRESA = {
+    "nome": "Santa Cruz", "cnpj": "11.222.333/0001-81", "endereco": "Rua B, 200",
+    "email": "contato@santacruz.com", "telefone": "(81) 91234-5678",
+}
+
+def test_criar_empresa_normaliza_cnpj_e_telefone(client, db):
+    response = client.post("/empresas/", json=EMPRESA)
+    assert response.status_code == 200
+    assert (response.json()["cnpj"], response.json()["telefone"]) == ("11222333000181", "81912345678")
+
+def test_digitos_verificadores_invalidos(client, empresa_existente):
+    response = client.post("/empresas/", json={**EMPRESA, "cnpj": "11222333000144"})
+    assert response.status_code == 422
+    assert "dígitos verificadores" in response.text
+
+    response = client.put(f"/empresas/{empresa_existente.id}/", json={"cnpj": "12345678000190"})
+    assert response.status_code == 422
+    response = client.put(f"/empresas/{empresa_existente.id}/", json={"telefone": "+55 (81) 3333-44444"})
+    assert response.json()["telefone"] == "81333344444"
+
+def test_lote_com_digitos_invalidos(client, db):
+    lote = [EMPRESA, {**EMPRESA, "cnpj": "98765432000199", "email": "b@teste.com"}]
+    resultados = client.post("/empresas/bulk", json=lote).json()["resultados"]
+    assert resultados[0]["id"] is not None
+    assert resultados[1]["erro"] == "cnpj: Value error, CNPJ inválido: dígitos verificadores não conferem"
+    assert client.get(f"/empresas/{resultados[0]['id']}/").json()["telefone"] == "81912345678"
+
+def test_empresa_legada_com_digitos_invalidos_continua_sendo_servida(client, db):
+    # 🔹 Linha gravada antes da validação dos dígitos verificadores (direto no banco)
+    legada = Empresa(nome="Legada", cnpj="11222333000144", endereco="Rua C, 300",
+                     email="legada@teste.com", telefone="81900000000")
+    db.add(legada)
+    db.commit()
+    empresa_id = legada.id
+
+    response = client.put(f"/empresas/{empresa_id}/", json={"endereco": "Rua D, 400"})
+    assert response.status_code == 200
+    assert response.json()["cnpj"] == "11222333000144"
+
+    response = client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_id})
+    assert response.status_code == 200
+    obrigacao_id = response.json()["id"]
+    assert client.put(f"/obrigacoes_acessorias/{obrigacao_id}/", json={"periodicidade": "ANUAL"}).status_code == 200
+    response = client.get(f"/obrigacoes_acessorias/?empresa_id={empresa_id}&include=empresa")
+    assert response.status_code == 200
+    assert response.json()[0]["empresa"]["cnpj"] == "11222333000144"
+    assert client.get(f"/empresas/{empresa_id}/").status_code == 200
+    assert client.delete(f"/obrigacoes_acessorias/{obrigacao_id}/").status_code == 200
+    assert client.delete(f"/empresas/{empresa_id}/").status_code == 200
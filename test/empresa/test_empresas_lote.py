@@ -0,0 +1,29 @@
+def empresa(cnpj, email):
+    return {"nome": "Empresa", "cnpj": cnpj, "endereco": "Rua A, 100", "email": email, "telefone": "81987654321"}
+
+def test_criar_empresas_em_lote(client, empresa_existente):
+    lote = [
+        empresa("11222333000181", "a@teste.com"),
+        empresa("123", "b@teste.com"),                   # CNPJ inválido
+        empresa("12345678000195", "c@teste.com"),        # CNPJ já cadastrado
+        empresa("22334455000186", "a@teste.com"),        # E-mail repetido no próprio lote
+        empresa("98.765.432/0001-98", "d@teste.com"),
+    ]
+    response = client.post("/empresas/bulk", json=lote)
+    assert response.status_code == 200
+    corpo = response.json()
+    assert (corpo["criadas"], corpo["erros"]) == (2, 3)
+
+    resultados = corpo["resultados"]
+    assert resultados[0]["id"] is not None
+    assert "cnpj" in resultados[1]["erro"]
+    assert resultados[2]["erro"] == "CNPJ já cadastrado"
+    assert resultados[3]["erro"] == "E-mail já cadastrado"
+    assert resultados[4]["id"] is not None
+
+    detalhe = client.get(f"/empresas/{resultados[4]['id']}/")
+    assert detalhe.json()["cnpj"] == "98765432000198"
+
+def test_criar_empresas_em_lote_vazio(client):
+    response = client.post("/empresas/bulk", json=[])
+    assert response.status_code == 400
@@ -0,0 +1,51 @@
+import json
+import os
+import resource
+from sqlalchemy import text
+from exportacao import COLUNAS_EMPRESA, gerar_exportacao
+
+# Quantidade de linhas e orçamento de memória do teste de exportação completa
+LINHAS_EXPORTACAO = int(os.getenv("EXPORTACAO_LINHAS_TESTE", "1000000"))
+ORCAMENTO_RSS_MB = 64
+
+def rss_atual_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+
+def test_exportar_empresas_ndjson(client, empresa_existente):
+    response = client.get("/empresas/exportar")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert linhas == [{
+        "id": empresa_existente.id, "nome": "Sport Club do Recife", "cnpj": "12345678000195",
+        "endereco": "Rua A, 100", "email": "teste@sport.com", "telefone": "81987654321",
+    }]
+
+def test_exportar_obrigacoes_csv(client, obrigacao_existente):
+    response = client.get("/obrigacoes_acessorias/exportar?formato=csv")
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "id,nome,periodicidade,empresa_id",
+        f"{obrigacao_existente.id},DCTF,MENSAL,{obrigacao_existente.empresa_id}",
+    ]
+
+def test_exportar_formato_invalido(client):
+    assert client.get("/empresas/exportar?formato=xml").status_code == 400
+
+def test_exportar_tabela_inteira_com_memoria_limitada(db):
+    db.execute(text("""
+        INSERT INTO empresas (nome, cnpj, endereco, email, telefone)
+        SELECT 'Empresa ' || g, lpad(g::text, 14, '0'), 'Rua ' || g, 'empresa' || g || '@teste.com', '81999999999'
+        FROM generate_series(1, :linhas) AS g
+    """), {"linhas": LINHAS_EXPORTACAO})
+    db.commit()
+
+    rss_inicial = pico = rss_atual_mb()
+    linhas = 0
+    for bloco in gerar_exportacao(COLUNAS_EMPRESA, "ndjson"):
+        linhas += bloco.count(b"\n")
+        pico = max(pico, rss_atual_mb())
+
+    assert linhas == LINHAS_EXPORTACAO
+    assert pico - rss_inicial < ORCAMENTO_RSS_MB
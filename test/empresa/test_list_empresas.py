@@ -29,7 +29,7 @@ def setup_db():
 def test_listar_empresas(client, setup_db):
     empresa_data = {
         "nome": "Wayne Enterprises",
-        "cnpj": "22334455000166",
+        "cnpj": "22334455000186",
         "endereco": "Gotham City",
         "email": "contato@wayne.com",
         "telefone": "81998887766"
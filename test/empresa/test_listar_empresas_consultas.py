@@ -0,0 +1,42 @@
+import pytest
+from database import registrar_consultas
+from models import Empresa, ObrigacaoAcessoria
+
+def popular(db, inicio, quantidade):
+    for i in range(inicio, inicio + quantidade):
+        empresa = Empresa(nome=f"Empresa {i}", cnpj=f"{i:014d}", endereco="Rua A, 100",
+                          email=f"empresa{i}@teste.com", telefone="81987654321")
+        empresa.obrigacoes_acessorias = [
+            ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL"),
+            ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL"),
+        ]
+        db.add(empresa)
+    db.commit()
+
+def contar_consultas(client, db, url):
+    """Faz a requisição e devolve (resposta, quantidade de SELECTs executados)."""
+    db.expunge_all()  # Força o carregamento a partir do banco, como em uma requisição real
+    with registrar_consultas() as consultas:
+        response = client.get(url)
+    return response, consultas.quantidade
+
+def test_listar_empresas_consultas_fixas(client, db):
+    popular(db, 1, 2)
+    response, consultas_pagina_pequena = contar_consultas(client, db, "/empresas/?limit=50")
+    assert len(response.json()) == 2
+
+    popular(db, 3, 20)
+    response, consultas_pagina_grande = contar_consultas(client, db, "/empresas/?limit=50")
+    assert len(response.json()) == 22
+    assert all(len(e["obrigacoes_acessorias"]) == 2 for e in response.json())
+    assert response.json()[0]["obrigacoes_acessorias"][0]["empresa"]["cnpj"] == f"{1:014d}"
+
+    # Uma consulta para as empresas e uma para as obrigações, independente do tamanho da página
+    assert consultas_pagina_pequena == consultas_pagina_grande == 2
+
+def test_detalhar_empresa_consultas_fixas(client, db):
+    popular(db, 1, 1)
+    response, consultas = contar_consultas(client, db, "/empresas/1/")
+    assert response.status_code == 200
+    assert len(response.json()["obrigacoes_acessorias"]) == 2
+    assert consultas == 2
@@ -0,0 +1,42 @@
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+import crud
+from models import Empresa
+
+def popular(db):
+    db.add_all([
+        Empresa(nome="Sport Club do Recife", cnpj="12345678000195", endereco="Rua A, 100",
+                email="teste@sport.com", telefone="81987654321"),
+        Empresa(nome="Santa Cruz", cnpj="11222333000181", endereco="Rua B, 200",
+                email="contato@santacruz.com", telefone="81912345678"),
+        Empresa(nome="Santa_Maria", cnpj="98765432000198", endereco="Rua C, 300",
+                email="contato@santamaria.com", telefone="81912345679"),
+    ])
+    db.commit()
+
+def test_listar_empresas_com_filtros(client, db):
+    popular(db)
+
+    def nomes(url):
+        response = client.get(url)
+        assert response.status_code == 200
+        return [e["nome"] for e in response.json()]
+
+    assert nomes("/empresas/?cnpj=11.222.333/0001-81") == ["Santa Cruz"]
+    assert nomes("/empresas/?email=teste@sport.com") == ["Sport Club do Recife"]
+    assert nomes("/empresas/?nome=Santa") == ["Santa Cruz", "Santa_Maria"]
+    assert nomes("/empresas/?nome=Santa_") == ["Santa_Maria"]  # 🔹 _ não é curinga
+    assert nomes("/empresas/?nome=Santa&cnpj=12345678000195") == []
+    # 🔹 Filtros vazios são ignorados; os valores são normalizados como na gravação
+    assert len(nomes("/empresas/?cnpj=&email=&nome=%20")) == 3
+    assert nomes("/empresas/?email=%20teste@SPORT.com") == ["Sport Club do Recife"]
+    assert nomes("/empresas/?nome=Santa&limit=1&skip=1") == ["Santa_Maria"]
+    assert nomes("/empresas/?nome=Santa&fields=nome") == ["Santa Cruz", "Santa_Maria"]
+
+def test_filtro_por_prefixo_do_nome_usa_indice(db):
+    popular(db)
+    consulta = crud.consulta_paginada(Empresa, 0, 10, None, (), filtros=crud.filtros_empresas(nome="Santa"))
+    sql = consulta.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plano = "\n".join(db.execute(text(f"EXPLAIN {sql}")).scalars())
+    assert "ix_empresas_nome_prefixo" in plano
@@ -0,0 +1,33 @@
+import pytest
+from models import Empresa
+
+@pytest.fixture
+def empresas(db):
+    empresas = [
+        Empresa(nome=f"Empresa {i}", cnpj=f"1122233300014{i}", endereco="Rua A, 100",
+                email=f"empresa{i}@teste.com", telefone="81987654321")
+        for i in range(3)
+    ]
+    db.add_all(empresas)
+    db.commit()
+    return empresas
+
+def test_listar_empresas_por_cursor(client, empresas):
+    response = client.get("/empresas/?limit=2")
+    assert response.status_code == 200
+    assert [e["nome"] for e in response.json()] == ["Empresa 0", "Empresa 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/empresas/?limit=2&cursor={cursor}")
+    assert response.status_code == 200
+    assert [e["nome"] for e in response.json()] == ["Empresa 2"]
+    assert "X-Next-Cursor" not in response.headers  # Última página
+
+def test_listar_empresas_cursor_invalido(client):
+    response = client.get("/empresas/?cursor=nao-e-um-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido"
+
+def test_listar_empresas_cursor_com_skip(client):
+    response = client.get("/empresas/?skip=10&cursor=eyJpZCI6MX0")
+    assert response.status_code == 400
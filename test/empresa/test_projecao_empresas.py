@@ -0,0 +1,36 @@
+from database import registrar_consultas
+from models import ObrigacaoAcessoria
+
+def capturar_consultas(client, db, url):
+    db.expunge_all()
+    with registrar_consultas() as consultas:
+        response = client.get(url)
+    return response, consultas
+
+def test_listar_empresas_somente_campos_pedidos(client, db, empresa_existente):
+    response, consultas = capturar_consultas(client, db, "/empresas/?fields=id,cnpj")
+    assert response.status_code == 200
+    assert response.json() == [{"id": empresa_existente.id, "cnpj": "12345678000195"}]
+
+    # Uma única consulta, sem as colunas e relacionamentos não pedidos
+    assert consultas.quantidade == 1
+    comando = next(iter(consultas.formatos))
+    assert "endereco" not in comando
+    assert "obrigacoes_acessorias" not in comando
+
+def test_detalhar_empresa_incluindo_obrigacoes(client, db, empresa_existente):
+    db.add(ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=empresa_existente.id))
+    db.commit()
+
+    response = client.get(f"/empresas/{empresa_existente.id}/?fields=nome&include=obrigacoes")
+    assert response.status_code == 200
+    empresa = response.json()
+    assert empresa["nome"] == "Sport Club do Recife"
+    assert set(empresa) == {"nome", "obrigacoes_acessorias"}
+    assert empresa["obrigacoes_acessorias"][0]["nome"] == "DCTF"
+    assert "empresa" not in empresa["obrigacoes_acessorias"][0]
+
+def test_listar_empresas_campo_invalido(client):
+    response = client.get("/empresas/?fields=id,senha")
+    assert response.status_code == 400
+    assert "senha" in response.json()["detail"]
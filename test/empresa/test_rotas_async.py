@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from database import ASYNC_DATABASE_URL, get_async_db
+from rotas_async import router
+
+@pytest.fixture
+def client_async(db):
+    """App só com as rotas assíncronas; NullPool evita reaproveitar conexões entre event loops."""
+    engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    fabrica = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with fabrica() as sessao:
+            yield sessao
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+def test_fluxo_completo_rotas_async(client_async):
+    empresa = {
+        "nome": "Stark Industries",
+        "cnpj": "11222333000181",
+        "endereco": "Av. Tony Stark",
+        "email": "contato@starkindustries.com",
+        "telefone": "81997776655"
+    }
+    response = client_async.post("/empresas/", json=empresa)
+    assert response.status_code == 200
+    empresa_id = response.json()["id"]
+    assert response.json()["obrigacoes_acessorias"] == []
+    assert client_async.post("/empresas/", json=empresa).status_code == 400
+
+    response = client_async.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_id})
+    assert response.status_code == 200
+    obrigacao_id = response.json()["id"]
+    assert response.json()["empresa"]["cnpj"] == "11222333000181"
+
+    response = client_async.get(f"/empresas/{empresa_id}/")
+    assert response.json()["obrigacoes_acessorias"][0]["empresa"]["nome"] == "Stark Industries"
+    assert client_async.get(f"/empresas/{empresa_id}/", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    etag = client_async.get("/obrigacoes_acessorias/").headers["ETag"]
+    assert client_async.get("/obrigacoes_acessorias/", headers={"If-None-Match": etag}).status_code == 304
+    assert len(client_async.get("/empresas/").json()) == 1
+    assert client_async.get("/obrigacoes_acessorias/?fields=nome").json() == [{"nome": "DCTF"}]
+
+    response = client_async.put(f"/obrigacoes_acessorias/{obrigacao_id}/", json={"periodicidade": "ANUAL"})
+    assert response.json()["periodicidade"] == "ANUAL"
+    assert client_async.delete(f"/empresas/{empresa_id}/").status_code == 400
+
+    assert client_async.delete(f"/obrigacoes_acessorias/{obrigacao_id}/").status_code == 200
+    response = client_async.put(f"/empresas/{empresa_id}/", json={"nome": "Stark"})
+    assert response.json()["nome"] == "Stark"
+    assert client_async.delete(f"/empresas/{empresa_id}/").status_code == 200
+    assert client_async.get(f"/empresas/{empresa_id}/").status_code == 404
+
+def test_atualizar_empresa_duplicada_rotas_async(client_async, empresa_existente):
+    outra = {
+        "nome": "Stark Industries",
+        "cnpj": "11222333000181",
+        "endereco": "Av. Tony Stark",
+        "email": "contato@starkindustries.com",
+        "telefone": "81997776655",
+    }
+    empresa_id = client_async.post("/empresas/", json=outra).json()["id"]
+    response = client_async.put(f"/empresas/{empresa_id}/", json={"email": empresa_existente.email})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "E-mail já cadastrado"
+    response = client_async.put(f"/empresas/{empresa_id}/", json={"cnpj": empresa_existente.cnpj})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CNPJ já cadastrado"
@@ -0,0 +1,57 @@
+import json
+from datetime import date
+from models import Empresa, ObrigacaoAcessoria
+
+def test_vencimentos_no_fim_de_cada_periodo(client, db, empresa_existente):
+    db.add_all([
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=1),
+        ObrigacaoAcessoria(nome="EFD", periodicidade="TRIMESTRAL", empresa_id=1),
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=1),
+    ])
+    db.commit()
+
+    response = client.get("/obrigacoes_acessorias/calendario?inicio=2027-12-15&fim=2028-06-29")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [(l["vencimento"], l["periodicidade"]) for l in linhas] == [
+        ("2027-12-31", "MENSAL"), ("2027-12-31", "TRIMESTRAL"), ("2027-12-31", "ANUAL"),
+        ("2028-01-31", "MENSAL"),
+        ("2028-02-29", "MENSAL"),  # 🔹 Ano bissexto
+        ("2028-03-31", "MENSAL"), ("2028-03-31", "TRIMESTRAL"),
+        ("2028-04-30", "MENSAL"),
+        ("2028-05-31", "MENSAL"),
+    ]
+    assert client.get("/obrigacoes_acessorias/calendario?inicio=2026-01-01&fim=2026-01-30").text == ""
+
+def test_calendario_expande_obrigacoes_em_vencimentos(client, db, empresa_existente):
+    outra = Empresa(nome="Náutico", cnpj="11222333000181", endereco="Rua B, 200",
+                    email="contato@nautico.com", telefone="81912345678")
+    db.add(outra)
+    db.commit()
+    db.add_all([
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=1),
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=1),
+        ObrigacaoAcessoria(nome="EFD", periodicidade="TRIMESTRAL", empresa_id=2),
+    ])
+    db.commit()
+
+    response = client.get("/obrigacoes_acessorias/calendario?inicio=2026-10-01&fim=2026-12-31")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [(l["vencimento"], l["obrigacao_id"]) for l in linhas] == [
+        ("2026-10-31", 1), ("2026-11-30", 1), ("2026-12-31", 1), ("2026-12-31", 3), ("2026-12-31", 2),
+    ]
+    assert linhas[0] == {"vencimento": "2026-10-31", "obrigacao_id": 1, "nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": 1}
+
+    response = client.get("/obrigacoes_acessorias/calendario?inicio=2026-01-01&fim=2026-06-30&empresa_id=2&formato=csv")
+    assert response.text.splitlines() == [
+        "vencimento,obrigacao_id,nome,periodicidade,empresa_id",
+        "2026-03-31,3,EFD,TRIMESTRAL,2",
+        "2026-06-30,3,EFD,TRIMESTRAL,2",
+    ]
+
+def test_calendario_intervalo_invalido(client):
+    assert client.get("/obrigacoes_acessorias/calendario?inicio=2026-12-31&fim=2026-01-01").status_code == 400
+    assert client.get("/obrigacoes_acessorias/calendario?inicio=2020-01-01&fim=2030-01-01").status_code == 400
+    assert client.get("/obrigacoes_acessorias/calendario?inicio=2026-01-01&fim=2026-12-31&formato=xml").status_code == 400
+    assert client.get("/obrigacoes_acessorias/calendario?inicio=ontem&fim=2026-12-31").status_code == 422
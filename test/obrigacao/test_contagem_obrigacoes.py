@@ -0,0 +1,49 @@
+from sqlalchemy import text
+from models import Empresa, ObrigacaoAcessoria
+
+def popular(db, empresa_id):
+    outra = Empresa(nome="Náutico", cnpj="11222333000181", endereco="Rua B, 200",
+                    email="contato@nautico.com", telefone="81912345678")
+    db.add(outra)
+    db.commit()
+    db.add_all([
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=empresa_id),
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=empresa_id),
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=outra.id),
+    ])
+    db.commit()
+
+def contar(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == str(response.json()["total"])
+    return response.json()
+
+def test_contagem_exata_com_filtros(client, db, empresa_existente):
+    popular(db, empresa_existente.id)
+    assert contar(client, "/obrigacoes_acessorias/count?empresa_id=1") == {"total": 2, "exata": True}
+    assert contar(client, "/obrigacoes_acessorias/count?periodicidade=MENSAL") == {"total": 2, "exata": True}
+    assert contar(client, "/obrigacoes_acessorias/count?nome=DCTF&empresa_id=2") == {"total": 1, "exata": True}
+    assert client.get("/obrigacoes_acessorias/count?periodicidade=SEMANAL").status_code == 422
+
+def test_contagem_sem_filtros_usa_estatisticas_do_planner(client, db, empresa_existente):
+    popular(db, empresa_existente.id)
+    # 🔹 Tabela nunca analisada: sem estatísticas, a contagem é exata
+    assert contar(client, "/obrigacoes_acessorias/count") == {"total": 3, "exata": True}
+
+    db.execute(text("ANALYZE obrigacoes_acessorias"))
+    db.commit()
+    client.post("/obrigacoes_acessorias/", json={"nome": "ECD", "periodicidade": "ANUAL", "empresa_id": 2})
+    assert contar(client, "/obrigacoes_acessorias/count") == {"total": 3, "exata": False}  # 🔹 Estatísticas de antes da inserção
+    assert contar(client, "/obrigacoes_acessorias/count?exata=true") == {"total": 4, "exata": True}
+
+def test_contagem_em_cache_ate_a_proxima_escrita(client, db, empresa_existente):
+    popular(db, empresa_existente.id)
+    assert contar(client, "/obrigacoes_acessorias/count?empresa_id=2")["total"] == 1
+
+    db.add(ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=2))  # 🔹 Fora da API: o cache não sabe
+    db.commit()
+    assert contar(client, "/obrigacoes_acessorias/count?empresa_id=2")["total"] == 1
+
+    client.delete("/obrigacoes_acessorias/1/")
+    assert contar(client, "/obrigacoes_acessorias/count?empresa_id=2")["total"] == 2
@@ -6,7 +6,7 @@ def test_criar_obrigacao(client, setup_db):
     # Criar a empresa
     empresa_data = {
         "nome": "Stark Industries",
-        "cnpj": "11222333000144",
+        "cnpj": "11222333000181",
         "endereco": "Av. Tony Stark",
         "email": "contato@starkindustries.com",
         "telefone": "81997776655"
@@ -0,0 +1,14 @@
+def test_listar_obrigacoes_304_com_if_none_match(client, obrigacao_existente):
+    response = client.get("/obrigacoes_acessorias/")
+    etag = response.headers["ETag"]
+    assert client.get("/obrigacoes_acessorias/", headers={"If-None-Match": etag}).status_code == 304
+
+    # A empresa embutida faz parte da resposta: alterá-la muda o ETag da lista
+    client.put(f"/empresas/{obrigacao_existente.empresa_id}/", json={"nome": "Náutico"})
+    response = client.get("/obrigacoes_acessorias/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["empresa"]["nome"] == "Náutico"
+
+    etag = response.headers["ETag"]
+    client.put(f"/obrigacoes_acessorias/{obrigacao_existente.id}/", json={"periodicidade": "ANUAL"})
+    assert client.get("/obrigacoes_acessorias/", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,99 @@
+import crud
+import database
+from models import ObrigacaoAcessoria
+
+def test_importar_obrigacoes_csv(client, db, obrigacao_existente, monkeypatch):
+    monkeypatch.setattr(crud, "TAMANHO_LOTE_IMPORTACAO", 2)  # Força vários lotes
+    empresa_id = obrigacao_existente.empresa_id
+    conteudo = (
+        "nome,periodicidade,empresa_id\n"
+        f"EFD,MENSAL,{empresa_id}\n"
+        f"DCTF,MENSAL,{empresa_id}\n"        # Já cadastrada
+        f"ECF,SEMANAL,{empresa_id}\n"        # Periodicidade inválida
+        "ECD,ANUAL,9999\n"                   # Empresa inexistente
+        f"EFD,TRIMESTRAL,{empresa_id}\n"     # Repetida em outro lote do mesmo arquivo
+        f"DIRF,ANUAL,{empresa_id}\n"
+    )
+    response = client.post(
+        "/obrigacoes_acessorias/importar",
+        files={"arquivo": ("obrigacoes.csv", conteudo.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    corpo = response.json()
+    assert (corpo["importadas"], corpo["erros"]) == (2, 4)
+    assert [erro["linha"] for erro in corpo["detalhes_erros"]] == [3, 4, 5, 6]
+    assert corpo["detalhes_erros"][2]["erro"] == "Empresa associada não encontrada"
+
+    nomes = {o.nome for o in db.query(ObrigacaoAcessoria).filter_by(empresa_id=empresa_id)}
+    assert nomes == {"DCTF", "EFD", "DIRF"}
+
+def test_importar_obrigacoes_em_muitos_lotes_nao_e_n_mais_um(client, db, empresa_existente, monkeypatch):
+    monkeypatch.setattr(crud, "TAMANHO_LOTE_IMPORTACAO", 2)
+    empresa_id = empresa_existente.id
+    # 🔹 Mais lotes que o limite do detector (os testes rodam com DB_N_MAIS_UM=falhar)
+    linhas = 2 * (database.DB_N_MAIS_UM_LIMITE + 2)
+    conteudo = "nome,periodicidade,empresa_id\n" + "".join(
+        f"Obrigação {i},MENSAL,{empresa_id}\n" for i in range(linhas)
+    )
+    response = client.post(
+        "/obrigacoes_acessorias/importar",
+        files={"arquivo": ("obrigacoes.csv", conteudo.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    assert (response.json()["importadas"], response.json()["erros"]) == (linhas, 0)
+    assert db.query(ObrigacaoAcessoria).filter_by(empresa_id=empresa_id).count() == linhas
+
+def test_importar_obrigacoes_ndjson(client, empresa_existente):
+    conteudo = (
+        f'{{"nome": "EFD", "periodicidade": "MENSAL", "empresa_id": {empresa_existente.id}}}\n'
+        "\n"
+        "{nao e json}\n"
+    )
+    response = client.post(
+        "/obrigacoes_acessorias/importar?formato=ndjson",
+        files={"arquivo": ("obrigacoes.txt", conteudo.encode(), "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    assert response.json()["importadas"] == 1
+    assert response.json()["detalhes_erros"] == [{"linha": 3, "erro": "JSON inválido"}]
+
+def test_importar_obrigacoes_formato_invalido(client):
+    response = client.post(
+        "/obrigacoes_acessorias/importar",
+        files={"arquivo": ("obrigacoes.xlsx", b"", "application/octet-stream")},
+    )
+    assert response.status_code == 400
+
+def test_importar_obrigacoes_arquivo_fora_de_utf8(client, db, empresa_existente, monkeypatch):
+    monkeypatch.setattr(crud, "TAMANHO_LOTE_IMPORTACAO", 2)
+    empresa_id = empresa_existente.id
+    conteudo = (
+        "nome,periodicidade,empresa_id\n"
+        f"EFD,MENSAL,{empresa_id}\n"
+        f"DCTF,MENSAL,{empresa_id}\n"
+        f"ECD,ANUAL,{empresa_id}\n"
+    ).encode() + f"Declara\xe7\xe3o,ANUAL,{empresa_id}\n".encode("latin-1") + f"DIRF,ANUAL,{empresa_id}\n".encode()
+    response = client.post(
+        "/obrigacoes_acessorias/importar",
+        files={"arquivo": ("obrigacoes.csv", conteudo, "text/csv")},
+    )
+    # 🔹 Os lotes anteriores já foram gravados: a resposta diz até onde o arquivo foi lido
+    assert response.status_code == 200
+    corpo = response.json()
+    assert (corpo["importadas"], corpo["erros"]) == (3, 1)
+    assert corpo["detalhes_erros"] == [{"linha": 5, "erro": "Arquivo não está em UTF-8: a leitura parou nesta linha"}]
+    nomes = {o.nome for o in db.query(ObrigacaoAcessoria).filter_by(empresa_id=empresa_id)}
+    assert nomes == {"EFD", "DCTF", "ECD"}
+
+def test_importar_obrigacoes_ndjson_fora_de_utf8(client, empresa_existente):
+    conteudo = (
+        f'{{"nome": "EFD", "periodicidade": "MENSAL", "empresa_id": {empresa_existente.id}}}\n'.encode()
+        + b'{"nome": "\xff"}\n'
+    )
+    response = client.post(
+        "/obrigacoes_acessorias/importar?formato=ndjson",
+        files={"arquivo": ("obrigacoes.ndjson", conteudo, "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    assert response.json()["importadas"] == 1
+    assert response.json()["detalhes_erros"] == [{"linha": 2, "erro": "Arquivo não está em UTF-8: a leitura parou nesta linha"}]
@@ -0,0 +1,41 @@
+from sqlalchemy import inspect, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+import crud
+from models import ObrigacaoAcessoria
+from schemas import ObrigacaoAcessoriaCreate
+
+INDICE = "ix_obrigacoes_acessorias_empresa_id_nome"
+
+def plano(db, consulta) -> str:
+    """EXPLAIN da consulta; sem seq scan, o planejador usa um índice sempre que algum servir."""
+    sql = consulta.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    return "\n".join(db.execute(text(f"EXPLAIN {sql}")).scalars())
+
+def test_obrigacoes_por_empresa_usam_indice(db, obrigacao_existente):
+    # Carregamento das obrigações de uma página de empresas (selectinload)
+    assert INDICE in plano(db, select(ObrigacaoAcessoria).where(ObrigacaoAcessoria.empresa_id.in_([1, 2])))
+    # Guarda do DELETE de empresa
+    assert INDICE in plano(db, crud.delete_empresa_sem_obrigacoes(1))
+
+def test_duplicados_usam_indice(db, obrigacao_existente):
+    obrigacao = ObrigacaoAcessoriaCreate(nome="DCTF", periodicidade="MENSAL", empresa_id=1)
+    assert f"Conflict Arbiter Indexes: {INDICE}" in plano(db, crud.insert_obrigacao(obrigacao))
+    # Verificação de duplicados da importação
+    consulta = select(ObrigacaoAcessoria.id).where(
+        tuple_(ObrigacaoAcessoria.nome, ObrigacaoAcessoria.empresa_id).in_([("DCTF", 1), ("ECF", 1)])
+    )
+    assert INDICE in plano(db, consulta)
+
+def test_sem_indices_redundantes_nas_chaves_primarias(db):
+    inspetor = inspect(db.get_bind())
+    assert "ix_empresas_id" not in {indice["name"] for indice in inspetor.get_indexes("empresas")}
+    assert "ix_obrigacoes_acessorias_id" not in {indice["name"] for indice in inspetor.get_indexes("obrigacoes_acessorias")}
+
+def test_filtros_da_listagem_usam_indice(db, obrigacao_existente):
+    consulta = crud.consulta_paginada(ObrigacaoAcessoria, 0, 10, None, (), filtros=crud.filtros_obrigacoes(periodicidade="MENSAL"))
+    assert "ix_obrigacoes_acessorias_periodicidade_id" in plano(db, consulta)
+    consulta = crud.consulta_paginada(ObrigacaoAcessoria, 0, 10, None, (), filtros=crud.filtros_obrigacoes(nome="DCTF"))
+    assert "ix_obrigacoes_acessorias_nome" in plano(db, consulta)
+    consulta = crud.consulta_paginada(ObrigacaoAcessoria, 0, 10, None, (), filtros=crud.filtros_obrigacoes(empresa_id=1))
+    assert INDICE in plano(db, consulta)
@@ -0,0 +1,32 @@
+from models import Empresa, ObrigacaoAcessoria
+
+def test_listar_obrigacoes_com_filtros(client, db, empresa_existente):
+    outra = Empresa(nome="Náutico", cnpj="11222333000181", endereco="Rua B, 200",
+                    email="contato@nautico.com", telefone="81912345678")
+    db.add(outra)
+    db.commit()
+    db.add_all([
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=empresa_existente.id),
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=empresa_existente.id),
+        ObrigacaoAcessoria(nome="DCTF", periodicidade="MENSAL", empresa_id=outra.id),
+    ])
+    db.commit()
+
+    def nomes(url):
+        response = client.get(url)
+        assert response.status_code == 200
+        return [(o["nome"], o["empresa_id"]) for o in response.json()]
+
+    assert nomes("/obrigacoes_acessorias/?empresa_id=2") == [("DCTF", 2)]
+    assert nomes("/obrigacoes_acessorias/?periodicidade=ANUAL") == [("ECF", 1)]
+    assert nomes("/obrigacoes_acessorias/?nome=DCTF") == [("DCTF", 1), ("DCTF", 2)]
+    assert nomes("/obrigacoes_acessorias/?nome=DCTF&empresa_id=1") == [("DCTF", 1)]
+    assert len(nomes("/obrigacoes_acessorias/?nome=")) == 3  # 🔹 Filtro vazio é ignorado
+    assert client.get("/obrigacoes_acessorias/?periodicidade=SEMANAL").status_code == 422
+
+    # Filtros combinados com a paginação por cursor
+    response = client.get("/obrigacoes_acessorias/?periodicidade=MENSAL&limit=1")
+    assert [o["empresa_id"] for o in response.json()] == [1]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/obrigacoes_acessorias/?periodicidade=MENSAL&limit=1&cursor={cursor}")
+    assert [o["empresa_id"] for o in response.json()] == [2]
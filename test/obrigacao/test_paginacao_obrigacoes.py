@@ -0,0 +1,17 @@
+from models import ObrigacaoAcessoria
+
+def test_listar_obrigacoes_por_cursor(client, db, empresa_existente):
+    db.add_all([
+        ObrigacaoAcessoria(nome=nome, periodicidade="MENSAL", empresa_id=empresa_existente.id)
+        for nome in ("DCTF", "EFD", "SPED")
+    ])
+    db.commit()
+
+    response = client.get("/obrigacoes_acessorias/?limit=2")
+    assert response.status_code == 200
+    assert [o["nome"] for o in response.json()] == ["DCTF", "EFD"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/obrigacoes_acessorias/?limit=2&cursor={cursor}")
+    assert [o["nome"] for o in response.json()] == ["SPED"]
+    assert "X-Next-Cursor" not in response.headers
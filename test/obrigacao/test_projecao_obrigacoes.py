@@ -0,0 +1,11 @@
+def test_listar_obrigacoes_sem_empresa_embutida(client, obrigacao_existente):
+    response = client.get("/obrigacoes_acessorias/?fields=id,nome")
+    assert response.status_code == 200
+    assert response.json() == [{"id": obrigacao_existente.id, "nome": "DCTF"}]
+
+def test_listar_obrigacoes_incluindo_empresa(client, obrigacao_existente):
+    response = client.get("/obrigacoes_acessorias/?fields=nome&include=empresa")
+    assert response.status_code == 200
+    obrigacao = response.json()[0]
+    assert obrigacao["nome"] == "DCTF"
+    assert obrigacao["empresa"]["cnpj"] == "12345678000195"
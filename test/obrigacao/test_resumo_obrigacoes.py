@@ -0,0 +1,54 @@
+import crud
+from models import ObrigacaoAcessoria
+
+def resumo(client, url="/obrigacoes_acessorias/resumo"):
+    response = client.get(url)
+    assert response.status_code == 200
+    return [(r["empresa_id"], r["mensal"], r["trimestral"], r["anual"], r["total"]) for r in response.json()]
+
+def test_resumo_acompanha_as_escritas_de_obrigacoes(client, empresa_existente):
+    for nome, periodicidade in (("DCTF", "MENSAL"), ("EFD", "MENSAL"), ("ECF", "ANUAL")):
+        client.post("/obrigacoes_acessorias/", json={"nome": nome, "periodicidade": periodicidade, "empresa_id": 1})
+    client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "ANUAL", "empresa_id": 1})  # 🔹 Duplicada: não conta
+    assert resumo(client) == [(1, 2, 0, 1, 3)]
+
+    client.put("/obrigacoes_acessorias/1/", json={"periodicidade": "TRIMESTRAL"})
+    client.put("/obrigacoes_acessorias/2/", json={"nome": "EFD ICMS"})  # 🔹 Mesma periodicidade: resumo igual
+    assert resumo(client) == [(1, 1, 1, 1, 3)]
+
+    client.post(
+        "/obrigacoes_acessorias/importar",
+        files={"arquivo": ("obrigacoes.csv", b"nome,periodicidade,empresa_id\nECD,ANUAL,1\nDIRF,ANUAL,1\n", "text/csv")},
+    )
+    assert resumo(client) == [(1, 1, 1, 3, 5)]
+
+    for obrigacao in client.get("/obrigacoes_acessorias/?limit=100").json():
+        client.delete(f"/obrigacoes_acessorias/{obrigacao['id']}/")
+    assert resumo(client) == []
+    assert client.delete("/empresas/1/").status_code == 200  # 🔹 Linhas zeradas do resumo não impedem a exclusão
+
+def test_resumo_paginado_por_empresa(client, empresa_existente):
+    client.post("/empresas/", json={
+        "nome": "Santa Cruz", "cnpj": "11222333000181", "endereco": "Rua B, 200",
+        "email": "contato@santacruz.com", "telefone": "81912345678",
+    })
+    for empresa_id in (1, 2):
+        client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": empresa_id})
+
+    response = client.get("/obrigacoes_acessorias/resumo?limit=1")
+    assert [r["empresa_id"] for r in response.json()] == [1]
+    cursor = response.headers["X-Next-Cursor"]
+    assert resumo(client, f"/obrigacoes_acessorias/resumo?limit=1&cursor={cursor}") == [(2, 1, 0, 0, 1)]
+    assert resumo(client, "/obrigacoes_acessorias/resumo?empresa_id=2") == [(2, 1, 0, 0, 1)]
+
+def test_reconstruir_resumo(client, db, empresa_existente):
+    client.post("/obrigacoes_acessorias/", json={"nome": "DCTF", "periodicidade": "MENSAL", "empresa_id": 1})
+    db.add_all([  # 🔹 Fora da API: o resumo não é atualizado
+        ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=1),
+        ObrigacaoAcessoria(nome="ECD", periodicidade="ANUAL", empresa_id=1),
+    ])
+    db.commit()
+    assert resumo(client) == [(1, 1, 0, 0, 1)]
+
+    assert crud.reconstruir_resumo_obrigacoes(db) == 2
+    assert resumo(client) == [(1, 1, 0, 2, 3)]
@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import TypeAdapter
+from crud import get_obrigacoes
+from models import ObrigacaoAcessoria
+from schemas import ObrigacaoAcessoriaResponse
+
+def test_listagem_igual_a_do_response_model(client, db, obrigacao_existente):
+    db.add(ObrigacaoAcessoria(nome="ECF", periodicidade="ANUAL", empresa_id=obrigacao_existente.empresa_id))
+    db.commit()
+    db.expunge_all()
+    adaptador = TypeAdapter(List[ObrigacaoAcessoriaResponse])
+    esperado = adaptador.dump_json(adaptador.validate_python(get_obrigacoes(db), from_attributes=True))
+
+    response = client.get("/obrigacoes_acessorias/?periodicidade=ANUAL")
+    assert response.json()[0]["nome"] == "ECF"
+    assert client.get("/obrigacoes_acessorias/").content == esperado
@@ -0,0 +1,135 @@
+import importlib.util
+import time
+from contextlib import nullcontext
+from pathlib import Path
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+import busca
+import models
+from busca import IndicePrefixos, normalizar
+
+def indice_com(*empresas):
+    indice = IndicePrefixos()
+    indice.pronto = True
+    for empresa in empresas:
+        indice.guardar(*empresa)
+    return indice
+
+def ids(resultado):
+    return [empresa["id"] for empresa in resultado]
+
+def test_normalizar_ignora_maiusculas_acentos_e_espacos():
+    assert normalizar("  São   JOSÉ ") == "sao jose"
+
+def test_busca_por_prefixo_de_qualquer_palavra_e_do_cnpj():
+    indice = indice_com((1, "Sport Club do Recife", "12345678000195"), (2, "Santa Cruz", "11222333000181"))
+    assert ids(indice.buscar("sp")) == [1]
+    assert ids(indice.buscar("RECI")) == [1]
+    assert ids(indice.buscar("club do")) == [1]
+    assert ids(indice.buscar("1122")) == [2]
+    assert ids(indice.buscar("s")) == [2, 1]
+    assert indice.buscar("cruzeiro") == []
+
+def test_busca_sem_acentos_encontra_nome_acentuado():
+    indice = indice_com((1, "Padaria São João", "12345678000195"))
+    assert ids(indice.buscar("sao jo")) == [1]
+    assert ids(indice.buscar("JOÃO")) == [1]
+
+def test_busca_respeita_limite_sem_repetir_empresa():
+    indice = indice_com(*[(i, f"Santa Santa {i}", f"{i:014d}") for i in range(1, 6)])
+    assert len(indice.buscar("santa", limite=3)) == 3
+    assert sorted(ids(indice.buscar("santa"))) == [1, 2, 3, 4, 5]
+
+def test_guardar_substitui_nome_anterior_e_remover_apaga():
+    indice = indice_com((1, "Sport Club do Recife", "12345678000195"))
+    indice.guardar(1, "Náutico", "12345678000195")
+    assert indice.buscar("sport") == []
+    assert indice.buscar("nau") == [{"id": 1, "nome": "Náutico", "cnpj": "12345678000195"}]
+    indice.remover(1)
+    assert indice.buscar("nau") == []
+    assert indice._entradas == []
+
+def test_indice_frio_ignora_escritas():
+    indice = IndicePrefixos()
+    indice.guardar(1, "Santa Cruz", "11222333000181")
+    assert not indice.pronto
+    assert indice._entradas == []
+
+def test_escritas_durante_a_construcao_sao_reaplicadas():
+    indice = IndicePrefixos()
+
+    class SessaoLenta:
+        # Enquanto a tabela é lida, outra requisição renomeia a empresa 1 e cria a 3
+        def execute(self, consulta):
+            yield (1, "Sport Club do Recife", "12345678000195")
+            indice.guardar(1, "Náutico", "12345678000195")
+            indice.guardar(3, "Santa Cruz", "11222333000181")
+            yield (2, "Central", "98765432000198")
+
+    indice.construir(SessaoLenta())
+    assert indice.pronto
+    assert indice.buscar("sport") == []
+    assert ids(indice.buscar("nautico")) == [1]
+    assert ids(indice.buscar("c")) == [2, 3]
+
+def test_falha_na_construcao_nao_acumula_escritas():
+    indice = IndicePrefixos()
+
+    class SessaoComFalha:
+        def execute(self, consulta):
+            indice.guardar(1, "Santa Cruz", "11222333000181")
+            raise OperationalError("SELECT", {}, Exception("banco fora do ar"))
+
+    with pytest.raises(OperationalError):
+        indice.construir(SessaoComFalha())
+    indice.guardar(2, "Central", "98765432000198")
+    assert indice._pendentes is None and not indice.pronto
+
+def test_falha_ao_reconstruir_mantem_indice_e_aplica_escritas():
+    indice = indice_com((1, "Sport Club do Recife", "12345678000195"))
+
+    class SessaoComFalha:
+        def execute(self, consulta):
+            indice.guardar(2, "Santa Cruz", "11222333000181")
+            raise OperationalError("SELECT", {}, Exception("banco fora do ar"))
+
+    with pytest.raises(OperationalError):
+        indice.construir(SessaoComFalha())
+    assert indice.pronto and indice._pendentes is None
+    assert ids(indice.buscar("s")) == [2, 1]
+
+def test_construcao_em_segundo_plano_tenta_de_novo(monkeypatch):
+    tentativas = []
+
+    class Sessao:
+        def connection(self, **opcoes):
+            pass
+
+    def construir(db):
+        tentativas.append(db)
+        if len(tentativas) < 3:
+            raise OperationalError("SELECT", {}, Exception("banco fora do ar"))
+
+    monkeypatch.setattr(busca, "BUSCA_ESPERA_INICIAL", 0.01)
+    monkeypatch.setattr(busca, "BUSCA_INTERVALO_VERIFICACAO", 0)
+    monkeypatch.setattr(busca, "contador_empresas", lambda db: 0)
+    monkeypatch.setattr(busca.indice_empresas, "construir", construir)
+    sessao = Sessao()
+    monkeypatch.setattr(busca.database, "SessionLocal", lambda: nullcontext(sessao))
+    parar = busca.construir_indice_em_segundo_plano()
+    for _ in range(500):
+        if len(tentativas) == 3:
+            break
+        time.sleep(0.01)
+    parar.set()
+    assert tentativas == [sessao] * 3
+
+def test_expressao_do_banco_igual_a_da_migracao():
+    # 🔹 Se divergirem, o planejador não usa ix_empresas_nome_busca_trgm
+    caminho = Path(__file__).parent.parent / "alembic" / "versions" / "d3f9a6c1b274_busca_nome_normalizado.py"
+    especificacao = importlib.util.spec_from_file_location("migracao_busca", caminho)
+    migracao = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(migracao)
+    sql = str(busca.nome_para_busca().compile(dialect=postgresql.dialect()))
+    assert sql.replace("empresas.nome", "nome") == migracao.NOME_PARA_BUSCA == models.NOME_PARA_BUSCA
@@ -0,0 +1,60 @@
+import time
+import pytest
+from cache import BackendCache, BackendMemoria, BackendNulo, Cache, criar_cache
+
+def test_cache_contabiliza_acertos_e_falhas():
+    cache = Cache(BackendMemoria(tamanho_maximo=10, ttl=60))
+    assert cache.buscar(1) is None
+    cache.guardar(1, {"id": 1})
+    assert cache.buscar(1) == {"id": 1}
+    assert cache.estatisticas() == {"backend": "BackendMemoria", "acertos": 1, "falhas": 1, "taxa_acerto": 0.5}
+
+def test_cache_remove_menos_usado_ao_atingir_o_limite():
+    cache = Cache(BackendMemoria(tamanho_maximo=2, ttl=60))
+    cache.guardar(1, "a")
+    cache.guardar(2, "b")
+    cache.buscar(1)  # 🔹 1 passa a ser o mais recente
+    cache.guardar(3, "c")
+    assert cache.buscar(2) is None
+    assert cache.buscar(1) == "a"
+    assert cache.buscar(3) == "c"
+
+def test_cache_expira_pelo_ttl():
+    cache = Cache(BackendMemoria(tamanho_maximo=10, ttl=0.05))
+    cache.guardar(1, "a")
+    time.sleep(0.06)
+    assert cache.buscar(1) is None
+
+def test_cache_invalidar_e_backend_nulo():
+    cache = Cache(BackendMemoria())
+    cache.guardar(1, "a")
+    cache.invalidar(1)
+    assert cache.buscar(1) is None
+
+    nulo = criar_cache("nenhum")
+    assert isinstance(nulo.backend, BackendNulo)
+    nulo.guardar(1, "a")
+    assert nulo.buscar(1) is None
+
+def test_cache_backend_invalido():
+    with pytest.raises(ValueError):
+        criar_cache("redis")
+
+def test_criar_cache_repassa_opcoes_ao_backend():
+    cache = criar_cache("memoria", tamanho_maximo=5, ttl=1)
+    assert (cache.backend.tamanho_maximo, cache.backend.ttl) == (5, 1)
+    assert isinstance(criar_cache("nenhum", ttl=1).backend, BackendNulo)
+
+def test_backend_incompleto_falha_ao_ser_criado():
+    class BackendSemClear(BackendCache):
+        def get(self, chave):
+            return None
+
+        def set(self, chave, valor):
+            pass
+
+        def delete(self, chave):
+            pass
+
+    with pytest.raises(TypeError, match="clear"):
+        BackendSemClear()
@@ -0,0 +1,65 @@
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+import database
+from database import ConsultasRepetidas, formato_parametros, get_db, registrar_consultas
+from metricas import MiddlewareMetricas
+
+def app_repetindo(vezes: int, **opcoes) -> FastAPI:
+    """App com uma rota que executa o mesmo SELECT `vezes` vezes, como um N+1."""
+    app = FastAPI()
+    app.add_middleware(MiddlewareMetricas)
+
+    @app.get("/repetir")
+    def repetir(db=Depends(get_db)):
+        for i in range(vezes):
+            db.execute(text("SELECT :i").execution_options(**opcoes), {"i": i})
+        return {"ok": True}
+
+    return app
+
+def test_escopos_aninhados(db):
+    with registrar_consultas() as externo:
+        db.execute(text("SELECT 1"))
+        with registrar_consultas() as interno:
+            db.execute(text("SELECT 2"))
+            db.execute(text("SELECT 2"))
+    assert (externo.quantidade, interno.quantidade) == (3, 2)
+    assert externo.formatos == {"SELECT 1": 1, "SELECT 2": 2}
+    assert interno.tempo > 0
+
+def test_n_mais_um_falha_a_requisicao(db, monkeypatch):
+    monkeypatch.setattr(database, "DB_N_MAIS_UM", "falhar")
+    client = TestClient(app_repetindo(database.DB_N_MAIS_UM_LIMITE))
+    with registrar_consultas() as consultas:
+        assert client.get("/repetir").status_code == 200
+        assert client.get("/repetir").status_code == 200  # 🔹 O limite é por requisição
+    assert consultas.quantidade == 2 * database.DB_N_MAIS_UM_LIMITE
+
+    with pytest.raises(ConsultasRepetidas):
+        TestClient(app_repetindo(database.DB_N_MAIS_UM_LIMITE + 1)).get("/repetir")
+    # Repetições marcadas como esperadas não contam
+    assert TestClient(app_repetindo(database.DB_N_MAIS_UM_LIMITE + 1, repeticao_esperada=True)).get("/repetir").status_code == 200
+
+def test_n_mais_um_avisa_no_log(db, monkeypatch, caplog):
+    monkeypatch.setattr(database, "DB_N_MAIS_UM", "avisar")
+    with caplog.at_level(logging.WARNING, logger="database"):
+        assert TestClient(app_repetindo(database.DB_N_MAIS_UM_LIMITE + 5)).get("/repetir").status_code == 200
+    assert [r.message for r in caplog.records if "N+1" in r.message] == [
+        f"Possível N+1: comando executado mais de {database.DB_N_MAIS_UM_LIMITE} vezes na mesma requisição: SELECT %(i)s"
+    ]
+
+def test_consulta_lenta_no_log_sem_valores(db, monkeypatch, caplog):
+    monkeypatch.setattr(database, "DB_CONSULTA_LENTA_MS", 5)
+    with caplog.at_level(logging.WARNING, logger="database"):
+        db.execute(text("SELECT pg_sleep(0.01), :cnpj"), {"cnpj": "12345678000195"})
+    assert len(caplog.records) == 1
+    assert "Consulta lenta" in caplog.text and "{cnpj: str}" in caplog.text
+    assert "12345678000195" not in caplog.text
+
+def test_formato_parametros():
+    assert formato_parametros({"id": 1, "nome": "a"}) == "{id: int, nome: str}"
+    assert formato_parametros([{"id": 1}, {"id": 2}], executemany=True) == "2 x {id: int}"
+    assert formato_parametros((1, None)) == "(int, NoneType)"
@@ -0,0 +1,46 @@
+from metricas import LIMITES_HISTOGRAMA, Medicao, Metricas
+
+def test_histograma_exportado_acumulado():
+    metricas = Metricas()
+    metricas.registrar("GET", "/empresas/", 200, (0.0003, 0.0001, 0.00005, 0.00005))
+    metricas.registrar("GET", "/empresas/", 200, (0.02, 0.015, 0.001, 0.002))
+    metricas.registrar("GET", "/empresas/", 404, (0.002, 0.0, None, None))
+    texto = metricas.exportar()
+
+    total = 'metodo="GET",rota="/empresas/",fase="total"'
+    assert f'api_requisicao_duracao_segundos_bucket{{{total},le="0.0005"}} 1' in texto
+    assert f'api_requisicao_duracao_segundos_bucket{{{total},le="0.0025"}} 2' in texto
+    assert f'api_requisicao_duracao_segundos_bucket{{{total},le="+Inf"}} 3' in texto
+    assert f"api_requisicao_duracao_segundos_count{{{total}}} 3" in texto
+    # 🔹 Requisições que não chegaram ao fim da rota não entram em validacao/serializacao
+    assert 'fase="validacao"}' in texto and 'api_requisicao_duracao_segundos_count{metodo="GET",rota="/empresas/",fase="validacao"} 2' in texto
+    assert 'api_requisicoes_total{metodo="GET",rota="/empresas/",status="200"} 2' in texto
+    assert 'api_requisicoes_total{metodo="GET",rota="/empresas/",status="404"} 1' in texto
+    assert texto.count("_bucket{" + total) == len(LIMITES_HISTOGRAMA) + 1
+
+def test_rotulos_escapados_e_limpar():
+    metricas = Metricas()
+    metricas.registrar("GET", '/a"b\\c', 200, (0.001, 0.0, None, None))
+    assert 'rota="/a\\"b\\\\c"' in metricas.exportar()
+    metricas.limpar()
+    assert "api_requisicoes_total{" not in metricas.exportar()
+
+def test_server_timing_sem_rota():
+    medicao = Medicao()
+    assert medicao.server_timing(medicao.inicio + 0.0015) == b"total;dur=1.500, banco;dur=0.000"
+
+def test_server_timing_padrao_so_total_e_banco():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from metricas import MiddlewareMetricas
+
+    app = FastAPI()
+    app.add_middleware(MiddlewareMetricas, fases=False)
+
+    @app.get("/item")
+    def obter_item():
+        return {"ok": True}
+
+    response = TestClient(app).get("/item")
+    assert response.status_code == 200
+    assert [item.split(";")[0] for item in response.headers["Server-Timing"].split(", ")] == ["total", "banco"]
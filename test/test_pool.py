@@ -0,0 +1,25 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from database import DATABASE_URL, PoolMonitorado
+from main import app
+
+client = TestClient(app)
+
+def test_estatisticas_pool():
+    response = client.get("/pool/")
+    assert response.status_code == 200
+    assert {"tamanho", "em_uso", "overflow", "timeouts", "espera_media_ms"} <= set(response.json()["sync"])
+
+def test_pool_registra_timeout():
+    engine = create_engine(DATABASE_URL, poolclass=PoolMonitorado, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    try:
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        estatisticas = engine.pool.estatisticas
+        assert estatisticas.checkouts == 2
+        assert estatisticas.timeouts == 1
+        assert estatisticas.espera_maxima >= 0.1
+    finally:
+        engine.dispose()
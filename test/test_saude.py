@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+import main
+from database import DB_POOL_AQUECIMENTO
+from main import app
+
+def test_importar_database_nao_cria_engine_nem_imprime_credenciais():
+    codigo = "import sys, database; print('psycopg2' in sys.modules, 'engine' in vars(database))"
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    assert saida == "False False\n"
+
+def test_healthz_responde_sem_lifespan(client):
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+def test_readyz_503_antes_do_lifespan(client):
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json() == {"status": "iniciando"}
+
+def test_readyz_pronto_com_pool_aquecido(db):
+    with TestClient(app) as client:
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json() == {"status": "pronto"}
+        pool = client.get("/pool/").json()["sync"]
+        # 🔹 As conexões abertas pelo lifespan continuam no pool
+        assert pool["ociosas"] + pool["em_uso"] >= DB_POOL_AQUECIMENTO
+    # 🔹 Depois do shutdown volta a não estar pronto
+    assert TestClient(app).get("/readyz").status_code == 503
+
+def test_readyz_503_com_banco_indisponivel(db, monkeypatch):
+    monkeypatch.setattr(main, "banco_disponivel", lambda: False)
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json() == {"status": "banco indisponível"}
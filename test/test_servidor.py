@@ -0,0 +1,24 @@
+import pytest
+import database
+from servidor import dividir_pool
+
+def test_dividir_pool_reduz_pools_ate_caber_no_orcamento():
+    # 🔹 8 workers x (20 + 10) passariam de 100 conexões
+    pool_size, max_overflow = dividir_pool(100, 8, pool_size=20, max_overflow=10)
+    assert (pool_size, max_overflow) == (12, 0)
+    assert 8 * (pool_size + max_overflow) <= 100
+
+def test_dividir_pool_conta_os_dois_pools_no_modo_async():
+    assert dividir_pool(100, 4, pools_por_worker=2, pool_size=5, max_overflow=10) == (5, 7)
+
+def test_dividir_pool_nao_aumenta_o_configurado():
+    assert dividir_pool(1000, 2, pool_size=5, max_overflow=10) == (5, 10)
+
+def test_dividir_pool_orcamento_insuficiente():
+    with pytest.raises(ValueError):
+        dividir_pool(3, 4)
+
+def test_configurar_pool_depois_do_engine_falha():
+    database.engine  # 🔹 Cria o engine, se ainda não existe
+    with pytest.raises(RuntimeError):
+        database.configurar_pool(1, 0)
@@ -0,0 +1,63 @@
+import random
+import pytest
+from validacao import (
+    ERRO_DIGITOS_CNPJ,
+    ERRO_TAMANHO_CNPJ,
+    completar_cnpj,
+    cnpj_valido,
+    normalizar_telefone,
+    normalizar_telefones,
+    validar_cnpj,
+    validar_cnpjs,
+)
+
+def digitos_referencia(base: str) -> str:
+    """Cálculo direto, dígito a dígito, para conferir as tabelas."""
+    for pesos in ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)):
+        resto = sum(int(d) * p for d, p in zip(base, pesos)) % 11
+        base += "0" if resto < 2 else str(11 - resto)
+    return base
+
+def test_digitos_verificadores_conferem_com_o_calculo_direto():
+    for base in ("123456780001", "112223330001", "000000010001", "999999999999", "000000000000", "876543210009"):
+        assert completar_cnpj(base) == digitos_referencia(base)
+
+def test_validar_cnpj_escalar():
+    assert validar_cnpj("12.345.678/0001-95") == "12345678000195"
+    assert cnpj_valido("11222333000181")
+    assert not cnpj_valido("11111111111111")  # 🔹 Passa na conta, mas não é CNPJ
+    with pytest.raises(ValueError, match=ERRO_DIGITOS_CNPJ):
+        validar_cnpj("11222333000144")
+    with pytest.raises(ValueError, match=ERRO_TAMANHO_CNPJ):
+        validar_cnpj("1234567800019")
+    with pytest.raises(ValueError, match=ERRO_TAMANHO_CNPJ):
+        validar_cnpj("١٢٣٤٥٦٧٨٠٠٠١٩٥")  # Dígitos não ASCII não contam
+
+def test_validar_cnpjs_em_lote_igual_ao_escalar():
+    valores = ["12345678000195", "11.222.333/0001-81", "11222333000144", "123", "00000000000000", None, 12345678000195, ""]
+    esperado = []
+    for valor in valores:
+        try:
+            esperado.append(validar_cnpj(valor))
+        except (ValueError, AttributeError, TypeError):
+            esperado.append(None)
+    assert validar_cnpjs(valores) == esperado == ["12345678000195", "11222333000181", None, None, None, None, None, None]
+
+def test_validar_cnpjs_em_lote_aleatorio():
+    aleatorio = random.Random(7)
+    valores = []
+    for _ in range(2000):
+        cnpj = digitos_referencia(f"{aleatorio.randrange(10 ** 12):012d}")
+        if aleatorio.random() < 0.5:  # 🔹 Metade com um dígito trocado
+            posicao = aleatorio.randrange(14)
+            cnpj = cnpj[:posicao] + str((int(cnpj[posicao]) + aleatorio.randrange(1, 10)) % 10) + cnpj[posicao + 1:]
+        valores.append(cnpj)
+    assert validar_cnpjs(valores) == [c if cnpj_valido(c) else None for c in valores]
+    assert validar_cnpjs([]) == []
+
+def test_normalizar_telefone():
+    assert normalizar_telefone("(81) 98765-4321") == "81987654321"
+    assert normalizar_telefone("+55 81 98765-4321") == "81987654321"
+    with pytest.raises(ValueError):
+        normalizar_telefone("8198765432")
+    assert normalizar_telefones(["81 98765-4321", "123", None]) == ["81987654321", None, None]
@@ -0,0 +1,159 @@
+import re
+from array import array
+from functools import lru_cache
+from itertools import product
+from typing import Iterable, List, Optional
+from pydantic.networks import validate_email
+from pydantic_core import PydanticCustomError
+
+# Validação de CNPJ (com dígitos verificadores) e normalização de telefone.
+# API escalar para os validadores do Pydantic (schemas.py) e API em lote para as cargas em massa
+# (POST /empresas/bulk), que valida a coluna inteira de uma vez antes da validação linha a linha.
+
+_NAO_DIGITOS = re.compile(r"[^0-9]")
+
+PESOS_DV1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_DV2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+ERRO_TAMANHO_CNPJ = "CNPJ deve ter exatamente 14 dígitos numéricos"
+ERRO_DIGITOS_CNPJ = "CNPJ inválido: dígitos verificadores não conferem"
+ERRO_TELEFONE = "Telefone deve ter exatamente 11 dígitos numéricos"
+
+
+# Somas ponderadas dos dois dígitos verificadores por bloco de 4 dígitos da base (12 dígitos = 3 blocos).
+# As duas somas vão empacotadas no mesmo inteiro (16 bits cada; o máximo é 9 * 9 * 13 < 2**16):
+# 3 consultas às tabelas e 3 somas calculam os dois dígitos, em vez de 25 multiplicações.
+def _tabela_bloco(inicio: int) -> dict:
+    # Contribuição de cada dígito em cada posição do bloco, já com as duas somas empacotadas
+    posicoes = [
+        [(str(d), d * PESOS_DV1[i] | d * PESOS_DV2[i] << 16) for d in range(10)]
+        for i in range(inicio, inicio + 4)
+    ]
+    return {a + b + c + d: va + vb + vc + vd for (a, va), (b, vb), (c, vc), (d, vd) in product(*posicoes)}
+
+
+# As 3 tabelas (10 mil entradas cada) são montadas no primeiro uso, não na importação do módulo
+@lru_cache(maxsize=None)
+def _blocos() -> tuple:
+    return tuple(_tabela_bloco(inicio) for inicio in (0, 4, 8))
+
+
+# Resto da divisão por 11 -> dígito verificador
+_DIGITO = tuple("0" if resto < 2 else str(11 - resto) for resto in range(11))
+
+
+def somente_digitos(valor: str) -> str:
+    # 🔹 A maioria chega sem formatação ou só com ". / - ( ) +" e espaços: replace é bem mais
+    # barato que a expressão regular, que fica para o resto
+    if valor.isascii() and valor.isdigit():
+        return valor
+    limpo = valor.replace(".", "").replace("/", "").replace("-", "").replace(" ", "").replace("(", "").replace(")", "").replace("+", "")
+    return limpo if limpo.isascii() and limpo.isdigit() else _NAO_DIGITOS.sub("", limpo)
+
+
+# Os dois dígitos verificadores de uma base de 12 dígitos
+def digitos_verificadores(base: str) -> str:
+    bloco1, bloco2, bloco3 = _blocos()
+    soma = bloco1[base[:4]] + bloco2[base[4:8]] + bloco3[base[8:12]]
+    dv1 = _DIGITO[(soma & 0xFFFF) % 11]
+    return dv1 + _DIGITO[((soma >> 16) + int(dv1) * 2) % 11]
+
+
+# CNPJ completo a partir da base (8 dígitos da raiz + 4 da filial)
+def completar_cnpj(base: str) -> str:
+    return base + digitos_verificadores(base)
+
+
+# CNPJ com 14 dígitos (já normalizado) e dígitos verificadores corretos. Sequências de um
+# só dígito (00000000000000, 11111111111111...) passam na conta, mas não são CNPJs.
+def cnpj_valido(cnpj: str) -> bool:
+    return len(cnpj) == 14 and cnpj.isascii() and cnpj.isdigit() and cnpj != cnpj[0] * 14 and digitos_verificadores(cnpj[:12]) == cnpj[12:]
+
+
+# Normaliza e valida um CNPJ; ValueError com o motivo (usado pelos validadores do Pydantic)
+def validar_cnpj(valor: str) -> str:
+    cnpj = somente_digitos(valor)
+    if len(cnpj) != 14:
+        raise ValueError(ERRO_TAMANHO_CNPJ)
+    if not cnpj_valido(cnpj):
+        raise ValueError(ERRO_DIGITOS_CNPJ)
+    return cnpj
+
+
+# Normaliza um telefone para os 11 dígitos (DDD + número), sem formatação e sem o código do país (+55)
+def normalizar_telefone(valor: str) -> str:
+    telefone = somente_digitos(valor)
+    if len(telefone) == 13 and telefone.startswith("55"):
+        telefone = telefone[2:]
+    if len(telefone) != 11:
+        raise ValueError(ERRO_TELEFONE)
+    return telefone
+
+
+# E-mail como o EmailStr dos schemas o grava (domínio em minúsculas, sem espaços nas pontas). Um
+# e-mail inválido volta só sem os espaços: como filtro, não encontra nada.
+def normalizar_email(valor: str) -> str:
+    try:
+        return validate_email(valor)[1]
+    except PydanticCustomError:
+        return valor.strip()
+
+
+# Soma ponderada dos dígitos -> dígito verificador (a maior soma possível é 9 * 64)
+_DV_POR_SOMA = tuple(0 if soma % 11 < 2 else 11 - soma % 11 for soma in range(9 * sum(PESOS_DV2) + 1))
+
+
+# Uma posição (0 a 13) de todos os CNPJs como um único inteiro, uma faixa de 16 bits por CNPJ
+def _coluna(codigos: memoryview, posicao: int) -> int:
+    return int.from_bytes(codigos[posicao::14].tobytes(), "little")
+
+
+def _faixas(inteiro: int, quantidade: int) -> list:
+    return memoryview(inteiro.to_bytes(2 * quantidade, "little")).cast("H").tolist()
+
+
+# Valida uma coluna inteira de CNPJs: normalizados na mesma ordem, ou None nos inválidos (e nos que
+# não são texto). A conta dos dígitos verificadores é feita para a coluna toda de uma vez: cada
+# posição vira um inteiro grande com uma faixa de 16 bits por CNPJ (os códigos UTF-16 dos dígitos),
+# e as somas ponderadas são 12 multiplicações e somas desses inteiros, em C, sem laço por CNPJ.
+# As faixas não transbordam: a maior soma é 57 ("9") * 64 (soma dos pesos) + 18 < 2**16.
+def validar_cnpjs(valores: Iterable) -> List[Optional[str]]:
+    normalizados = [somente_digitos(valor) if type(valor) is str else "" for valor in valores]
+    candidatos = [i for i, cnpj in enumerate(normalizados) if len(cnpj) == 14 and cnpj != cnpj[0] * 14]
+    resultado = [None] * len(normalizados)
+    quantidade = len(candidatos)
+    if not quantidade:
+        return resultado
+
+    texto = "".join([normalizados[i] for i in candidatos])
+    codigos = memoryview(texto.encode("utf-16-le")).cast("H")
+    colunas = [_coluna(codigos, posicao) for posicao in range(14)]
+    # Os códigos começam em ord("0") = 48: desconta 48 * soma dos pesos de cada faixa
+    uns = int.from_bytes(b"\x01\x00" * quantidade, "little")
+    soma_dv1 = sum(coluna * peso for coluna, peso in zip(colunas, PESOS_DV1)) - 48 * sum(PESOS_DV1) * uns
+    dv1 = [_DV_POR_SOMA[soma] for soma in _faixas(soma_dv1, quantidade)]
+    # O segundo dígito pondera também o primeiro (peso 2): usa o calculado, não o informado
+    soma_dv2 = sum(coluna * peso for coluna, peso in zip(colunas[:12], PESOS_DV2)) - 48 * sum(PESOS_DV2[:12]) * uns
+    soma_dv2 += 2 * int.from_bytes(array("H", dv1).tobytes(), "little")
+    dv2 = [_DV_POR_SOMA[soma] for soma in _faixas(soma_dv2, quantidade)]
+
+    informados = texto.encode("ascii")
+    for i, informado1, esperado1, informado2, esperado2 in zip(candidatos, informados[12::14], dv1, informados[13::14], dv2):
+        if informado1 - 48 == esperado1 and informado2 - 48 == esperado2:
+            resultado[i] = normalizados[i]
+    return resultado
+
+
+# Normaliza uma coluna inteira de telefones: 11 dígitos na mesma ordem, ou None nos inválidos
+def normalizar_telefones(valores: Iterable) -> List[Optional[str]]:
+    resultado = []
+    adicionar = resultado.append
+    for valor in valores:
+        if type(valor) is not str:
+            adicionar(None)
+            continue
+        telefone = somente_digitos(valor)
+        if len(telefone) == 13 and telefone.startswith("55"):
+            telefone = telefone[2:]
+        adicionar(telefone if len(telefone) == 11 else None)
+    return resultado